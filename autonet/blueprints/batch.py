@@ -0,0 +1,57 @@
+from flask import Blueprint, current_app, g, request
+
+from autonet.core import batch
+from autonet.core import exceptions as exc
+from autonet.core.response import autonet_response
+
+blueprint = Blueprint('batch', __name__)
+
+
+@blueprint.route('', methods=['POST'])
+def post_batch():
+    """
+    .. :quickref: Batch; Execute multiple requests.
+
+    Executes a list of requests, returning a list of their response
+    envelopes in the same order.  The requests are authenticated by the
+    batch request.  Requests for the same device are executed in the
+    order given, requests for different devices are executed in
+    parallel.
+
+    **Request data**
+
+    .. code-block:: json
+
+        [
+            {
+                "str: method": "The HTTP method of the request.",
+                "str: path": "The request path, with any query string.",
+                "any: body": "The request body, if any.",
+                "object: headers": "Additional request headers, if any."
+            }
+        ]
+
+    **Response data**
+
+    .. code-block:: json
+
+        [
+            {
+                "str: request-id": "The request ID of the request.",
+                "any: data": "The response data of the request.",
+                "array: errors": "The errors of the request.",
+                "int: status": "The response status of the request."
+            }
+        ]
+
+    **Response codes**
+
+    * :http:statuscode:`200`
+    * :http:statuscode:`400`
+    """
+    if not isinstance(request.json, list):
+        raise exc.RequestTypeError('body', request.json, 'array')
+    sub_requests = [batch.SubRequest.from_dict(i, r) for i, r in enumerate(request.json)]
+    context = batch.BatchContext(user=g.user, token_id=g.token_id)
+    return autonet_response(batch.execute(current_app._get_current_object(), sub_requests,
+                                          context, request.host_url))
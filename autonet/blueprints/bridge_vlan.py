@@ -1,11 +1,16 @@
 from flask import Blueprint, g, request
 
 from autonet.core import exceptions as exc
+from autonet.core import listing
 from autonet.core.objects import vlan as an_vlan
 from autonet.core.response import autonet_response
 
 blueprint = Blueprint('bridge_vlan', __name__)
 
+LIST_FILTERS = {
+    'admin_enabled': listing.Filter(lambda v: v.admin_enabled, listing.parse_bool)
+}
+
 
 def _prepare_defaults(request_data: dict) -> dict:
     """
@@ -40,11 +45,21 @@ def get_vlans(device_id):
             }
         ]
 
+    **Query parameters**
+
+    * `limit`: Maximum number of VLANs to return.
+    * `cursor`: Cursor for the next page, as provided in the `Link` header.
+    * `fields`: Comma separated list of fields to return for each VLAN.
+    * `admin_enabled`: Only return VLANs in this admin state.
+
     **Response codes**
 
     * :http:statuscode:`200`
     """
     def verify(driver_response):
+        if listing.is_stream(driver_response):
+            # Streamed objects are verified as they are sent.
+            return True
         if not isinstance(driver_response, list):
             return False
         for item in driver_response:
@@ -52,10 +67,12 @@ def get_vlans(device_id):
                 return False
         return True
 
-    response = g.driver.execute('bridge:vlan', 'read')
+    query = listing.ListQuery.from_request(LIST_FILTERS)
+    response = g.driver.execute('bridge:vlan', 'read', **query.driver_kwargs(g.driver, 'bridge:vlan'))
     if not verify(response):
         raise exc.DriverResponseInvalid(g.driver)
-    return autonet_response(response)
+    return listing.list_response(response, query, LIST_FILTERS, key=lambda v: v.id,
+                                 item_type=an_vlan.VLAN)
 
 
 @blueprint.route('/<vlan_id>', methods=['GET'])
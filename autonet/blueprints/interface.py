@@ -2,11 +2,21 @@ from flask import Blueprint, g, request
 from typing import Union
 
 from autonet.core import exceptions as exc
+from autonet.core import listing
 from autonet.core.objects import interfaces as an_if
 from autonet.core.response import autonet_response
 
 blueprint = Blueprint('interfaces', __name__)
 
+LIST_FILTERS = {
+    'mode': listing.Filter(lambda i: i.mode, column='mode'),
+    'admin_enabled': listing.Filter(lambda i: i.admin_enabled, listing.parse_bool,
+                                    column='admin_enabled'),
+    'parent': listing.Filter(lambda i: i.parent, column='parent'),
+    'vrf': listing.Filter(lambda i: getattr(i.attributes, 'vrf', None), column='attributes',
+                          column_getter=lambda a: getattr(a, 'vrf', None))
+}
+
 
 def _verify_name_match(request_if_name: str, uri_if_name: str) -> bool:
     """
@@ -109,11 +119,26 @@ def get_interfaces(device_id):
             }   
         ]
 
+    **Query parameters**
+
+    * `limit`: Maximum number of interfaces to return.
+    * `cursor`: Cursor for the next page, as provided in the `Link` header.
+    * `fields`: Comma separated list of fields to return for each interface.
+    * `mode`: Only return interfaces in this mode.
+    * `admin_enabled`: Only return interfaces in this admin state.
+    * `parent`: Only return child interfaces of this parent interface.
+    * `vrf`: Only return routed interfaces in this VRF.
+
     **Response codes**
 
     * :http:statuscode:`200`
     """
     def verify(driver_response):
+        if listing.is_stream(driver_response):
+            # Streamed objects are verified as they are sent.
+            return True
+        if isinstance(driver_response, an_if.InterfaceTable):
+            return True
         if not isinstance(driver_response, list):
             return False
         for item in driver_response:
@@ -121,10 +146,12 @@ def get_interfaces(device_id):
                 return False
         return True
 
-    response = g.driver.execute('interface', 'read')
+    query = listing.ListQuery.from_request(LIST_FILTERS)
+    response = g.driver.execute('interface', 'read', **query.driver_kwargs(g.driver, 'interface'))
     if not verify(response):
         raise exc.DriverResponseInvalid(g.driver)
-    return autonet_response(response)
+    return listing.list_response(response, query, LIST_FILTERS, key=lambda i: i.name,
+                                 item_type=an_if.Interface, key_column='name')
 
 
 @blueprint.route('/<interface_name>', methods=['GET'])
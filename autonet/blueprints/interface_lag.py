@@ -1,11 +1,14 @@
 from flask import Blueprint, g, request
 
 from autonet.core import exceptions as exc
+from autonet.core import listing
 from autonet.core.objects import lag as an_lag
 from autonet.core.response import autonet_response
 
 blueprint = Blueprint('interface_lag', __name__)
 
+LIST_FILTERS = {}
+
 
 @blueprint.route('', methods=['GET'])
 def get_lags(device_id):
@@ -28,11 +31,20 @@ def get_lags(device_id):
             }
         ]
 
+    **Query parameters**
+
+    * `limit`: Maximum number of LAGs to return.
+    * `cursor`: Cursor for the next page, as provided in the `Link` header.
+    * `fields`: Comma separated list of fields to return for each LAG.
+
     **Response codes**
 
     * :http:statuscode:`200`
     """
     def verify(driver_response):
+        if listing.is_stream(driver_response):
+            # Streamed objects are verified as they are sent.
+            return True
         if not isinstance(driver_response, list):
             return False
         for item in driver_response:
@@ -40,10 +52,12 @@ def get_lags(device_id):
                 return False
         return True
 
-    response = g.driver.execute('interface:lag', 'read')
+    query = listing.ListQuery.from_request(LIST_FILTERS)
+    response = g.driver.execute('interface:lag', 'read', **query.driver_kwargs(g.driver, 'interface:lag'))
     if not verify(response):
         raise exc.DriverResponseInvalid(g.driver)
-    return autonet_response(response)
+    return listing.list_response(response, query, LIST_FILTERS, key=lambda lag: lag.name,
+                                 item_type=an_lag.LAG)
 
 
 @blueprint.route('/<lag_id>', methods=['GET'])
@@ -1,11 +1,16 @@
 from flask import Blueprint, g, request
 
 from autonet.core import exceptions as exc
+from autonet.core import listing
 from autonet.core.objects import vxlan as an_vxlan
 from autonet.core.response import autonet_response
 
 blueprint = Blueprint('tunnels_vxlan', __name__)
 
+LIST_FILTERS = {
+    'vrf': listing.Filter(lambda t: t.bound_object_id if t.layer == 3 else None)
+}
+
 
 @blueprint.route('/vxlan', methods=['GET'])
 def get_tunnels(device_id):
@@ -34,11 +39,21 @@ def get_tunnels(device_id):
             }
         ]
 
+    **Query parameters**
+
+    * `limit`: Maximum number of VXLAN tunnels to return.
+    * `cursor`: Cursor for the next page, as provided in the `Link` header.
+    * `fields`: Comma separated list of fields to return for each tunnel.
+    * `vrf`: Only return layer 3 tunnels bound to this VRF.
+
     **Response codes**
 
     * :http:statuscode:`200`
     """
     def verify(driver_response):
+        if listing.is_stream(driver_response):
+            # Streamed objects are verified as they are sent.
+            return True
         if not isinstance(driver_response, list):
             return False
         for item in driver_response:
@@ -46,10 +61,12 @@ def get_tunnels(device_id):
                 return False
         return True
 
-    result = g.driver.execute('tunnels:vxlan', 'read')
+    query = listing.ListQuery.from_request(LIST_FILTERS)
+    result = g.driver.execute('tunnels:vxlan', 'read', **query.driver_kwargs(g.driver, 'tunnels:vxlan'))
     if not verify(result):
         raise exc.DriverResponseInvalid(g.driver)
-    return autonet_response(result)
+    return listing.list_response(result, query, LIST_FILTERS, key=lambda t: t.id,
+                                 item_type=an_vxlan.VXLAN)
 
 
 @blueprint.route('/vxlan/<vni>', methods=['GET'])
@@ -1,11 +1,14 @@
 from flask import Blueprint, g, request
 
 from autonet.core import exceptions as exc
+from autonet.core import listing
 from autonet.core.objects import vrf as an_vrf
 from autonet.core.response import autonet_response
 
 blueprint = Blueprint('vrf', __name__)
 
+LIST_FILTERS = {}
+
 
 @blueprint.route('', methods=['GET'])
 def get_vrfs(device_id):
@@ -33,11 +36,20 @@ def get_vrfs(device_id):
             }
         ]
 
+    **Query parameters**
+
+    * `limit`: Maximum number of VRFs to return.
+    * `cursor`: Cursor for the next page, as provided in the `Link` header.
+    * `fields`: Comma separated list of fields to return for each VRF.
+
     **Response codes**
 
     * :http:statuscode:`200`
     """
     def verify(driver_response):
+        if listing.is_stream(driver_response):
+            # Streamed objects are verified as they are sent.
+            return True
         if not isinstance(driver_response, list):
             return False
         for item in driver_response:
@@ -45,10 +57,12 @@ def get_vrfs(device_id):
                 return False
         return True
 
-    response = g.driver.execute('vrf', 'read')
+    query = listing.ListQuery.from_request(LIST_FILTERS)
+    response = g.driver.execute('vrf', 'read', **query.driver_kwargs(g.driver, 'vrf'))
     if not verify(response):
         raise exc.DriverResponseInvalid(g.driver)
-    return autonet_response(response)
+    return listing.list_response(response, query, LIST_FILTERS, key=lambda v: v.name,
+                                 item_type=an_vrf.VRF)
 
 
 @blueprint.route('/<vrf_name>', methods=['GET'])
@@ -0,0 +1,200 @@
+"""
+Support for device drivers that implement their capabilities as
+coroutines, for example because they use an asyncio based client
+library, and for handling requests on an event loop.
+
+When Autonet is served by a WSGI server each request is handled by a
+request thread.  Driver coroutines called from it run on a single event
+loop, in a thread of its own, shared by every request handled by the
+process, while the request thread waits for them to complete.
+
+When Autonet is served by an ASGI server, see :py:mod:`autonet.core.asgi`,
+each request is handled in a greenlet on the server's event loop.  A
+driver execution made by the request is awaited on that loop by
+:py:meth:`DeviceDriver.execute_async()`, while the request's greenlet is
+suspended, so requests waiting on devices do not hold a thread each.
+Synchronous capability functions are then run in a thread pool.  This
+requires the `greenlet` package, installed with the `asgi` extra.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import sys
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from conf_engine.options import NumberOption
+from contextlib import ExitStack
+from typing import Awaitable, Callable, ContextManager, Coroutine
+
+from autonet.config import config
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+opts = [
+    NumberOption('sync_threads', minimum=1, default=32)
+]
+config.register_options(opts, 'driver')
+
+_lock = threading.Lock()
+_loop = None
+_executor = None
+_pid = None
+
+
+def _reset_after_fork():
+    # The loop thread and pool threads do not survive a fork, so a
+    # forked worker process starts its own.
+    global _loop, _executor, _pid
+    if _pid != os.getpid():
+        _loop = _executor = None
+        _pid = os.getpid()
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process wide driver event loop, starting it if required.
+
+    :return:
+    """
+    global _loop
+    with _lock:
+        _reset_after_fork()
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='autonet-driver-loop',
+                             daemon=True).start()
+        return _loop
+
+
+def executor() -> ThreadPoolExecutor:
+    """
+    Returns the process wide thread pool in which synchronous code is run
+    on behalf of coroutines.  Its size is set by the `[driver]`
+    `sync_threads` option.
+
+    :return:
+    """
+    global _executor
+    with _lock:
+        _reset_after_fork()
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.driver.sync_threads,
+                                           thread_name_prefix='autonet-sync')
+        return _executor
+
+
+def run(coro: Coroutine):
+    """
+    Run a coroutine on the driver event loop and wait for its result.
+    This must be called from synchronous code.
+
+    :param coro: The coroutine.
+    :return:
+    """
+    loop = event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError('aio.run() cannot be called from the driver event loop.')
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def run_sync(func: Callable, *args, **kwargs):
+    """
+    Run a synchronous function in the thread pool, in a copy of the
+    current context, and await its result.
+
+    :param func: The function to execute.
+    :return:
+    """
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+async def enter_context(stack: ExitStack, context: ContextManager):
+    """
+    Enter a synchronous context manager onto an exit stack in the thread
+    pool, so that waiting to enter it does not block the event loop.  If
+    the awaiting task is cancelled the context manager is still entered,
+    to be exited along with the rest of the stack.
+
+    :param stack: The exit stack.
+    :param context: The context manager.
+    :return:
+    """
+    future = asyncio.ensure_future(run_sync(stack.enter_context, context))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+if greenlet is not None:
+    class _SpawnedGreenlet(greenlet.greenlet):
+        """
+        A greenlet started by :py:func:`spawn()`, which may :py:func:`wait()`.
+        """
+
+
+def waiting_allowed() -> bool:
+    """
+    Returns `True` if called from a greenlet started by :py:func:`spawn()`,
+    and so :py:func:`wait()` may be used.
+
+    :return:
+    """
+    return greenlet is not None and isinstance(greenlet.getcurrent(), _SpawnedGreenlet)
+
+
+def wait(awaitable: Awaitable):
+    """
+    Wait for an awaitable from synchronous code called by :py:func:`spawn()`.
+    The calling greenlet is suspended while the awaitable is awaited on
+    the event loop, which meanwhile runs other tasks.
+
+    :param awaitable: The awaitable, such as a coroutine.
+    :return:
+    """
+    if not waiting_allowed():
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise RuntimeError('aio.wait() must be called from a function called by aio.spawn().')
+    return greenlet.getcurrent().parent.switch(awaitable)
+
+
+async def spawn(func: Callable, *args, **kwargs):
+    """
+    Call a synchronous function in a greenlet, in a copy of the current
+    context, and await its result.  Any awaitable passed to
+    :py:func:`wait()` by the function is awaited on the running event
+    loop, as a task of its own.
+
+    :param func: The function to call.
+    :return:
+    """
+    if greenlet is None:
+        raise RuntimeError('aio.spawn() requires the greenlet package.')
+    child = _SpawnedGreenlet(functools.partial(func, *args, **kwargs), greenlet.getcurrent())
+    child.gr_context = contextvars.copy_context()
+    result = child.switch()
+    while not child.dead:
+        try:
+            # Await in the context of the function rather than that of
+            # the calling task, so that the awaitable sees the context
+            # variables the function has set, such as Flask's.
+            value = await child.gr_context.run(asyncio.ensure_future, result)
+        except BaseException:
+            result = child.throw(*sys.exc_info())
+        else:
+            result = child.switch(value)
+    return result
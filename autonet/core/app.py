@@ -5,7 +5,10 @@ from conf_engine.options import NumberOption, StringOption
 from flask import g, Flask, request
 from uuid import uuid4
 
-from autonet.core.response import autonet_response
+from autonet.core import batch, idempotency, ratelimit
+from autonet.core.compression import compress_response
+from autonet.core.response import autonet_response, CONDITIONAL_METHODS, version_etag
+from autonet.blueprints.batch import blueprint as batch_blueprint
 from autonet.blueprints.bridge_vlan import blueprint as bridge_vlan_blueprint
 from autonet.blueprints.interface import blueprint as interfaces_blueprint
 from autonet.blueprints.interface_lag import blueprint as interface_lag_blueprint
@@ -15,9 +18,12 @@ from autonet.blueprints.vrf import blueprint as vrf_blueprint
 from autonet.blueprints.users import blueprint as admin_users_blueprint
 from autonet.config import config
 from autonet.db import init_db
-from autonet.core.exceptions import AutonetException
+from autonet.core.exceptions import AutonetException, RateLimitExceeded, RequestValueError
 from autonet.core.logging import setup_logging
 from autonet.core.marshal import marshal_device, marshal_driver
+from autonet.core.metrics import metrics
+from autonet.core.serialization import AutonetJSONProvider
+from autonet.core.server import run_production_server
 from autonet.db import Session
 from autonet.db.models import Tokens, Users
 from autonet.util.auth import verify_password
@@ -29,7 +35,9 @@ opts = [
 config.register_options(opts)
 
 flask_app = Flask(__name__, static_folder=None)
+flask_app.json = AutonetJSONProvider(flask_app)
 flask_app.register_blueprint(options_blueprint, url_prefix='/')
+flask_app.register_blueprint(batch_blueprint, url_prefix='/batch')
 flask_app.register_blueprint(bridge_vlan_blueprint, url_prefix='/<device_id>/bridge/vlans')
 flask_app.register_blueprint(interfaces_blueprint, url_prefix='/<device_id>/interfaces')
 flask_app.register_blueprint(interface_lag_blueprint, url_prefix='/<device_id>/interfaces/lags')
@@ -45,7 +53,10 @@ setup_logging()
 def run_wsgi_app():
     logging.info("Application started via CLI.")
     init_db()
-    flask_app.run(config.bind_host, config.port)
+    if config.server.mode == 'production':
+        run_production_server(flask_app)
+    else:
+        flask_app.run(config.bind_host, config.port)
 
 
 @flask_app.before_request
@@ -64,28 +75,159 @@ def setup_device_object():
     :return:
     """
     if request.view_args and 'device_id' in request.view_args:
-        g.device = marshal_device(request.view_args['device_id'])
-        driver = marshal_driver('autonet.drivers', g.device.driver)
-        g.driver = driver(g.device)
+        device_id = request.view_args['device_id']
+        batch_context = request.environ.get(batch.ENVIRON_KEY)
+        with metrics.timer('request.marshal'):
+            if batch_context is not None and device_id in batch_context.devices:
+                g.device = batch_context.devices[device_id]
+            else:
+                g.device = marshal_device(device_id)
+                if batch_context is not None:
+                    batch_context.devices[device_id] = g.device
+            driver = marshal_driver('autonet.drivers', g.device.driver)
+            g.driver = driver(g.device)
 
 
 @flask_app.before_request
 def auth_user():
+    batch_context = request.environ.get(batch.ENVIRON_KEY)
+    if batch_context is not None:
+        # Sub-requests of a batch were authenticated with the batch.
+        g.user = batch_context.user
+        g.token_id = batch_context.token_id
+        return
     key_header = request.headers.get('X-API-Key').split(':')
     if not len(key_header) == 2:
         g.errors.append('X-API-Key format is "username:token".')
     else:
         user = key_header[0]
         token = key_header[1]
-        with Session() as s:
+        with metrics.timer('request.auth'), Session() as s:
             for t in s.query(Tokens).join(Users).where(Users.username == user).all():
                 if verify_password(token, t.token):
+                    g.user = user
+                    g.token_id = t.id
                     return
 
     g.errors.append('X-API-Key is unset or invalid')
     return autonet_response(None, 401)
 
 
+@flask_app.before_request
+def rate_limit():
+    """
+    Middleware will reject a request with a `429` if the authenticated
+    client has exceeded its rate limit.  See
+    :py:mod:`autonet.core.ratelimit`.
+
+    :return:
+    """
+    g.rate_limit = ratelimit.check()
+    if g.rate_limit is not None and not g.rate_limit.allowed:
+        raise RateLimitExceeded(g.rate_limit.retry_after)
+
+
+@flask_app.before_request
+def idempotent_request():
+    """
+    Middleware will answer a request that modifies objects and carries
+    an `Idempotency-Key` header with the stored response of the first
+    request made with the key, if any, without executing it again.
+    Otherwise, the key is reserved for this request until its response
+    is stored.  See :py:mod:`autonet.core.idempotency`.
+
+    :return:
+    """
+    key = request.headers.get(idempotency.HEADER)
+    store = idempotency.idempotency_store()
+    if key is None or request.method not in idempotency.METHODS or store is None:
+        return
+    if not 0 < len(key) <= idempotency.MAX_KEY_LENGTH:
+        raise RequestValueError(idempotency.HEADER, key,
+                                [f'1 to {idempotency.MAX_KEY_LENGTH} characters'])
+    fingerprint = idempotency.fingerprint()
+    stored = store.begin(g.user, key, fingerprint)
+    if stored is not None:
+        return stored.to_response()
+    g.idempotency = (key, fingerprint)
+
+
+@flask_app.before_request
+def conditional_get():
+    """
+    Middleware will answer a conditional GET for a device resource with
+    a `304` without reading from the device, if the device's driver can
+    report a configuration version that matches the `If-None-Match`
+    header.
+
+    :return:
+    """
+    if request.method not in CONDITIONAL_METHODS or 'driver' not in g:
+        return
+    version = g.driver.get_config_version()
+    if version is None:
+        return
+    g.etag = version_etag(g.device.device_id, version)
+    if request.if_none_match.contains_weak(g.etag):
+        return autonet_response()
+
+
+@flask_app.after_request
+def rate_limit_headers(response):
+    """
+    Middleware will report the client's rate limit in the response
+    headers when a limit applies to the request.
+
+    :return:
+    """
+    if g.get('rate_limit') is not None:
+        g.rate_limit.set_headers(response)
+    return response
+
+
+@flask_app.after_request
+def compress(response):
+    """
+    Middleware will compress the response body when the client accepts
+    a supported content encoding.  See :py:mod:`autonet.core.compression`.
+
+    :return:
+    """
+    return compress_response(response)
+
+
+@flask_app.after_request
+def store_idempotent_response(response):
+    """
+    Middleware will store the response to a request whose idempotency
+    key it holds, before the response is compressed, or release the key
+    if the response reports a transient error.
+
+    :return:
+    """
+    if 'idempotency' in g:
+        key, fingerprint = g.pop('idempotency')
+        store = idempotency.idempotency_store()
+        if idempotency.storable(response):
+            store.complete(g.user, key, idempotency.StoredResponse.from_response(fingerprint, response))
+        else:
+            store.release(g.user, key)
+    return response
+
+
+@flask_app.teardown_request
+def release_idempotency_key(e=None):
+    """
+    Middleware will release an idempotency key held by a request that
+    ended without its response being stored.
+
+    :return:
+    """
+    if 'idempotency' in g:
+        key, _ = g.pop('idempotency')
+        idempotency.idempotency_store().release(g.user, key)
+
+
 @flask_app.errorhandler(Exception)
 def append_exception_to_errors(e):
     if config.debug:
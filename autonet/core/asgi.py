@@ -0,0 +1,134 @@
+"""
+ASGI entry point for Autonet, exposing the same endpoints as the WSGI
+application.  It may be served by any ASGI server, for example::
+
+    ~# uvicorn autonet.core.asgi:asgi_app
+
+Each request is handled in a greenlet on the server's event loop.
+Driver executions made by the request are awaited on the loop while the
+request's greenlet is suspended, so a single server thread may have any
+number of requests waiting on devices.  Drivers implemented as
+coroutines are awaited on the loop itself, and synchronous drivers are
+run in a thread pool.  See :py:mod:`autonet.core.aio`.
+
+The rest of the request, including authentication and device lookups in
+the database, runs on the loop.  This requires the `greenlet` package,
+installed with the `asgi` extra.
+"""
+import io
+import logging
+import sys
+
+from autonet.core import aio
+from autonet.core.app import flask_app
+
+
+def build_environ(scope: dict, body: bytes) -> dict:
+    """
+    Build a WSGI environment from an ASGI HTTP connection scope.
+
+    :param scope: The connection scope.
+    :param body: The request body.
+    :return:
+    """
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+        environ['REMOTE_PORT'] = str(scope['client'][1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ['CONTENT_TYPE', 'CONTENT_LENGTH']:
+            environ[name] = value
+            continue
+        name = f'HTTP_{name}'
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    if body and 'CONTENT_LENGTH' not in environ:
+        # The body of a chunked request has been read in full.
+        environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+class ASGIAdapter(object):
+    """
+    Serves a WSGI application over ASGI, calling the application in a
+    greenlet with :py:func:`autonet.core.aio.spawn()` and sending the
+    response to the client as it is produced.
+
+    :param wsgi_app: The WSGI application.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def _run(self, environ: dict, send):
+        response = {}
+
+        def start_response(status: str, headers: list, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1'))
+                                   for k, v in headers]
+
+        body = self.wsgi_app(environ, start_response)
+        try:
+            started = False
+            for chunk in body:
+                if not chunk:
+                    continue
+                if not started:
+                    aio.wait(send({'type': 'http.response.start', **response}))
+                    started = True
+                aio.wait(send({'type': 'http.response.body', 'body': chunk, 'more_body': True}))
+            if not started:
+                aio.wait(send({'type': 'http.response.start', **response}))
+            aio.wait(send({'type': 'http.response.body', 'body': b''}))
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+    async def __call__(self, scope: dict, receive, send):
+        if scope['type'] == 'lifespan':
+            return await _lifespan(receive, send)
+        if scope['type'] != 'http':
+            logging.warning(f"Unsupported ASGI connection type {scope['type']}")
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        await aio.spawn(self._run, build_environ(scope, body), send)
+
+
+asgi_app = ASGIAdapter(flask_app)
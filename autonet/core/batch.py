@@ -0,0 +1,164 @@
+"""
+Execution of batch requests, which carry a list of sub-requests that
+are each dispatched through the application as though they had been
+made individually.  The sub-requests share the batch's authentication
+and each device is looked up in the backend once per batch.
+
+Sub-requests that target the same device are executed in order, one
+after another.  Those that target different devices are executed in
+parallel, as are requests that do not target a device relative to
+device requests.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from conf_engine.options import NumberOption
+from dataclasses import dataclass, field
+from flask import Flask
+from typing import Any, Dict, List, Optional
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+from autonet.config import config
+from autonet.core import exceptions as exc
+
+opts = [
+    NumberOption('max_requests', minimum=1, default=100),
+    NumberOption('max_parallel', minimum=1, default=8)
+]
+config.register_options(opts, 'batch')
+
+ENVIRON_KEY = 'autonet.batch'
+METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+
+@dataclass
+class BatchContext(object):
+    """
+    State shared by the sub-requests of a batch.
+
+    :param user: The authenticated user name.
+    :param token_id: The ID of the token the batch was authenticated with.
+    :param devices: Devices looked up by the sub-requests, by device ID.
+    """
+    user: str
+    token_id: Any = field(default=None)
+    devices: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SubRequest(object):
+    method: str
+    path: str
+    body: Any = field(default=None)
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, index: int, data: Any) -> 'SubRequest':
+        """
+        Build a sub-request from its representation in the batch request
+        body.
+
+        :param index: The position of the sub-request in the batch.
+        :param data: The sub-request.
+        :return:
+        """
+        name = f'[{index}]'
+        if not isinstance(data, dict):
+            raise exc.RequestTypeError(name, data, 'object')
+        for key in ['method', 'path']:
+            if key not in data:
+                raise exc.RequestValueMissing(f'{name}.{key}')
+        method = data['method'].upper() if isinstance(data['method'], str) else data['method']
+        if method not in METHODS:
+            raise exc.RequestValueError(f'{name}.method', data['method'], METHODS)
+        path = data['path']
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise exc.RequestValueError(f'{name}.path', path)
+        if path.split('?')[0].rstrip('/') == '/batch':
+            raise exc.RequestValueError(f'{name}.path', path)
+        headers = data.get('headers') or {}
+        if not isinstance(headers, dict) \
+                or not all(isinstance(v, str) for v in headers.values()):
+            raise exc.RequestTypeError(f'{name}.headers', headers, 'object')
+        return cls(method=method, path=path, body=data.get('body'), headers=headers)
+
+
+def device_id(app: Flask, sub_request: SubRequest) -> Optional[str]:
+    """
+    Returns the ID of the device targeted by the sub-request, if any.
+
+    :param app: The application.
+    :param sub_request: The sub-request.
+    :return:
+    """
+    try:
+        _, args = app.url_map.bind('localhost').match(
+            sub_request.path.split('?')[0], sub_request.method)
+    except HTTPException:
+        return None
+    return args.get('device_id')
+
+
+def dispatch(app: Flask, sub_request: SubRequest, context: BatchContext,
+             base_url: str) -> dict:
+    """
+    Dispatch a sub-request through the application and return its
+    response envelope.
+
+    :param app: The application.
+    :param sub_request: The sub-request.
+    :param context: The batch context.
+    :param base_url: The base URL of the batch request.
+    :return:
+    """
+    headers = {**sub_request.headers, 'Accept': 'application/json'}
+    headers.pop('Accept-Encoding', None)
+    builder = EnvironBuilder(path=sub_request.path, base_url=base_url,
+                             method=sub_request.method, headers=headers,
+                             json=sub_request.body if sub_request.body is not None else None)
+    environ = builder.get_environ()
+    environ[ENVIRON_KEY] = context
+    with app.request_context(environ):
+        response = app.full_dispatch_request()
+    try:
+        envelope = response.get_json(silent=True)
+    finally:
+        response.close()
+    if envelope is None:
+        # Responses such as a `304` carry no envelope.
+        envelope = {'request-id': None, 'data': None, 'errors': [],
+                    'status': response.status_code}
+    return envelope
+
+
+def execute(app: Flask, sub_requests: List[SubRequest], context: BatchContext,
+            base_url: str) -> List[dict]:
+    """
+    Execute the sub-requests of a batch, returning their response
+    envelopes in the order of the sub-requests.
+
+    :param app: The application.
+    :param sub_requests: The sub-requests.
+    :param context: The batch context.
+    :param base_url: The base URL of the batch request.
+    :return:
+    """
+    if len(sub_requests) > config.batch.max_requests:
+        raise exc.RequestValueError('batch', f'{len(sub_requests)} requests',
+                                    [f'at most {config.batch.max_requests} requests'])
+    groups = {}
+    for index, sub_request in enumerate(sub_requests):
+        groups.setdefault(device_id(app, sub_request), []).append(index)
+
+    results = [None] * len(sub_requests)
+
+    def run_group(indexes: List[int]):
+        for i in indexes:
+            results[i] = dispatch(app, sub_requests[i], context, base_url)
+
+    if len(groups) == 1:
+        run_group(next(iter(groups.values())))
+        return results
+    with ThreadPoolExecutor(max_workers=min(len(groups), config.batch.max_parallel)) as pool:
+        for future in [pool.submit(run_group, g) for g in groups.values()]:
+            future.result()
+    return results
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from conf_engine.options import BooleanOption, NumberOption
+from typing import Hashable, Optional, Tuple, Union
+
+from autonet.config import config
+
+opts = [
+    NumberOption('read_cache_ttl', minimum=0, default=0, cast=float),
+    NumberOption('read_cache_size', minimum=1, default=1024),
+    BooleanOption('read_cache_per_worker', default=False)
+]
+config.register_options(opts, 'driver')
+
+
+class ReadCache(object):
+    """
+    A per-process, time limited, LRU cache of driver read results.
+    Entries are keyed by the driver execution key, the first element of
+    which must be the device ID.
+
+    Each device has a generation counter which is incremented whenever
+    the device's entries are invalidated.  A read result is only stored
+    if the generation is unchanged since the read began, so that a read
+    racing with a write cannot repopulate the cache with stale data.
+
+    Cached values are returned by reference, and must not be modified
+    by the caller.  The cache is not shared between worker processes,
+    so a write only invalidates the entries of the worker that handled
+    it, and other workers may return results up to `ttl` seconds old.
+
+    A `ttl` of `0` disables the cache.
+    """
+
+    def __init__(self, ttl: float = 0, size: int = 1024):
+        """
+        :param ttl: Seconds for which a read result remains valid.
+        :param size: Maximum number of cached read results.
+        """
+        self.ttl = ttl
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def generation(self, device_id: Union[str, int]) -> int:
+        """
+        Returns the current generation of the device's cache entries.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            return self._generations.get(device_id, 0)
+
+    def get(self, key: Hashable) -> Optional[Tuple[object, float]]:
+        """
+        Returns a tuple of the cached value and its age in seconds, or
+        `None` if there is no valid entry for the key.
+
+        :param key: The execution key.
+        :return:
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored = entry
+            age = time.monotonic() - stored
+            if age >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return value, age
+
+    def set(self, key: Hashable, value: object, generation: int):
+        """
+        Store a read result, unless the device's entries were
+        invalidated since `generation` was retrieved.
+
+        :param key: The execution key.
+        :param value: The read result.
+        :param generation: The device generation when the read began.
+        :return:
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, device_id: Union[str, int]):
+        """
+        Remove all cached read results for a device.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            self._generations[device_id] = self._generations.get(device_id, 0) + 1
+            for key in [k for k in self._entries if k[0] == device_id]:
+                del self._entries[key]
+        logging.debug(f'Invalidated cached reads for device_id: {device_id}')
+
+
+_read_cache = None
+
+
+def configure(workers: int):
+    """
+    Check that the read cache may be used by the given number of worker
+    processes.  Since a write only invalidates the cache of the worker
+    that handled it, other workers would serve stale reads for up to
+    `read_cache_ttl` seconds.  Raises `RuntimeError` if the cache is
+    enabled for more than one worker, unless the `[driver]`
+    `read_cache_per_worker` option accepts this.
+
+    :param workers: The number of worker processes.
+    :return:
+    """
+    if workers > 1 and config.driver.read_cache_ttl and not config.driver.read_cache_per_worker:
+        raise RuntimeError('The read cache is not shared between worker processes, so a write '
+                           'does not invalidate the cached reads of other workers.  Set '
+                           '`read_cache_per_worker` to accept this, or disable the cache.')
+
+
+def read_cache() -> ReadCache:
+    """
+    Returns the process wide :py:class:`ReadCache` as configured by
+    the `[driver]` configuration options.
+
+    :return:
+    """
+    global _read_cache
+    if _read_cache is None:
+        _read_cache = ReadCache(ttl=config.driver.read_cache_ttl,
+                                size=config.driver.read_cache_size)
+    return _read_cache
@@ -0,0 +1,131 @@
+"""
+Negotiated compression of API responses.  Responses are compressed with
+the best encoding the client accepts, according to the `Accept-Encoding`
+request header, from brotli (when the `brotli` package is installed),
+gzip and deflate.  Responses smaller than the `[response]`
+`compression_min_size` option are sent uncompressed, while streamed
+responses, the size of which is not known in advance, are always
+compressed as they are sent.
+"""
+import zlib
+
+from conf_engine.options import BooleanOption, NumberOption
+from flask import request, Response
+from typing import Iterable, Optional
+
+from autonet.config import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+opts = [
+    BooleanOption('compression', default=True),
+    NumberOption('compression_min_size', minimum=0, default=1024),
+    NumberOption('compression_level', minimum=1, maximum=9, default=6),
+    NumberOption('brotli_quality', minimum=0, maximum=11, default=4)
+]
+config.register_options(opts, 'response')
+
+COMPRESSIBLE_MIMETYPES = ['application/json', 'application/msgpack', 'application/cbor']
+
+
+class _Compressor(object):
+    """
+    Provides incremental compression with a common interface for the
+    zlib and brotli compressors.
+    """
+
+    def __init__(self, encoding: str):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=config.response.brotli_quality)
+            self.compress = compressor.process
+            self.flush = compressor.flush
+            self.finish = compressor.finish
+        else:
+            # HTTP's deflate encoding is the zlib format, wbits of 31
+            # selects the gzip format instead.
+            wbits = 31 if encoding == 'gzip' else 15
+            compressor = zlib.compressobj(config.response.compression_level, zlib.DEFLATED, wbits)
+            self.compress = compressor.compress
+            self.flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = compressor.flush
+
+
+def available_encodings() -> list:
+    """
+    Returns the supported content encodings in order of preference.
+
+    :return:
+    """
+    encodings = ['gzip', 'deflate']
+    if brotli is not None:
+        encodings.insert(0, 'br')
+    return encodings
+
+
+def negotiate_encoding() -> Optional[str]:
+    """
+    Returns the preferred content encoding accepted by the client, or
+    `None` if the response should not be compressed.
+
+    :return:
+    """
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def _compress_stream(chunks: Iterable, compressor: _Compressor):
+    """
+    Compresses a streamed response body, flushing the compressor after
+    each chunk so that the client receives data as it is produced.
+
+    :param chunks: The response body.
+    :param compressor: The compressor.
+    :return:
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            yield compressor.compress(chunk) + compressor.flush()
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compresses the response body if it is compressible, large enough,
+    and the client accepts a supported encoding.  Entity tags are made
+    weak, as the compressed representation is not byte for byte the one
+    they were calculated for.
+
+    :param response: The response object.
+    :return:
+    """
+    if not config.response.compression or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.status_code < 200 or response.status_code in [204, 304] \
+            or request.method == 'HEAD' or 'Content-Encoding' in response.headers:
+        return response
+    if response.content_length is not None \
+            and response.content_length < config.response.compression_min_size:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    compressor = _Compressor(encoding)
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(compressor.compress(response.get_data()) + compressor.finish())
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -77,6 +77,30 @@ class DriverOperationUnsupported(AutonetException):
         super().__init__(f"Device driver {driver} does not support {operation}")
 
 
+class DeviceBusy(AutonetException):
+    """
+    Raised when a device has reached its limit of concurrent driver
+    executions and the request could not be queued.
+    """
+
+    def __init__(self, device_id, retry_after: int = 1):
+        self.retry_after = retry_after
+        super().__init__(f"Device device_id: {device_id} is busy.  Retry "
+                         f"the request in {retry_after} seconds.")
+
+
+class RateLimitExceeded(AutonetException):
+    """
+    Raised when a client has made more requests than its rate limit
+    allows.
+    """
+
+    def __init__(self, retry_after: int = 1):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded.  Retry the request in "
+                         f"{retry_after} seconds.")
+
+
 class DriverResponseInvalid(AutonetException):
     """
     Raised when a device driver returns a value that was unexpected or
@@ -154,3 +178,24 @@ class ObjectExists(AutonetException):
 
     def __init__(self, name: str = None):
         super().__init__(f"Object {name + ' ' if name else ''}already exists.")
+
+
+class IdempotencyKeyMismatch(AutonetException):
+    """
+    Raised when an idempotency key is reused for a request other than
+    the one it was first used for.
+    """
+
+    def __init__(self, key):
+        super().__init__(f"Idempotency key '{key}' was used for a different request.")
+
+
+class IdempotencyKeyInProgress(AutonetException):
+    """
+    Raised when a request with an idempotency key is still being
+    executed and a repeated request timed out waiting for it.
+    """
+
+    def __init__(self, key):
+        super().__init__(f"A request with idempotency key '{key}' is in progress.  "
+                         f"Retry the request later.")
@@ -0,0 +1,335 @@
+"""
+Support for the `Idempotency-Key` request header on requests that
+modify objects.  The first response to a request carrying a key is
+stored, keyed by the user and the key, and a repeated request with the
+same key is answered with the stored response without executing it
+again.  A repeated request that arrives while the first is still being
+executed waits for it to complete.
+
+Clients that time out waiting for a slow device and retry the request
+can therefore do so safely, without repeating the change on the device.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from conf_engine.options import NumberOption, StringOption
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from flask import request, Response
+from typing import List, Optional, Tuple
+
+from autonet.config import config
+from autonet.core import exceptions as exc
+from autonet.core.metrics import metrics
+
+opts = [
+    StringOption('store', default='local', choices=['none', 'local', 'database']),
+    NumberOption('ttl', minimum=1, default=86400),
+    NumberOption('timeout', minimum=0, default=30, cast=float),
+    NumberOption('lease', minimum=1, default=300),
+    NumberOption('size', minimum=1, default=10000)
+]
+config.register_options(opts, 'idempotency')
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+METHODS = ['POST', 'PUT', 'PATCH', 'DELETE']
+MAX_KEY_LENGTH = 255
+# The size of the `body` column of the `idempotency_keys` table.
+MAX_BODY_SIZE = 2 ** 24 - 1
+POLL_INTERVAL = 0.05
+
+# Headers that are recalculated when a stored response is sent.
+_EXCLUDED_HEADERS = ['Content-Length', 'Content-Type', 'Content-Encoding']
+
+
+@dataclass
+class StoredResponse(object):
+    """
+    A response stored for an idempotency key.  A `status` of `None`
+    indicates that the request is still being executed.
+
+    :param fingerprint: Identifies the request the key was first used with.
+    :param status: The response status.
+    :param mimetype: The response mimetype.
+    :param headers: The response headers.
+    :param body: The response body.
+    """
+    fingerprint: str
+    status: Optional[int] = field(default=None)
+    mimetype: Optional[str] = field(default=None)
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    body: bytes = field(default=b'')
+
+    @classmethod
+    def from_response(cls, fingerprint: str, response: Response) -> 'StoredResponse':
+        headers = [(k, v) for k, v in response.headers.items() if k not in _EXCLUDED_HEADERS]
+        return cls(fingerprint=fingerprint, status=response.status_code,
+                   mimetype=response.mimetype, headers=headers, body=response.get_data())
+
+    def to_response(self) -> Response:
+        response = Response(self.body, status=self.status, mimetype=self.mimetype,
+                            headers=self.headers)
+        response.headers[REPLAYED_HEADER] = 'true'
+        return response
+
+
+def fingerprint() -> str:
+    """
+    Returns a digest identifying the current request by its method, path
+    and body, so that reuse of a key for a different request is detected.
+
+    :return:
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in [request.method.encode(), request.full_path.encode(), request.get_data()]:
+        digest.update(part + b'\0')
+    return digest.hexdigest()
+
+
+def storable(response: Response) -> bool:
+    """
+    Returns `True` if the response should be stored and replayed.
+    Server errors and responses to busy devices are transient, so the
+    key is released and a retry is executed afresh.  So is a response
+    too large to be stored.
+
+    :param response: The response object.
+    :return:
+    """
+    return (response.status_code < 500 and response.status_code != 429
+            and len(response.get_data()) <= MAX_BODY_SIZE)
+
+
+class IdempotencyStore(object):
+    """
+    Base class for stores of responses by idempotency key.  Child classes
+    implement :py:meth:`_try_reserve()`, :py:meth:`_complete()` and
+    :py:meth:`_release()`; this class implements waiting for in-flight
+    requests and time-outs.
+
+    The base class itself stores nothing.
+    """
+
+    def __init__(self, timeout: float = 30):
+        """
+        :param timeout: Seconds to wait for an in-flight request with the
+            same key before giving up.
+        """
+        self.timeout = timeout
+
+    def _try_reserve(self, user: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Reserve the key for a request without blocking.  Returns `None`
+        if the key was reserved, otherwise the response stored for the
+        key, which is incomplete if its request is in flight.
+
+        :param user: The user name.
+        :param key: The idempotency key.
+        :param fingerprint: The request fingerprint.
+        :return:
+        """
+        return None
+
+    def _complete(self, user: str, key: str, stored: StoredResponse):
+        """
+        Store the response for a key previously reserved by
+        :py:meth:`_try_reserve()`.
+
+        :param user: The user name.
+        :param key: The idempotency key.
+        :param stored: The response to be stored.
+        :return:
+        """
+        pass
+
+    def _release(self, user: str, key: str):
+        """
+        Release a key previously reserved by :py:meth:`_try_reserve()`
+        without storing a response.
+
+        :param user: The user name.
+        :param key: The idempotency key.
+        :return:
+        """
+        pass
+
+    def begin(self, user: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Reserve the key for a request.  Returns `None` if the caller now
+        holds the key, and must :py:meth:`complete()` or
+        :py:meth:`release()` it, otherwise the stored response of the
+        first request with the key, waiting for it if it is in flight.
+
+        Raises :py:exc:`IdempotencyKeyMismatch` if the key was first used
+        for a different request, and :py:exc:`IdempotencyKeyInProgress`
+        if the first request does not complete within the timeout.
+
+        :param user: The user name.
+        :param key: The idempotency key.
+        :param fingerprint: The request fingerprint.
+        :return:
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        while True:
+            stored = self._try_reserve(user, key, fingerprint)
+            if stored is None:
+                return None
+            if stored.fingerprint != fingerprint:
+                raise exc.IdempotencyKeyMismatch(key)
+            if stored.status is not None:
+                metrics.observe('idempotency.replay', time.perf_counter() - start)
+                logging.debug(f'Replaying stored response for idempotency key {key}')
+                return stored
+            if time.perf_counter() >= deadline:
+                raise exc.IdempotencyKeyInProgress(key)
+            time.sleep(POLL_INTERVAL)
+
+    def complete(self, user: str, key: str, stored: StoredResponse):
+        self._complete(user, key, stored)
+
+    def release(self, user: str, key: str):
+        self._release(user, key)
+
+
+class LocalIdempotencyStore(IdempotencyStore):
+    """
+    Stores responses in memory, for requests handled by this process.
+    The least recently used responses are discarded once `size` are
+    stored.
+    """
+
+    def __init__(self, ttl: int = 86400, lease: int = 300, size: int = 10000, **kwargs):
+        """
+        :param ttl: Seconds for which a response is stored.
+        :param lease: Seconds after which an in-flight request is
+            considered abandoned and its key may be reused.
+        :param size: Maximum number of stored responses.
+        """
+        super().__init__(**kwargs)
+        self.ttl = ttl
+        self.lease = lease
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _try_reserve(self, user: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((user, key))
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end((user, key))
+                return entry[0]
+            self._entries[(user, key)] = (StoredResponse(fingerprint), now + self.lease)
+            self._entries.move_to_end((user, key))
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return None
+
+    def _complete(self, user: str, key: str, stored: StoredResponse):
+        with self._lock:
+            self._entries[(user, key)] = (stored, time.monotonic() + self.ttl)
+
+    def _release(self, user: str, key: str):
+        with self._lock:
+            self._entries.pop((user, key), None)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Stores responses in the `idempotency_keys` table of the Autonet
+    database, for requests handled by all processes sharing it.
+    """
+
+    def __init__(self, ttl: int = 86400, lease: int = 300, **kwargs):
+        """
+        :param ttl: Seconds for which a response is stored.
+        :param lease: Seconds after which an in-flight request is
+            considered abandoned and its key may be reused.
+        """
+        super().__init__(**kwargs)
+        self.ttl = ttl
+        self.lease = lease
+
+    @staticmethod
+    def _now() -> datetime:
+        # Expiry times are stored as naive UTC.
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _try_reserve(self, user: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        from sqlalchemy import delete
+        from sqlalchemy.exc import IntegrityError
+        from autonet.db import Session
+        from autonet.db.models import IdempotencyKeys
+
+        now = self._now()
+        with Session() as s:
+            s.execute(delete(IdempotencyKeys).where(IdempotencyKeys.username == user,
+                                                    IdempotencyKeys.key == key,
+                                                    IdempotencyKeys.expires_on < now))
+            s.add(IdempotencyKeys(username=user, key=key, fingerprint=fingerprint,
+                                  expires_on=now + timedelta(seconds=self.lease)))
+            try:
+                s.commit()
+                return None
+            except IntegrityError:
+                s.rollback()
+            row = s.get(IdempotencyKeys, (user, key))
+        if row is None:
+            # Released since the reservation was attempted, so poll again.
+            return StoredResponse(fingerprint)
+        return StoredResponse(fingerprint=row.fingerprint, status=row.status,
+                              mimetype=row.mimetype, headers=json.loads(row.headers or '[]'),
+                              body=row.body or b'')
+
+    def _complete(self, user: str, key: str, stored: StoredResponse):
+        from sqlalchemy import update
+        from autonet.db import Session
+        from autonet.db.models import IdempotencyKeys
+
+        with Session() as s:
+            s.execute(update(IdempotencyKeys).where(
+                IdempotencyKeys.username == user, IdempotencyKeys.key == key).values(
+                status=stored.status, mimetype=stored.mimetype,
+                headers=json.dumps(stored.headers), body=stored.body,
+                expires_on=self._now() + timedelta(seconds=self.ttl)))
+            s.commit()
+
+    def _release(self, user: str, key: str):
+        from sqlalchemy import delete
+        from autonet.db import Session
+        from autonet.db.models import IdempotencyKeys
+
+        with Session() as s:
+            s.execute(delete(IdempotencyKeys).where(IdempotencyKeys.username == user,
+                                                    IdempotencyKeys.key == key,
+                                                    IdempotencyKeys.status.is_(None)))
+            s.commit()
+
+
+_store = None
+
+
+def idempotency_store() -> Optional[IdempotencyStore]:
+    """
+    Returns the process wide :py:class:`IdempotencyStore` as configured
+    by the `[idempotency]` configuration options, or `None` if
+    idempotency keys are disabled.
+
+    :return:
+    """
+    global _store
+    if _store is None and config.idempotency.store != 'none':
+        backend = config.idempotency.store
+        kwargs = {'ttl': config.idempotency.ttl, 'lease': config.idempotency.lease,
+                  'timeout': config.idempotency.timeout}
+        if backend == 'database':
+            _store = DatabaseIdempotencyStore(**kwargs)
+        else:
+            _store = LocalIdempotencyStore(size=config.idempotency.size, **kwargs)
+    return _store
@@ -0,0 +1,101 @@
+import logging
+import threading
+
+from conf_engine.options import NumberOption
+from contextlib import contextmanager
+from typing import Union
+
+from autonet.config import config
+from autonet.core import exceptions as exc
+
+opts = [
+    NumberOption('max_concurrent_reads', minimum=0, default=0),
+    NumberOption('max_concurrent_writes', minimum=0, default=0),
+    NumberOption('queue_timeout', minimum=0, default=5, cast=float),
+    NumberOption('busy_retry_after', minimum=0, default=1)
+]
+config.register_options(opts, 'driver')
+
+
+class DeviceLimiter(object):
+    """
+    Limits the number of driver executions that may be in progress
+    against a single device at any one time.  Reads and writes are
+    limited independently of each other.  A limit of `0` disables
+    limiting for that action type.
+
+    Executions beyond the limit will wait up to `timeout` seconds for
+    a slot to become available, after which :py:exc:`DeviceBusy` is
+    raised.
+    """
+
+    def __init__(self, max_reads: int = 0, max_writes: int = 0,
+                 timeout: float = 0, retry_after: int = 1):
+        """
+        :param max_reads: Maximum concurrent read executions per device.
+        :param max_writes: Maximum concurrent write executions per device.
+        :param timeout: Seconds to wait for a free execution slot.
+        :param retry_after: Seconds a rejected client should wait before
+            retrying.
+        """
+        self.limits = {'read': max_reads, 'write': max_writes}
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    @staticmethod
+    def _action_type(action: str) -> str:
+        return 'read' if action == 'read' else 'write'
+
+    def _get_semaphore(self, device_id: Union[str, int], action_type: str) -> threading.BoundedSemaphore:
+        key = (device_id, action_type)
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(self.limits[action_type])
+            return self._semaphores[key]
+
+    @contextmanager
+    def slot(self, device_id: Union[str, int], action: str):
+        """
+        Context manager that holds an execution slot for the device for
+        the duration of the block.
+
+        :param device_id: The device ID of the target device.
+        :param action: The driver action being executed.
+        :return:
+        """
+        action_type = self._action_type(action)
+        if not self.limits[action_type]:
+            yield
+            return
+        semaphore = self._get_semaphore(device_id, action_type)
+        if not semaphore.acquire(timeout=self.timeout):
+            logging.warning(f'Execution limit of {self.limits[action_type]} concurrent '
+                            f'{action_type}s reached for device_id: {device_id}')
+            raise exc.DeviceBusy(device_id, self.retry_after)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+_device_limiter = None
+
+
+def device_limiter() -> DeviceLimiter:
+    """
+    Returns the process wide :py:class:`DeviceLimiter` as configured
+    by the `[driver]` configuration options.
+
+    :return:
+    """
+    global _device_limiter
+    if _device_limiter is None:
+        _device_limiter = DeviceLimiter(
+            max_reads=config.driver.max_concurrent_reads,
+            max_writes=config.driver.max_concurrent_writes,
+            timeout=config.driver.queue_timeout,
+            retry_after=config.driver.busy_retry_after
+        )
+    return _device_limiter
@@ -0,0 +1,264 @@
+"""
+Support for pagination, filtering and sparse fieldsets on endpoints
+that return a list of objects.  These are controlled by the following
+query string parameters:
+
+* `limit`: The maximum number of objects to return.
+* `cursor`: The opaque cursor from the `next` link of the previous page.
+* `fields`: A comma separated list of the object fields to return.
+* Any filter defined for the endpoint, such as `mode=routed`.
+
+Any other parameter, such as a cache buster added by a client or proxy,
+is ignored.
+
+When a page is truncated by `limit` a `Link` header with the `next`
+relation points to the following page.  Paginated results are ordered
+by the object's key, such as the interface name or VLAN ID.
+
+When the driver returns an iterator the objects are filtered and
+streamed to the client as they are produced, unless the request is
+paginated, in which case they must first be collected and sorted.
+
+When the driver returns a columnar table, such as an
+:py:class:`InterfaceTable`, the query is applied to the table's columns
+without an object being constructed for each row.
+"""
+import base64
+import binascii
+import dataclasses
+import json
+
+from dataclasses import dataclass, field
+from flask import g, request
+from itertools import compress
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+
+from autonet.core import exceptions as exc
+from autonet.core.response import autonet_response, is_stream
+
+RESERVED_PARAMETERS = ['limit', 'cursor', 'fields']
+
+
+def parse_bool(value: str) -> bool:
+    """
+    Parse a boolean query string value.
+
+    :param value: The value, as a string.
+    :return:
+    """
+    if value.lower() in ['true', '1', 'yes']:
+        return True
+    if value.lower() in ['false', '0', 'no']:
+        return False
+    raise ValueError(value)
+
+
+@dataclass
+class Filter(object):
+    """
+    Describes a filter available on a list endpoint.
+
+    :param getter: Returns the value of the filtered attribute from an
+        object.
+    :param cast: Converts the query string value to the attribute's type.
+    :param column: The column of a table holding the filtered attribute,
+        if any.  Otherwise, tables are filtered with `getter`.
+    :param column_getter: Returns the value of the filtered attribute from
+        a value of `column`, if the attribute is part of the column's
+        values, such as an attribute of a nested object.
+    """
+    getter: Callable[[Any], Any]
+    cast: Callable[[str], Any] = field(default=str)
+    column: Optional[str] = field(default=None)
+    column_getter: Optional[Callable[[Any], Any]] = field(default=None)
+
+
+@dataclass
+class ListQuery(object):
+    limit: Optional[int] = field(default=None)
+    cursor: Any = field(default=None)
+    fields: Optional[List[str]] = field(default=None)
+    filters: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_request(cls, filters: Dict[str, Filter]) -> 'ListQuery':
+        """
+        Build a query from the current request's query string.
+
+        :param filters: The filters available on the endpoint.
+        :return:
+        """
+        query = cls()
+        args = request.args
+        if 'limit' in args:
+            if not args['limit'].isdigit() or int(args['limit']) < 1:
+                raise exc.RequestValueError('limit', args['limit'])
+            query.limit = int(args['limit'])
+        if 'cursor' in args:
+            query.cursor = decode_cursor(args['cursor'])
+        if 'fields' in args:
+            query.fields = [f for f in args['fields'].split(',') if f]
+        for name, value in args.items():
+            if name in RESERVED_PARAMETERS or name not in filters:
+                continue
+            try:
+                query.filters[name] = filters[name].cast(value)
+            except ValueError:
+                raise exc.RequestValueError(name, value)
+        return query
+
+    def driver_kwargs(self, driver, capability: str) -> dict:
+        """
+        Returns the keyword arguments with which to execute the read so
+        that any filters supported by the driver are pushed down to it.
+
+        :param driver: The device driver.
+        :param capability: The capability being read.
+        :return:
+        """
+        supported = getattr(driver, 'supported_filters', {}).get(capability, [])
+        filters = {k: v for k, v in self.filters.items() if k in supported}
+        return {'filters': filters} if filters else {}
+
+
+def encode_cursor(key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise exc.RequestValueError('cursor', cursor)
+
+
+def is_table(obj) -> bool:
+    """
+    Returns `True` if `obj` is a columnar table of objects, such as an
+    :py:class:`InterfaceTable`, which provides `column()`, `mask()`,
+    `take()` and `rows()` methods.
+
+    :param obj: The response data.
+    :return:
+    """
+    return all(callable(getattr(obj, m, None)) for m in ['column', 'mask', 'take', 'rows'])
+
+
+def _table_response(table, query: ListQuery, filters: Dict[str, Filter],
+                    key_column: str, item_type: Optional[type] = None):
+    """
+    The counterpart of :py:func:`list_response` for columnar tables.
+    Rows are selected by index, without the columns being copied, and
+    only the columns of the fields requested are serialized.
+
+    :return:
+    """
+    for name, value in query.filters.items():
+        spec = filters[name]
+        if spec.column is None:
+            mask = [spec.getter(item) == value for item in table]
+        elif spec.column_getter is not None:
+            mask = [spec.column_getter(item) == value for item in table.column(spec.column)]
+        else:
+            mask = table.mask(spec.column, value)
+        table = table.take(compress(range(len(table)), mask))
+
+    if query.fields and item_type is not None:
+        valid_fields = [f.name for f in dataclasses.fields(item_type)]
+        for f in query.fields:
+            if f not in valid_fields:
+                raise exc.RequestValueError('fields', f, valid_fields)
+
+    headers = None
+    if query.limit or query.cursor is not None:
+        keys = table.column(key_column)
+        indexes = sorted(range(len(table)), key=keys.__getitem__)
+        if query.cursor is not None:
+            try:
+                indexes = [i for i in indexes if keys[i] > query.cursor]
+            except TypeError:
+                raise exc.RequestValueError('cursor', request.args['cursor'])
+        if query.limit and len(indexes) > query.limit:
+            indexes = indexes[:query.limit]
+            args = {**request.args.to_dict(), 'cursor': encode_cursor(keys[indexes[-1]])}
+            headers = {'Link': f'<{request.base_url}?{urlencode(args)}>; rel="next"'}
+        table = table.take(indexes)
+
+    if query.fields:
+        return autonet_response(table.rows(query.fields), None, headers)
+    return autonet_response(table, None, headers)
+
+
+def _select_fields(item, fields: List[str]) -> dict:
+    return {f: getattr(item, f) for f in fields}
+
+
+def _verified(items, item_type: type):
+    for item in items:
+        if not isinstance(item, item_type):
+            raise exc.DriverResponseInvalid(g.driver)
+        yield item
+
+
+def list_response(items: Iterable, query: ListQuery, filters: Dict[str, Filter],
+                  key: Callable[[Any], Any], item_type: Optional[type] = None,
+                  key_column: Optional[str] = None):
+    """
+    Apply the query to the list of objects returned by the driver and
+    build the response.  Filters are always applied here, even if they
+    were pushed down to the driver.
+
+    :param items: The objects returned by the driver, either as a list or
+        an iterator to be streamed.
+    :param query: The list query.
+    :param filters: The filters available on the endpoint.
+    :param key: Returns the key by which an object is paginated.
+    :param item_type: The type of object the endpoint returns.  Streamed
+        objects are verified against it as they are sent.
+    :param key_column: The column of a table by which rows are paginated,
+        for endpoints whose driver may return a table.
+    :return:
+    """
+    if key_column is not None and is_table(items):
+        return _table_response(items, query, filters, key_column, item_type)
+    stream = is_stream(items)
+    if stream and item_type is not None:
+        items = _verified(items, item_type)
+
+    predicates = [(filters[name].getter, value) for name, value in query.filters.items()]
+    if predicates:
+        def matches(item):
+            return all(getter(item) == value for getter, value in predicates)
+        items = filter(matches, items) if stream else [i for i in items if matches(i)]
+
+    if query.fields:
+        if item_type is not None:
+            valid_fields = [f.name for f in dataclasses.fields(item_type)]
+        elif not stream and items:
+            valid_fields = [f.name for f in dataclasses.fields(items[0])]
+        else:
+            valid_fields = query.fields
+        for f in query.fields:
+            if f not in valid_fields:
+                raise exc.RequestValueError('fields', f, valid_fields)
+
+    headers = None
+    if query.limit or query.cursor is not None:
+        items = sorted(items, key=key)
+        if query.cursor is not None:
+            try:
+                items = [i for i in items if key(i) > query.cursor]
+            except TypeError:
+                raise exc.RequestValueError('cursor', request.args['cursor'])
+        if query.limit and len(items) > query.limit:
+            items = items[:query.limit]
+            args = {**request.args.to_dict(), 'cursor': encode_cursor(key(items[-1]))}
+            headers = {'Link': f'<{request.base_url}?{urlencode(args)}>; rel="next"'}
+
+    if query.fields:
+        if is_stream(items):
+            items = (_select_fields(i, query.fields) for i in items)
+        else:
+            items = [_select_fields(i, query.fields) for i in items]
+    return autonet_response(items, None, headers)
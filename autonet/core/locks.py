@@ -0,0 +1,328 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from conf_engine.options import NumberOption, StringOption
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Union
+from uuid import uuid4
+
+from autonet.config import config
+from autonet.core import exceptions as exc
+from autonet.core.metrics import metrics
+
+opts = [
+    StringOption('write_lock', default='auto',
+                 choices=['auto', 'none', 'local', 'file', 'database']),
+    StringOption('write_lock_path',
+                 default=os.path.join(tempfile.gettempdir(), 'autonet-locks')),
+    NumberOption('write_lock_timeout', minimum=0, default=30, cast=float),
+    NumberOption('write_lock_warn_after', minimum=0, default=5, cast=float),
+    NumberOption('write_lock_lease', minimum=1, default=300)
+]
+config.register_options(opts, 'driver')
+
+POLL_INTERVAL = 0.05
+
+
+class DeviceLock(object):
+    """
+    Base class for exclusive per-device locks held around driver write
+    actions.  Child classes implement :py:meth:`_try_acquire()` and
+    :py:meth:`_release()`, and leased locks :py:meth:`_renew()`; this
+    class implements waiting for the lock, time-outs, lease renewal and
+    wait time metrics.
+
+    The base class itself performs no locking.
+    """
+
+    # Seconds between renewals of a held lock, or `None` if the lock
+    # is not leased.
+    renew_interval = None
+
+    def __init__(self, timeout: float = 30, warn_after: float = 5):
+        """
+        :param timeout: Seconds to wait for the lock before giving up.
+        :param warn_after: Waits for the lock of at least this many
+            seconds are logged as warnings.
+        """
+        self.timeout = timeout
+        self.warn_after = warn_after
+
+    def _try_acquire(self, device_id: str):
+        """
+        Attempt to acquire the lock for a device without blocking.
+        Returns a handle to be passed to :py:meth:`_release()` if
+        successful, otherwise `None`.
+
+        :param device_id: The device ID, as a string.
+        :return:
+        """
+        return True
+
+    def _release(self, device_id: str, handle):
+        """
+        Release a lock previously acquired by :py:meth:`_try_acquire()`.
+
+        :param device_id: The device ID, as a string.
+        :param handle: The handle returned when the lock was acquired.
+        :return:
+        """
+        pass
+
+    def _renew(self, device_id: str, handle) -> bool:
+        """
+        Extend the lease of a lock previously acquired by
+        :py:meth:`_try_acquire()`.  Called every :py:attr:`renew_interval`
+        seconds while the lock is held.  Returns `False` if the lock has
+        been lost.
+
+        :param device_id: The device ID, as a string.
+        :param handle: The handle returned when the lock was acquired.
+        :return:
+        """
+        return True
+
+    @contextmanager
+    def hold(self, device_id: Union[str, int]):
+        """
+        Context manager that holds the lock for the device for the
+        duration of the block.  Raises :py:exc:`DeviceBusy` if the
+        lock cannot be acquired within the timeout.
+
+        :param device_id: The device ID of the target device.
+        :return:
+        """
+        device_id = str(device_id)
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        handle = self._try_acquire(device_id)
+        while handle is None:
+            if time.perf_counter() >= deadline:
+                metrics.observe('driver.write_lock_timeout', time.perf_counter() - start)
+                logging.warning(f'Timed out waiting for write lock on device_id: {device_id}')
+                raise exc.DeviceBusy(device_id)
+            time.sleep(POLL_INTERVAL)
+            handle = self._try_acquire(device_id)
+        waited = time.perf_counter() - start
+        metrics.observe('driver.write_lock_wait', waited)
+        if waited >= self.warn_after:
+            logging.warning(f'Waited {waited:.3f}s for write lock on device_id: {device_id}')
+        else:
+            logging.debug(f'Acquired write lock on device_id: {device_id} after {waited:.3f}s')
+        heartbeat = _Heartbeat(self, device_id, handle) if self.renew_interval else None
+        try:
+            yield
+        finally:
+            if heartbeat is not None:
+                heartbeat.stop()
+            self._release(device_id, handle)
+
+
+class _Heartbeat(object):
+    """
+    Renews the lease of a held lock from a thread of its own, so that a
+    write that runs for longer than the lease keeps the lock.
+    """
+
+    def __init__(self, lock: DeviceLock, device_id: str, handle):
+        self._lock = lock
+        self._device_id = device_id
+        self._handle = handle
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f'autonet-lock-heartbeat-{device_id}')
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self._lock.renew_interval):
+            try:
+                if not self._lock._renew(self._device_id, self._handle):
+                    logging.error(f'Write lock on device_id: {self._device_id} was lost '
+                                  f'while held')
+                    return
+            except Exception as e:
+                # The lease may still be renewed before it expires.
+                logging.warning(f'Failed to renew write lock on device_id: '
+                                f'{self._device_id}: {e}')
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+class LocalDeviceLock(DeviceLock):
+    """
+    Serializes writes to a device between threads of this process.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._locks = {}
+
+    def _try_acquire(self, device_id: str):
+        with self._lock:
+            if device_id not in self._locks:
+                self._locks[device_id] = threading.Lock()
+            lock = self._locks[device_id]
+        return lock if lock.acquire(blocking=False) else None
+
+    def _release(self, device_id: str, handle: threading.Lock):
+        handle.release()
+
+
+class FileDeviceLock(DeviceLock):
+    """
+    Serializes writes to a device between all processes on this host
+    by holding an exclusive `flock()` on a per-device lock file.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        """
+        :param path: Directory in which lock files are created.
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def _lock_file(self, device_id: str) -> str:
+        return os.path.join(self.path, re.sub(r'[^\w.-]', '_', device_id) + '.lock')
+
+    def _try_acquire(self, device_id: str):
+        import fcntl
+        fd = os.open(self._lock_file(device_id), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _release(self, device_id: str, handle: int):
+        import fcntl
+        try:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            os.close(handle)
+
+
+class DatabaseDeviceLock(DeviceLock):
+    """
+    Serializes writes to a device between all processes sharing the
+    Autonet database by holding a row in the `device_locks` table.
+    Locks are leased so that a lock held by a worker that has died
+    will expire, and the lease is renewed every third of its length
+    while the lock is held.
+    """
+
+    def __init__(self, lease: int = 300, **kwargs):
+        """
+        :param lease: Seconds after which a held lock that has not been
+            renewed is considered abandoned and may be taken by another
+            worker.
+        """
+        super().__init__(**kwargs)
+        self.lease = lease
+        self.renew_interval = lease / 3 if lease > 0 else None
+
+    @staticmethod
+    def _now() -> datetime:
+        # Lock expiry times are stored as naive UTC.
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _try_acquire(self, device_id: str):
+        from sqlalchemy import delete
+        from sqlalchemy.exc import IntegrityError
+        from autonet.db import Session
+        from autonet.db.models import DeviceLocks
+
+        owner = uuid4().hex
+        now = self._now()
+        with Session() as s:
+            s.execute(delete(DeviceLocks).where(DeviceLocks.device_id == device_id,
+                                                DeviceLocks.expires_on < now))
+            s.add(DeviceLocks(device_id=device_id, owner=owner,
+                              expires_on=now + timedelta(seconds=self.lease)))
+            try:
+                s.commit()
+            except IntegrityError:
+                s.rollback()
+                return None
+        return owner
+
+    def _renew(self, device_id: str, handle: str) -> bool:
+        from sqlalchemy import update
+        from autonet.db import Session
+        from autonet.db.models import DeviceLocks
+
+        with Session() as s:
+            result = s.execute(update(DeviceLocks).where(
+                DeviceLocks.device_id == device_id, DeviceLocks.owner == handle).values(
+                expires_on=self._now() + timedelta(seconds=self.lease)))
+            s.commit()
+        return result.rowcount == 1
+
+    def _release(self, device_id: str, handle: str):
+        from sqlalchemy import delete
+        from autonet.db import Session
+        from autonet.db.models import DeviceLocks
+
+        with Session() as s:
+            s.execute(delete(DeviceLocks).where(DeviceLocks.device_id == device_id,
+                                                DeviceLocks.owner == handle))
+            s.commit()
+
+
+_write_lock = None
+_workers = 1
+
+
+def configure(workers: int):
+    """
+    Set the number of worker processes that will share the device write
+    lock.  The `auto` lock is a `file` lock when there is more than one
+    worker, and a `local` lock otherwise.  Raises `RuntimeError` if the
+    `local` lock is configured for more than one worker, since it would
+    not serialize their writes.
+
+    This must be called before the workers are started.
+
+    :param workers: The number of worker processes.
+    :return:
+    """
+    global _workers, _write_lock
+    if workers > 1 and config.driver.write_lock == 'local':
+        raise RuntimeError('The `local` device write lock does not serialize writes between '
+                           'worker processes, use the `auto`, `file` or `database` lock.')
+    _workers = workers
+    _write_lock = None
+
+
+def write_lock() -> DeviceLock:
+    """
+    Returns the process wide :py:class:`DeviceLock` as configured by
+    the `[driver]` configuration options.
+
+    :return:
+    """
+    global _write_lock
+    if _write_lock is None:
+        backend = config.driver.write_lock
+        if backend == 'auto':
+            backend = 'file' if _workers > 1 else 'local'
+        kwargs = {'timeout': config.driver.write_lock_timeout,
+                  'warn_after': config.driver.write_lock_warn_after}
+        if backend == 'local':
+            _write_lock = LocalDeviceLock(**kwargs)
+        elif backend == 'file':
+            _write_lock = FileDeviceLock(config.driver.write_lock_path, **kwargs)
+        elif backend == 'database':
+            _write_lock = DatabaseDeviceLock(config.driver.write_lock_lease, **kwargs)
+        else:
+            _write_lock = DeviceLock(**kwargs)
+    return _write_lock
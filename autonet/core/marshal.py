@@ -11,22 +11,43 @@ opts = [
 config.register_options(opts)
 
 
+_drivers = {}
+
+
 def marshal_driver(driver_ns: str, driver_name: str):
     """
     Returns the class defined by the driver's registered entrypoint.
+    Loaded classes are cached for the life of the process.
     :return:
     """
+    if (driver_ns, driver_name) in _drivers:
+        return _drivers[(driver_ns, driver_name)]
     logging.debug(f'Attempting to load driver {driver_name} from namespace {driver_ns}')
     try:
         for driver_ep in __import__('pkg_resources').iter_entry_points(group=driver_ns):
             if driver_ep.name == driver_name:
-                return driver_ep.load()
+                driver = _drivers[(driver_ns, driver_name)] = driver_ep.load()
+                return driver
     except Exception as e:
         logging.exception(e)
         raise exc.DriverLoadError(driver_name, e)
     raise exc.DriverNotFound(driver_name)
 
 
+def preload_drivers(driver_ns: str):
+    """
+    Load every driver registered in the namespace into the driver cache.
+    Drivers that fail to load are logged and skipped, the error will be
+    raised when a request requires the driver.
+    :return:
+    """
+    for driver_ep in __import__('pkg_resources').iter_entry_points(group=driver_ns):
+        try:
+            marshal_driver(driver_ns, driver_ep.name)
+        except exc.DriverLoadError:
+            pass
+
+
 DEVICE_BACKEND = marshal_driver('autonet.backends', config.backend)()
 
 
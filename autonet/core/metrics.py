@@ -0,0 +1,83 @@
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+class TimingStat(object):
+    """
+    Accumulates observations of a timed operation.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max
+        }
+
+
+class Metrics(object):
+    """
+    A minimal, thread safe, in-process registry of timing statistics.
+    Statistics are created on first observation and are keyed by name.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def observe(self, name: str, seconds: float):
+        """
+        Record a single observation for the named statistic.
+
+        :param name: The statistic name, e.g. `driver.write_lock_wait`.
+        :param seconds: The observed duration in seconds.
+        :return:
+        """
+        with self._lock:
+            if name not in self._stats:
+                self._stats[name] = TimingStat()
+            self._stats[name].observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Context manager that records the duration of the block as an
+        observation of the named statistic.
+
+        :param name: The statistic name.
+        :return:
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        """
+        Returns a point-in-time copy of all statistics.
+
+        :return:
+        """
+        with self._lock:
+            return {name: stat.as_dict() for name, stat in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+
+metrics = Metrics()
@@ -2,4 +2,33 @@
 Here we use python dataclasses to define the structure of
 given endpoints request/response data as well as implement
 validation logic in the `__post_init__()` method.
-"""
\ No newline at end of file
+"""
+import dataclasses
+
+
+def slotted(cls: type) -> type:
+    """
+    Class decorator that recreates a dataclass with `__slots__` for its
+    fields, so that instances have no `__dict__` and use considerably
+    less memory.  This is the equivalent of `@dataclass(slots=True)`,
+    which is not available before Python 3.10.  It must be applied
+    after, that is above, the `@dataclass` decorator.  Any `__slots__`
+    declared by the class, for attributes that are not fields, are kept.
+
+    :param cls: The dataclass.
+    :return:
+    """
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    extra = tuple(cls.__dict__.get('__slots__', ()))
+    namespace = dict(cls.__dict__)
+    namespace['__slots__'] = names + extra
+    # Field defaults are held by the generated `__init__()`, and would
+    # conflict with the slot descriptors, as would the descriptors of
+    # the declared slots.
+    for name in names + extra:
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
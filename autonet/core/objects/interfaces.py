@@ -1,28 +1,54 @@
-import logging
-import macaddress
+import functools
 
-from dataclasses import dataclass, field
-from ipaddress import ip_interface
-from typing import Optional, Union
+from array import array
+from collections import deque
+from dataclasses import dataclass, field, fields
+from ipaddress import ip_interface, IPv4Interface, IPv6Interface
+from itertools import repeat
+from operator import eq
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Union
 
 import autonet.core.exceptions as exc
 import autonet.core.objects.validators as v
+from autonet.core import serialization
+from autonet.core.objects import slotted
+from autonet.util.config_string import VLANSet
 
 
+@functools.lru_cache(maxsize=4096)
+def parse_ip_interface(address: str) -> Union[IPv4Interface, IPv6Interface]:
+    """
+    Parses an address in address/prefix format.  Results are memoized,
+    so that repeated addresses, such as anycast gateway addresses
+    configured on many interfaces, share a single parsed object.
+
+    :param address: The address.
+    :return:
+    """
+    return ip_interface(address)
+
+
+@slotted
 @dataclass
 class InterfaceAddress(object):
     address: str
     family: Optional[str] = field(default=None)
     virtual: Optional[bool] = field(default=False)
     virtual_type: Union[str, None] = field(default=None)
+    __slots__ = ('_parsed',)
 
     def __post_init__(self):
+        if v.is_trusted():
+            if not self.family:
+                self.family = 'ipv6' if ':' in self.address else 'ipv4'
+            return
         v.validate(self)
 
         valid_families = ['ipv4', 'ipv6']
         valid_virtual_types = ['anycast', 'vrrp']
+        self._parsed = parse_ip_interface(self.address)
         # Set family if not provided, then verify.
-        family = f"ipv{ip_interface(self.address).version}"
+        family = f"ipv{self._parsed.version}"
         if not self.family:
             self.family = family
         # Verify that the family provided matches the actual
@@ -34,26 +60,54 @@ class InterfaceAddress(object):
         if self.family not in valid_families:
             raise exc.RequestValueError('family', self.family,
                                         valid_values=valid_families)
-        # Verify valid IP address formatted as address/mask
-        try:
-            ip_interface(self.address)
-        except Exception as e:
-            logging.exception(e)
-            raise exc.RequestValueError('address', self.address)
         # Verify virtual type, as appropriate.
         if self.virtual and self.virtual_type not in valid_virtual_types:
             raise exc.RequestValueError('virtual_type', self.virtual_type,
                                         valid_values=valid_virtual_types)
 
+    @property
+    def parsed(self) -> Union[IPv4Interface, IPv6Interface]:
+        """
+        The parsed address, from which the network and prefix length
+        are available.  Addresses of trusted objects are parsed when
+        first accessed.
+        """
+        try:
+            return self._parsed
+        except AttributeError:
+            self._parsed = parse_ip_interface(self.address)
+            return self._parsed
+
+    def _key(self) -> tuple:
+        return self.parsed, self.virtual, self.virtual_type
+
 
+@slotted
 @dataclass
 class InterfaceBridgeAttributes(object):
     dot1q_enabled: bool
-    dot1q_vids: list[int] = field(default_factory=list)
+    dot1q_vids: Union[VLANSet, list[int]] = field(default_factory=list)
     dot1q_pvid: Optional[int] = field(default=None)
 
     def __post_init__(self):
+        if v.is_trusted():
+            return
         v.validate(self)
+        if not isinstance(self.dot1q_vids, VLANSet):
+            try:
+                self.dot1q_vids = VLANSet(self.dot1q_vids)
+            except ValueError:
+                raise exc.RequestValueError('dot1q_vids', self.dot1q_vids)
+
+    @property
+    def dot1q_vid_set(self) -> VLANSet:
+        """
+        The VLAN IDs as a :py:class:`VLANSet`.  Trusted driver output
+        may hold a list.
+        """
+        if isinstance(self.dot1q_vids, VLANSet):
+            return self.dot1q_vids
+        return VLANSet(self.dot1q_vids)
 
     def merge(self, update: 'InterfaceBridgeAttributes'):
         if update.dot1q_enabled is not None:
@@ -61,10 +115,11 @@ class InterfaceBridgeAttributes(object):
         if update.dot1q_pvid is not None:
             self.dot1q_pvid = update.dot1q_pvid
         if update.dot1q_vids is not None and update.dot1q_enabled:
-            self.dot1q_vids = update.dot1q_vids
+            self.dot1q_vids = update.dot1q_vid_set
         return self
 
 
+@slotted
 @dataclass
 class InterfaceRouteAttributes(object):
     addresses: list[InterfaceAddress]
@@ -72,12 +127,12 @@ class InterfaceRouteAttributes(object):
     evpn_anycast_mac: Optional[str] = field(default=None)
 
     def __post_init__(self):
-        v.validate(self)
+        if not v.is_trusted():
+            v.validate(self)
 
         try:
             if self.evpn_anycast_mac:
-                self.evpn_anycast_mac = str(macaddress.parse(
-                    self.evpn_anycast_mac, macaddress.EUI48))
+                self.evpn_anycast_mac = v.normalize_mac(self.evpn_anycast_mac)
         except Exception:
             raise exc.RequestValueError('evpn_anycast_mac', self.evpn_anycast_mac)
 
@@ -85,11 +140,15 @@ class InterfaceRouteAttributes(object):
         if update.vrf is not None:
             self.vrf = update.vrf
         if update.addresses is not None:
-            # For addresses, we convert to a set for the merge action so that
-            # duplicates are removed. Then cast back to a list on assignment.
-            self.addresses = list(set(self.addresses).union(set(update.addresses)))
+            # Addresses are merged by their parsed value so that duplicates,
+            # including differently formatted ones, are removed.
+            addresses = {}
+            for address in self.addresses + update.addresses:
+                addresses.setdefault(address._key(), address)
+            self.addresses = list(addresses.values())
         return self
 
+@slotted
 @dataclass
 class Interface(object):
     name: Optional[str] = field(default=None)
@@ -106,14 +165,14 @@ class Interface(object):
     mtu: Optional[int] = field(default=None)
 
     def __post_init__(self):
-        v.validate(self)
+        if not v.is_trusted():
+            v.validate(self)
 
         valid_modes = ['routed', 'bridged', 'aggregated']
         # Validate physical address and enforce format
         try:
             if self.physical_address:
-                self.physical_address = str(macaddress.parse(
-                    self.physical_address, macaddress.EUI48))
+                self.physical_address = v.normalize_mac(self.physical_address)
         except Exception:
             raise exc.RequestValueError('physical_address', self.physical_address)
         # Validate parent is set if child is true.
@@ -164,3 +223,283 @@ class Interface(object):
             self.mode = update.mode
             self.attributes = update.attributes
         return self
+
+
+class InterfaceTable(object):
+    """
+    A columnar container of interfaces for devices with very many
+    interfaces, such as carrier-grade chassis with tens of thousands of
+    sub-interfaces.  Drivers may return a table from `_interface_read`
+    in place of a list of :py:class:`Interface` objects.  The table is
+    filtered, paginated and serialized column by column, without an
+    object being constructed for each interface.
+
+    Boolean columns, and the mode, are held in arrays of codes.  Other
+    columns are held in lists, so that they are serialized without being
+    converted.  Each interface's attributes are held as an object, since
+    they are nested.
+    Iterating over, or indexing, the table yields :py:class:`Interface`
+    objects for compatibility.  Slicing the table, or taking interfaces
+    from it, returns a new table that selects rows of the same columns
+    rather than copying them.
+    """
+    MODES = [None, 'routed', 'bridged', 'aggregated']
+    FIELDS = [f.name for f in fields(Interface)]
+    # Columns held in arrays, by type code.  `None` is stored as `-1`,
+    # and the mode as its index in `MODES`.
+    ARRAY_COLUMNS = {'mode': 'b', 'virtual': 'b', 'admin_enabled': 'b', 'child': 'b'}
+    BOOLEAN_COLUMNS = ['virtual', 'admin_enabled', 'child']
+    _MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+    _BOOLEANS = {None: -1, False: 0, True: 1}
+    __slots__ = ['_columns', '_index', '_appenders']
+
+    def __init__(self):
+        self._columns = {name: array(self.ARRAY_COLUMNS[name]) if name in self.ARRAY_COLUMNS else []
+                         for name in self.FIELDS}
+        # The rows of the columns that are in the table, in order, or
+        # `None` if all of them are.
+        self._index = None
+        # The `append` methods of the columns, in the order of `FIELDS`.
+        self._appenders = None
+
+    @classmethod
+    def from_interfaces(cls, interfaces: Iterable[Interface]) -> 'InterfaceTable':
+        """
+        Build a table from interface objects.
+
+        :param interfaces: The interfaces.
+        :return:
+        """
+        table = cls()
+        for interface in interfaces:
+            table.append(**{name: getattr(interface, name) for name in cls.FIELDS})
+        return table
+
+    @classmethod
+    def from_columns(cls, name: List[str], **columns: Sequence) -> 'InterfaceTable':
+        """
+        Build a table from columns of values, one per interface, named as
+        the fields of :py:class:`Interface`.  Columns that are omitted
+        are set to the field's default.  This is the most efficient way
+        for a driver that parses tabular device output to build a table.
+
+        :param name: The interface names.
+        :param columns: The other columns.
+        :return:
+        """
+        unknown = columns.keys() - set(cls.FIELDS)
+        if unknown:
+            raise TypeError(f'Unknown InterfaceTable columns {sorted(unknown)}')
+        count = len(name)
+        for column, values in columns.items():
+            if len(values) != count:
+                raise ValueError(f"InterfaceTable column '{column}' has {len(values)} "
+                                 f"values, expected {count}")
+        table = cls()
+        table._columns['name'] = list(name)
+        attributes = list(columns.get('attributes', [None] * count))
+        modes = columns.get('mode', [None] * count)
+        if 'attributes' in columns:
+            modes = [mode if mode is not None or a is None else
+                     'routed' if isinstance(a, InterfaceRouteAttributes) else
+                     'bridged' if isinstance(a, InterfaceBridgeAttributes) else None
+                     for mode, a in zip(modes, attributes)]
+        try:
+            table._columns['mode'] = array('b', [cls._MODE_CODES[mode] for mode in modes])
+        except KeyError as e:
+            raise exc.RequestValueError('mode', e.args[0], valid_values=cls.MODES[1:])
+        table._columns['attributes'] = attributes
+        addresses = columns.get('physical_address')
+        if addresses is not None:
+            try:
+                addresses = [a and v.normalize_mac(a) for a in addresses]
+            except Exception:
+                raise exc.RequestValueError('physical_address', addresses)
+        table._columns['physical_address'] = list(addresses or [None] * count)
+        for column in ['description', 'parent', 'speed', 'duplex', 'mtu']:
+            table._columns[column] = list(columns.get(column, [None] * count))
+        for column in cls.BOOLEAN_COLUMNS:
+            default = False if column == 'child' else None
+            table._columns[column] = array('b', [cls._BOOLEANS[value] for value
+                                                 in columns.get(column, [default] * count)])
+        return table
+
+    def append(self, name: str, mode: Optional[str] = None, description: Optional[str] = None,
+               virtual: Optional[bool] = None,
+               attributes: Optional[Union[InterfaceBridgeAttributes, InterfaceRouteAttributes]] = None,
+               admin_enabled: Optional[bool] = None, physical_address: Optional[str] = None,
+               child: bool = False, parent: Optional[str] = None, speed: Optional[int] = None,
+               duplex: Optional[str] = None, mtu: Optional[int] = None):
+        """
+        Append an interface to the table.  The arguments are those of
+        :py:class:`Interface`, and are normalized in the same way, but
+        only validated as far as the columns require.
+
+        :return:
+        """
+        if mode is None and attributes is not None:
+            if isinstance(attributes, InterfaceRouteAttributes):
+                mode = 'routed'
+            elif isinstance(attributes, InterfaceBridgeAttributes):
+                mode = 'bridged'
+        code = self._MODE_CODES.get(mode)
+        if code is None:
+            raise exc.RequestValueError('mode', mode, valid_values=self.MODES[1:])
+        if physical_address:
+            try:
+                physical_address = v.normalize_mac(physical_address)
+            except Exception:
+                raise exc.RequestValueError('physical_address', physical_address)
+        if self._index is not None:
+            # The columns may be shared with other tables.
+            self._columns = {n: self._stored(n) for n in self.FIELDS}
+            self._index = None
+            self._appenders = None
+        if self._appenders is None:
+            self._appenders = tuple(self._columns[n].append for n in self.FIELDS)
+        (append_name, append_mode, append_description, append_virtual, append_attributes,
+         append_admin_enabled, append_physical_address, append_child, append_parent,
+         append_speed, append_duplex, append_mtu) = self._appenders
+        append_name(name)
+        append_mode(code)
+        append_description(description)
+        append_virtual(-1 if virtual is None else virtual)
+        append_attributes(attributes)
+        append_admin_enabled(-1 if admin_enabled is None else admin_enabled)
+        append_physical_address(physical_address)
+        append_child(-1 if child is None else child)
+        append_parent(parent)
+        append_speed(speed)
+        append_duplex(duplex)
+        append_mtu(mtu)
+
+    def _decode(self, name: str, value):
+        if name == 'mode':
+            return self.MODES[value]
+        if name in self.ARRAY_COLUMNS and value < 0:
+            return None
+        if name in self.BOOLEAN_COLUMNS:
+            return bool(value)
+        return value
+
+    def _stored(self, name: str) -> Sequence:
+        """
+        Returns the stored values of a column for the rows in the table.
+        """
+        values = self._columns[name]
+        index = self._index
+        if index is None:
+            return values
+        if isinstance(index, range) and index.step > 0:
+            return values[index.start:index.stop:index.step]
+        taken = map(values.__getitem__, index)
+        return array(values.typecode, taken) if isinstance(values, array) else list(taken)
+
+    def column(self, name: str) -> Sequence:
+        """
+        Returns the values of a column, one per interface, with the same
+        types as the :py:class:`Interface` field of the same name.
+
+        :param name: The column name.
+        :return:
+        """
+        values = self._stored(name)
+        if name == 'mode':
+            modes = self.MODES
+            return [modes[code] for code in values]
+        if name in self.BOOLEAN_COLUMNS:
+            decoded = [None, False, True]
+            return [decoded[value + 1] for value in values]
+        return values
+
+    def mask(self, name: str, value) -> bytes:
+        """
+        Returns a byte for each interface, which is `1` if its value in a
+        column equals `value` and `0` otherwise.  The stored representation
+        is compared, without decoding the column.
+
+        :param name: The column name.
+        :param value: The value to compare with.
+        :return:
+        """
+        values = self._stored(name)
+        if name in self.ARRAY_COLUMNS:
+            code = self._MODE_CODES.get(value) if name == 'mode' else self._BOOLEANS.get(value)
+            if code is None:
+                return bytes(len(values))
+            # The codes are single signed bytes, translated to 1 if equal.
+            table = bytearray(256)
+            table[code & 0xff] = 1
+            return values.tobytes().translate(table)
+        return bytes(map(eq, values, repeat(value)))
+
+    def take(self, indexes: Iterable[int]) -> 'InterfaceTable':
+        """
+        Returns a new table of the interfaces at the given indexes, in
+        the given order.  The new table selects rows of this table's
+        columns rather than copying them.
+
+        :param indexes: The indexes of the interfaces to be taken.
+        :return:
+        """
+        table = type(self).__new__(type(self))
+        table._columns = self._columns
+        table._appenders = None
+        if self._index is None:
+            table._index = indexes if isinstance(indexes, range) else list(indexes)
+        else:
+            table._index = list(map(self._index.__getitem__, indexes))
+        return table
+
+    def rows(self, names: Optional[List[str]] = None) -> List[dict]:
+        """
+        Returns each interface as a dictionary of its fields, as it is
+        serialized.  Only the columns of the fields included are decoded.
+
+        :param names: The fields to include, by default all fields.
+        :return:
+        """
+        names = tuple(names or self.FIELDS)
+        columns = [self.column(n) for n in names]
+        if len(names) == 1:
+            return [{names[0]: value} for value in columns[0]]
+        if len(names) > 4:
+            return [dict(zip(names, values)) for values in zip(*columns)]
+        # For a few fields it is quicker to build each dictionary with the
+        # first two, and fill in the others a column at a time.
+        first, second = names[:2]
+        rows = [{first: a, second: b} for a, b in zip(columns[0], columns[1])]
+        for name, values in zip(names[2:], columns[2:]):
+            deque(map(dict.__setitem__, rows, repeat(name), values), maxlen=0)
+        return rows
+
+    def __len__(self) -> int:
+        if self._index is not None:
+            return len(self._index)
+        return len(self._columns['name'])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Interface, 'InterfaceTable']:
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if self._index is not None:
+            index = self._index[index]
+        with v.trusted():
+            return Interface(**{name: self._decode(name, self._columns[name][index])
+                                for name in self.FIELDS})
+
+    def __iter__(self) -> Iterator[Interface]:
+        columns = [self.column(name) for name in self.FIELDS]
+        for values in zip(*columns):
+            with v.trusted():
+                interface = Interface(**dict(zip(self.FIELDS, values)))
+            yield interface
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, InterfaceTable) and len(self) == len(other) \
+            and all(self._stored(n) == other._stored(n) for n in self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f'InterfaceTable({len(self)} interfaces)'
+
+
+serialization.register_encoder(InterfaceTable, InterfaceTable.rows)
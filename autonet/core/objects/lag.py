@@ -1,25 +1,39 @@
-import re
-
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from autonet.core import exceptions as exc
 from autonet.core.objects import validators as v
+from autonet.core.objects import slotted
+from autonet.util.evpn import ESI
 
 
+@slotted
 @dataclass
 class LAG(object):
     name: str = field(default=None)
     members: Optional[List[str]] = field(default_factory=List)
-    evpn_esi: Optional[str] = field(default=None)
+    evpn_esi: Optional[Union[str, ESI]] = field(default=None)
 
     def __post_init__(self):
+        trusted = v.is_trusted()
         # 'auto' is a valid esi option for platforms that support type3 ESI.
         # Drivers that do not support Type3 ESI need to report upstream as such.
         if self.evpn_esi and self.evpn_esi != 'auto':
-            if not v.is_esi(self.evpn_esi):
+            # Parsing normalizes common separators to a well formatted
+            # string.
+            try:
+                self.evpn_esi = str(ESI.parse(self.evpn_esi))
+            except ValueError:
                 raise exc.RequestValueError('evpn_esi', self.evpn_esi)
-            # replace common separators, cast to bytes then cast
-            # back to a well formatted string.
-            self.evpn_esi = bytes.fromhex(re.sub(r'[-_.:]', '', self.evpn_esi)).hex(':')
-        v.validate(self)
+        if not trusted:
+            v.validate(self)
+
+    @property
+    def esi(self) -> Optional[ESI]:
+        """
+        The parsed :py:attr:`evpn_esi`, or `None` if it is unset or
+        `auto`.
+        """
+        if not self.evpn_esi or self.evpn_esi == 'auto':
+            return None
+        return ESI.parse(self.evpn_esi)
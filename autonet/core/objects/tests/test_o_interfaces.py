@@ -1,7 +1,13 @@
+import copy
+import dataclasses
+import pickle
 import pytest
 
 from autonet.core import exceptions as exc
 from autonet.core.objects import interfaces as an_if
+from autonet.core.objects import lag, validators, vlan, vrf, vxlan
+from autonet.util.config_string import VLANSet
+from autonet.util.evpn import ESI
 
 
 @pytest.mark.parametrize('test_kwargs, expected, raises', [
@@ -62,3 +68,162 @@ def test_interface_address(test_kwargs, expected, raises):
         interface = an_if.InterfaceAddress(**test_kwargs)
         for key, value in expected.items():
             assert getattr(interface, key) == value
+
+
+@pytest.mark.parametrize('obj', [
+    an_if.InterfaceAddress('198.18.0.1/32'),
+    an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=[10]),
+    an_if.InterfaceRouteAttributes(addresses=[]),
+    an_if.Interface(name='Ethernet1', mtu=9100),
+    lag.LAG(name='Port-Channel1', members=['Ethernet1']),
+    vlan.VLAN(id=10),
+    vrf.VRF(name='blue'),
+    vxlan.VXLAN(id=10010, layer=2, route_distinguisher='auto', bound_object_id=10)
+])
+def test_objects_slotted(obj):
+    """
+    Verify that objects have no `__dict__` and still behave as
+    dataclasses.
+    """
+    assert not hasattr(obj, '__dict__')
+    assert dataclasses.is_dataclass(obj)
+    assert copy.deepcopy(obj) == obj
+    assert pickle.loads(pickle.dumps(obj)) == obj
+    with pytest.raises(AttributeError):
+        obj.undefined_attribute = True
+
+
+def test_interface_merge_slotted():
+    interface = an_if.Interface(name='Ethernet1', mtu=1500, attributes=an_if.InterfaceBridgeAttributes(
+        dot1q_enabled=True, dot1q_vids=[10]))
+    update = an_if.Interface(mtu=9100, attributes=an_if.InterfaceBridgeAttributes(
+        dot1q_enabled=True, dot1q_vids=[20]))
+    interface.merge(update)
+    assert interface.name == 'Ethernet1'
+    assert interface.mtu == 9100
+    assert interface.attributes.dot1q_vids == [20]
+
+
+def test_bridge_attributes_vids():
+    attributes = an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=[30, 10, 10])
+    assert isinstance(attributes.dot1q_vids, VLANSet)
+    assert attributes.dot1q_vids == [10, 30]
+    assert attributes.dot1q_vid_set is attributes.dot1q_vids
+    # VLAN sets are kept as they are, rather than expanded to lists.
+    vlans = VLANSet.from_glob('1-4094')
+    update = an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=vlans)
+    assert attributes.merge(update).dot1q_vids is vlans
+    assert attributes.dot1q_vid_set is vlans
+    with pytest.raises(exc.RequestValueError):
+        an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=[4096])
+    # Trusted driver output is not checked.
+    with validators.trusted():
+        attributes = an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=[4096])
+    assert attributes.dot1q_vids == [4096]
+    # Lists of trusted driver output are merged as VLAN sets.
+    with validators.trusted():
+        update = an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=[20, 10])
+    merged = an_if.InterfaceBridgeAttributes(dot1q_enabled=True).merge(update)
+    assert isinstance(merged.dot1q_vids, VLANSet) and merged.dot1q_vids == [10, 20]
+
+
+@pytest.mark.parametrize('evpn_esi, expected', [
+    ('00-01-22-EA-FB-99-ED-00-00-00', '00:01:22:ea:fb:99:ed:00:00:00'),
+    (ESI.parse('00:01:22:ea:fb:99:ed:00:00:00'), '00:01:22:ea:fb:99:ed:00:00:00'),
+    ('auto', 'auto'),
+    (None, None)
+])
+def test_lag_esi(evpn_esi, expected):
+    lag_obj = lag.LAG(name='Port-Channel1', members=[], evpn_esi=evpn_esi)
+    assert lag_obj.evpn_esi == expected
+    assert lag_obj.esi is (ESI.parse(expected) if expected not in ('auto', None) else None)
+    with pytest.raises(exc.RequestValueError):
+        lag.LAG(name='Port-Channel1', members=[], evpn_esi='00:01')
+
+
+def test_interface_table():
+    interfaces = [
+        an_if.Interface(name='Ethernet1', admin_enabled=True, mtu=9100, speed=100000,
+                        physical_address='001c.7300.0001',
+                        attributes=an_if.InterfaceRouteAttributes(addresses=[])),
+        an_if.Interface(name='Ethernet1.10', child=True, parent='Ethernet1', mode='routed'),
+        an_if.Interface(name='Ethernet2', mode='aggregated', parent='Port-Channel1'),
+    ]
+    table = an_if.InterfaceTable.from_interfaces(interfaces)
+    assert len(table) == 3
+    assert list(table) == interfaces
+    assert table[1] == interfaces[1]
+    assert table.column('mode') == ['routed', 'routed', 'aggregated']
+    assert table.column('admin_enabled') == [True, None, None]
+    assert table.column('mtu') == [9100, None, None]
+    assert table.column('physical_address')[0] == '00-1C-73-00-00-01'
+    assert list(table.take([2, 0])) == [interfaces[2], interfaces[0]]
+    assert isinstance(table[1:], an_if.InterfaceTable)
+    assert list(table[1:]) == interfaces[1:]
+    assert list(table[::-2]) == interfaces[::-2]
+    assert table.rows(['name', 'child']) == [
+        {'name': 'Ethernet1', 'child': False},
+        {'name': 'Ethernet1.10', 'child': True},
+        {'name': 'Ethernet2', 'child': False}]
+    with pytest.raises(exc.RequestValueError):
+        table.append(name='Ethernet3', mode='switched')
+
+
+def test_interface_table_selection():
+    """
+    Verify that tables taken from a table select its rows, and are
+    unaffected by interfaces later appended to either table.
+    """
+    table = an_if.InterfaceTable.from_columns(
+        name=['Ethernet1', 'Ethernet2', 'Ethernet3'], mode=['routed', 'bridged', 'routed'],
+        admin_enabled=[True, None, False], mtu=[9100, None, 1500])
+    assert table.mask('mode', 'routed') == b'\x01\x00\x01'
+    assert table.mask('admin_enabled', None) == b'\x00\x01\x00'
+    assert table.mask('mtu', 1500) == b'\x00\x00\x01'
+    assert table.mask('mode', 'switched') == b'\x00\x00\x00'
+    routed = table.take([2, 0])
+    assert routed.column('name') == ['Ethernet3', 'Ethernet1']
+    assert routed.mask('admin_enabled', True) == b'\x00\x01'
+    assert routed.take([1])[0].name == 'Ethernet1'
+    assert routed.rows(['name', 'mtu', 'admin_enabled']) == [
+        {'name': 'Ethernet3', 'mtu': 1500, 'admin_enabled': False},
+        {'name': 'Ethernet1', 'mtu': 9100, 'admin_enabled': True}]
+    assert routed == an_if.InterfaceTable.from_interfaces(list(routed))
+    table.append(name='Ethernet4', mode='routed')
+    routed.append(name='Ethernet5', mode='routed')
+    assert table.column('name') == ['Ethernet1', 'Ethernet2', 'Ethernet3', 'Ethernet4']
+    assert routed.column('name') == ['Ethernet3', 'Ethernet1', 'Ethernet5']
+    assert table[1:3].column('mtu') == [None, 1500]
+
+
+def test_interface_table_subclass():
+    class DeviceInterfaceTable(an_if.InterfaceTable):
+        __slots__ = []
+
+    table = DeviceInterfaceTable.from_interfaces([an_if.Interface(name='Ethernet1')])
+    assert type(table.take([0])) is DeviceInterfaceTable
+    assert type(table[:1]) is DeviceInterfaceTable
+
+
+def test_interface_address_parsed():
+    """
+    Verify that the parsed address is exposed and shared between equal
+    addresses, including those of trusted objects.
+    """
+    address = an_if.InterfaceAddress('198.18.0.1/24')
+    assert str(address.parsed.network) == '198.18.0.0/24'
+    assert an_if.InterfaceAddress('198.18.0.1/24').parsed is address.parsed
+    with validators.trusted():
+        trusted = an_if.InterfaceAddress('2001:db8::1/64')
+    assert trusted.family == 'ipv6'
+    assert trusted.parsed.network.prefixlen == 64
+
+
+def test_route_attributes_merge():
+    attributes = an_if.InterfaceRouteAttributes(addresses=[
+        an_if.InterfaceAddress('198.18.0.1/24'), an_if.InterfaceAddress('2001:db8::1/64')])
+    update = an_if.InterfaceRouteAttributes(addresses=[
+        an_if.InterfaceAddress('2001:0db8::1/64'), an_if.InterfaceAddress('198.18.1.1/24')])
+    attributes.merge(update)
+    assert [a.address for a in attributes.addresses] == [
+        '198.18.0.1/24', '2001:db8::1/64', '198.18.1.1/24']
@@ -1,6 +1,15 @@
 import pytest
 
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from autonet.config import config
+from autonet.core.exceptions import RequestTypeError, RequestValueError
+from autonet.core.objects import interfaces as an_if
 from autonet.core.objects import validators as v
+from autonet.core.objects import vrf, vxlan
+from autonet.core.tests.conftest import generate_autonet_device
+from autonet.drivers.device.driver import DeviceDriver
 
 
 @pytest.mark.parametrize('number, expected', [
@@ -40,7 +49,15 @@ def test_is_ipv4_address(address, expected):
     ('198.18.0.1:65', True),
     ('65531:65531', True),
     ('rd:distingisher', False),
-    ('515555:82', True)
+    ('515555:82', True),
+    ('82:515555', True),
+    ('515555:515555', False),
+    ('198.18.0.1:515555', False),
+    ('198.018.0.1:65', False),
+    ('65531', False),
+    ('65531:65531:1', False),
+    ('auto', True),
+    (65531, False)
 ])
 def test_is_route_distinguisher(rd, expected):
     assert v.is_route_distinguisher(rd) == expected
@@ -54,7 +71,10 @@ def test_is_route_distinguisher(rd, expected):
     ('82:515555', True, True),
     ('515555:515555', False, False),
     ('auto', True, True),
-    ('auto', False, False)
+    ('auto', False, False),
+    ('65531', True, False),
+    ('-1:65531', True, False),
+    (None, True, False)
 ])
 def test_is_route_target(rt, allow_auto, expected):
     assert v.is_route_target(rt, allow_auto) == expected
@@ -70,3 +90,119 @@ def test_is_route_target(rt, allow_auto, expected):
 ])
 def test_is_esi(test_esi, expected):
     assert v.is_esi(test_esi) == expected
+
+
+def test_invalid_values():
+    assert v.invalid_route_targets(['65000:1', 'auto', 'rt', '65000:1']) == ['rt']
+    assert v.invalid_route_targets(['auto'], allow_auto=False) == ['auto']
+    assert v.invalid_route_distinguishers(['198.18.0.1:65', '198.18.0.1']) == ['198.18.0.1']
+    assert v.invalid_esis(['00:01:22:ea:fb:99:ed:00:00:00', '00:01']) == ['00:01']
+    assert v.invalid_route_targets([]) == []
+
+
+@pytest.mark.parametrize('cls, kwargs', [
+    (vrf.VRF, {'name': 'blue'}),
+    (vxlan.VXLAN, {'id': 10010, 'layer': 3, 'bound_object_id': 'blue',
+                   'route_distinguisher': 'auto'})
+])
+def test_route_targets_validated(cls, kwargs):
+    cls(**kwargs, import_targets=['65000:1', 'auto'], export_targets=['65000:1'])
+    with pytest.raises(RequestValueError, match="'rt' for field 'export_targets'"):
+        cls(**kwargs, import_targets=['65000:1'], export_targets=['65000:2', 'rt'])
+    with pytest.raises(RequestValueError, match='route_distinguisher'):
+        cls(**{**kwargs, 'route_distinguisher': '65000'})
+
+
+@dataclass
+class Validated(object):
+    name: str
+    count: Optional[int] = field(default=None)
+    tags: Optional[List[str]] = field(default=None)
+    members: list[int] = field(default_factory=list)
+    bound: Union[str, int, None] = field(default=None)
+
+
+@pytest.mark.parametrize('kwargs, valid', [
+    ({'name': 'a'}, True),
+    ({'name': 'a', 'count': 1, 'tags': ['x'], 'members': [1, 2], 'bound': 1}, True),
+    ({'name': 1}, False),
+    ({'name': 'a', 'count': 'one'}, False),
+    ({'name': 'a', 'tags': 'x'}, False),
+    ({'name': 'a', 'tags': ['x', 1]}, False),
+    ({'name': 'a', 'members': [1, '2']}, False),
+    ({'name': 'a', 'bound': 1.5}, False),
+])
+def test_validate(kwargs, valid):
+    obj = Validated(**kwargs)
+    if valid:
+        assert v.validate(obj)
+    else:
+        with pytest.raises(RequestTypeError):
+            v.validate(obj)
+
+
+def test_validate_compiled_once(monkeypatch):
+    """
+    Verify that type hints are resolved once per class.
+    """
+    calls = []
+    compile_validator = v.compile_validator
+    monkeypatch.setattr(v, '_validators', {})
+    monkeypatch.setattr(v, 'compile_validator', lambda cls: calls.append(cls) or compile_validator(cls))
+    for i in range(3):
+        v.validate(Validated(name=str(i)))
+    assert calls == [Validated]
+
+
+def test_trusted_construction():
+    """
+    Verify that trusted objects skip validation but are still
+    normalized.
+    """
+    with pytest.raises(RequestTypeError):
+        an_if.Interface(name='Ethernet1', mtu='9100')
+    with v.trusted():
+        interface = an_if.Interface(name='Ethernet1', mtu='9100', physical_address='001c.7300.0001',
+                                    attributes=an_if.InterfaceRouteAttributes(
+                                        addresses=[an_if.InterfaceAddress('2001:db8::1/64')]))
+    assert interface.mtu == '9100'
+    assert interface.physical_address == '00-1C-73-00-00-01'
+    assert interface.mode == 'routed'
+    assert interface.attributes.addresses[0].family == 'ipv6'
+    assert not v.is_trusted()
+
+
+def test_trusted_construction_sampled(monkeypatch):
+    """
+    Verify that trusted objects are validated in debug mode when sampled.
+    """
+    monkeypatch.setattr(config, 'debug', True)
+    monkeypatch.setattr(config.driver, 'validation_sample_rate', 1)
+    assert v.validation_sample_rate() == 1
+    with v.trusted(v.validation_sample_rate()):
+        with pytest.raises(RequestTypeError):
+            an_if.Interface(name='Ethernet1', mtu='9100')
+
+
+def test_driver_output_trusted():
+    class InterfaceDriver(DeviceDriver):
+        def _interface_read(self, request_data=None):
+            return [an_if.Interface(name='Ethernet1', mtu='9100')]
+
+    driver = InterfaceDriver(generate_autonet_device(1, True, True))
+    assert driver.execute('interface', 'read')[0].mtu == '9100'
+
+
+def test_driver_output_sampled(monkeypatch):
+    """
+    Verify that the sample rate is applied to streamed driver output.
+    """
+    class InterfaceDriver(DeviceDriver):
+        def _interface_read(self, request_data=None):
+            yield an_if.Interface(name='Ethernet1', mtu='9100')
+
+    driver = InterfaceDriver(generate_autonet_device(1, True, True))
+    monkeypatch.setattr(config, 'debug', True)
+    monkeypatch.setattr(config.driver, 'validation_sample_rate', 1)
+    with pytest.raises(RequestTypeError):
+        list(driver.execute('interface', 'read'))
@@ -1,9 +1,87 @@
+import contextvars
+import functools
 import ipaddress
+import macaddress
+import random
 import re
 import typing
 
+from conf_engine.options import NumberOption
+from contextlib import contextmanager
+
+from autonet.config import config
 from autonet.core.exceptions import RequestTypeError
 
+opts = [
+    NumberOption('validation_sample_rate', minimum=0, maximum=1, default=0.01, cast=float)
+]
+config.register_options(opts, 'driver')
+
+# The sample rate of the active `trusted()` context, or `None`.
+_trusted = contextvars.ContextVar('autonet_trusted', default=None)
+
+
+def validation_sample_rate() -> float:
+    """
+    Returns the fraction of trusted objects that are validated anyway,
+    which is the `[driver]` `validation_sample_rate` option in debug
+    mode and `0` otherwise.  Reading configuration is comparatively
+    slow, so this should be resolved once per driver execution and
+    passed to :py:func:`trusted()`, rather than once per object.
+
+    :return:
+    """
+    return config.driver.validation_sample_rate if config.debug else 0
+
+
+@contextmanager
+def trusted(sample_rate: float = 0):
+    """
+    Context manager within which objects are constructed from trusted
+    input, such as the output of a device driver, and so skip the most
+    expensive validation.  Normalization of field values is still
+    performed.
+
+    :param sample_rate: The fraction of objects to be validated anyway,
+        see :py:func:`validation_sample_rate()`.
+    :return:
+    """
+    token = _trusted.set(sample_rate)
+    try:
+        yield
+    finally:
+        _trusted.reset(token)
+
+
+def is_trusted() -> bool:
+    """
+    Returns `True` if an object under construction may skip validation
+    because it is being constructed within :py:func:`trusted()`.  A
+    sample of such objects, set by the sample rate of the context, is
+    validated anyway so that drivers producing invalid objects are
+    still caught in debug mode.
+
+    :return:
+    """
+    sample_rate = _trusted.get()
+    if sample_rate is None:
+        return False
+    return not sample_rate or random.random() >= sample_rate
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_mac(address: str) -> str:
+    """
+    Returns the canonical representation of an EUI-48 MAC address.
+    Raises `ValueError` if the address is not valid.  Devices repeat the
+    same few MAC addresses across many interfaces, so results are
+    memoized.
+
+    :param address: The MAC address, in any common format.
+    :return:
+    """
+    return str(macaddress.parse(address, macaddress.EUI48))
+
 
 def is_uint16(number: str) -> bool:
     """
@@ -43,24 +121,57 @@ def is_ipv4_address(address: str) -> bool:
     return False
 
 
+# Matches the textual forms of the values validated below.  Numbers are
+# range checked after matching.
+_IPV4_OCTET = r'(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])'
+_RD_PATTERN = re.compile(rf'(?:([0-9]{{1,20}})|({_IPV4_OCTET}(?:\.{_IPV4_OCTET}){{3}})):([0-9]{{1,20}})')
+_RT_PATTERN = re.compile(r'([0-9]{1,20}):([0-9]{1,20})')
+_ESI_SEPARATORS = re.compile(r'[-_.:]')
+
+_UINT16_MAX = 65535
+_UINT32_MAX = 4294967295
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_route_distinguisher(rd: str) -> bool:
+    match = _RD_PATTERN.fullmatch(rd)
+    if match is None:
+        return False
+    asn, address, number = match.groups()
+    number = int(number)
+    if address is not None:
+        return number <= _UINT16_MAX
+    asn = int(asn)
+    return (asn <= _UINT32_MAX and number <= _UINT16_MAX) \
+        or (asn <= _UINT16_MAX and number <= _UINT32_MAX)
+
+
 def is_route_distinguisher(rd: str) -> bool:
     """
     Verifies that the provided string is a properly formatted route
     distinguisher.  Also accepts "auto" which is a special signal
     to an Autonet driver to derive the RD automatically using methods
     appropriate to the device.
+
+    The RD must be an IPv4 address and a 16bit integer, a 32bit and a
+    16bit integer, or a 16bit and a 32bit integer, separated by a colon.
+    Results are memoized.
     :param rd: Route distinguisher, as a string.
     :return:
     """
     if rd == 'auto':
         return True
-    parts = rd.split(':')
-    # There should be exactly two parts. First part can be an integer
-    # or an IPv4 address.  The last part must be an integer.
-    case1 = is_ipv4_address(parts[0]) and is_uint16(parts[1])
-    case2 = is_uint32(parts[0]) and is_uint16(parts[1])
-    case3 = is_uint16(parts[0]) and is_uint32(parts[1])
-    return len(parts) == 2 and (case1 or case2 or case3)
+    return isinstance(rd, str) and _is_route_distinguisher(rd)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_route_target(rt: str) -> bool:
+    match = _RT_PATTERN.fullmatch(rt)
+    if match is None:
+        return False
+    first, second = int(match[1]), int(match[2])
+    return (first <= _UINT16_MAX and second <= _UINT32_MAX) \
+        or (first <= _UINT32_MAX and second <= _UINT16_MAX)
 
 
 def is_route_target(rt: str, allow_auto: bool = True) -> bool:
@@ -68,38 +179,68 @@ def is_route_target(rt: str, allow_auto: bool = True) -> bool:
     Verifies that the provided string is a valid route target.  Also
     accepts "auto" which is a special signal to an Autonet driver to
     derive the RT automatically as appropriate for the device.
+
+    The RT must be a 16bit and a 32bit integer, or a 32bit and a 16bit
+    integer, separated by a colon.  Results are memoized.
     :param rt: A route target string
     :param allow_auto: Allow the special value `auto`.
     :return:
     """
-    if allow_auto and rt == 'auto':
-        return True
+    if rt == 'auto':
+        return allow_auto
+    return isinstance(rt, str) and _is_route_target(rt)
+
 
-    parts = rt.split(':')
-    # There should be exactly 2 parts, both of which are integers.
-    if len(parts) != 2:
+@functools.lru_cache(maxsize=4096)
+def _is_esi(esi: str) -> bool:
+    try:
+        return len(bytes.fromhex(_ESI_SEPARATORS.sub('', esi))) == 10
+    except ValueError:
         return False
-    case1 = is_uint16(parts[0]) and is_uint32(parts[1])
-    case2 = is_uint32(parts[0]) and is_uint16(parts[1])
-    return case1 or case2
 
 
 def is_esi(esi: str) -> bool:
     """
     Verifies the provided string is a properly formatted 10 bytes
     ESI.  Does not verify RFC compliance of ESI type/byte sequence, but
-    only the textual representation is valid.
+    only the textual representation is valid.  Results are memoized.
     :param esi:
     :return:
     """
-    try:
-        esi_bytes = bytes.fromhex(re.sub(r'[-_.:]', '', esi))
-    except ValueError:
-        return False
-    if len(esi_bytes) != 10:
-        return False
-    else:
-        return True
+    return isinstance(esi, str) and _is_esi(esi)
+
+
+def invalid_route_targets(rts: typing.Iterable[str], allow_auto: bool = True) -> list[str]:
+    """
+    Returns the values of `rts` that are not valid route targets, see
+    :py:func:`is_route_target`.  Objects with many import and export
+    targets validate them all with a single call, and values repeated
+    across objects are validated once.
+    :param rts: The route targets.
+    :param allow_auto: Allow the special value `auto`.
+    :return:
+    """
+    return [rt for rt in rts if not is_route_target(rt, allow_auto)]
+
+
+def invalid_route_distinguishers(rds: typing.Iterable[str]) -> list[str]:
+    """
+    Returns the values of `rds` that are not valid route distinguishers,
+    see :py:func:`is_route_distinguisher`.
+    :param rds: The route distinguishers.
+    :return:
+    """
+    return [rd for rd in rds if not is_route_distinguisher(rd)]
+
+
+def invalid_esis(esis: typing.Iterable[str]) -> list[str]:
+    """
+    Returns the values of `esis` that are not valid ESIs, see
+    :py:func:`is_esi`.
+    :param esis: The ESIs.
+    :return:
+    """
+    return [esi for esi in esis if not is_esi(esi)]
 
 
 def validate_union(value, tp):
@@ -136,16 +277,85 @@ def validate_list(value, tp):
     return True
 
 
+def _compile_check(tp) -> typing.Optional[typing.Callable[[object], bool]]:
+    """
+    Returns a function that determines if a value is of the type `tp`,
+    equivalent to :py:func:`validate_union` or :py:func:`validate_list`
+    with the type arguments resolved in advance.  Returns `None` for
+    plain types, which are checked with `isinstance()`.
+
+    :param tp: The type hint.
+    :return:
+    """
+    origin = typing.get_origin(tp)
+    if origin is typing.Union:
+        args = typing.get_args(tp)
+        plain = tuple(t for t in args if typing.get_origin(t) is None)
+        lists = [typing.get_args(t) for t in args if typing.get_origin(t) is list]
+        inner = lists[0] if lists else None
+
+        def check_union(value) -> bool:
+            if inner is not None and isinstance(value, list):
+                for item in value:
+                    if not isinstance(item, inner):
+                        return False
+                return True
+            return isinstance(value, plain)
+        return check_union
+    if origin is list:
+        inner = typing.get_args(tp)
+
+        def check_list(value) -> bool:
+            for item in value:
+                if not isinstance(item, inner):
+                    return False
+            return True
+        return check_list
+    return None
+
+
+def compile_validator(cls: type) -> typing.Callable[[object], bool]:
+    """
+    Compiles a validator for instances of the dataclass `cls` that checks
+    each field's value against its type hint.  The type hints are
+    resolved once, when the validator is compiled, rather than on every
+    validation.
+
+    :param cls: The dataclass.
+    :return:
+    """
+    checks = []
+    for attr, tp in typing.get_type_hints(cls).items():
+        check = _compile_check(tp)
+        valid_types = typing.get_args(tp) if check is not None else None
+        checks.append((attr, tp, check, valid_types))
+    checks = tuple(checks)
+
+    def validator(obj: object) -> bool:
+        for attr, tp, check, valid_types in checks:
+            value = getattr(obj, attr)
+            if check is None:
+                if not isinstance(value, tp):
+                    raise RequestTypeError(attr, value, tp)
+            elif not check(value):
+                raise RequestTypeError(attr, value, tp, valid_types=valid_types)
+        return True
+    return validator
+
+
+_validators = {}
+
+
 def validate(obj: object):
-    for attr, tp in typing.get_type_hints(obj).items():
-        value = getattr(obj, attr)
-
-        if typing.get_origin(tp) is typing.Union:
-            if not validate_union(value, tp):
-                raise RequestTypeError(attr, value, tp, valid_types=typing.get_args(tp))
-        elif typing.get_origin(tp) is list:
-            if not validate_list(value, tp):
-                raise RequestTypeError(attr, value, tp, valid_types=typing.get_args(tp))
-        elif not isinstance(value, tp):
-            raise RequestTypeError(attr, value, tp)
-    return True
+    """
+    Verifies that the fields of a dataclass instance match their type
+    hints, raising :py:exc:`RequestTypeError` otherwise.  Validators are
+    compiled once per class, see :py:func:`compile_validator`.
+
+    :param obj: The object to be validated.
+    :return:
+    """
+    validator = _validators.get(type(obj))
+    if validator is None:
+        validator = _validators[type(obj)] = compile_validator(type(obj))
+    return validator(obj)
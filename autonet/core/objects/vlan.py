@@ -2,8 +2,10 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from autonet.core.objects import validators as v
+from autonet.core.objects import slotted
 
 
+@slotted
 @dataclass
 class VLAN(object):
     id: int = field(default=None)
@@ -12,4 +14,5 @@ class VLAN(object):
     admin_enabled: Optional[bool] = field(default=None)
 
     def __post_init__(self):
-        v.validate(self)
+        if not v.is_trusted():
+            v.validate(self)
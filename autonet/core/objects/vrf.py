@@ -3,8 +3,10 @@ from typing import List, Optional
 
 from autonet.core import exceptions as exc
 from autonet.core.objects import validators as v
+from autonet.core.objects import slotted
 
 
+@slotted
 @dataclass
 class VRF(object):
     name: Optional[str] = field(default=None)
@@ -15,13 +17,15 @@ class VRF(object):
     route_distinguisher: Optional[str] = field(default=None)
 
     def __post_init__(self):
-        for rt_set in [self.import_targets, self.export_targets]:
-            if rt_set is not None:
-                for rt in rt_set:
-                    if not v.is_route_target(rt):
-                        raise exc.RequestValueError('import_targets', rt)
-            if self.route_distinguisher is not None \
-                    and not v.is_route_distinguisher(self.route_distinguisher):
-                raise exc.RequestValueError('route_distinguisher', self.route_distinguisher)
+        if v.is_trusted():
+            return
+        for attr in ['import_targets', 'export_targets']:
+            rt_set = getattr(self, attr)
+            invalid = v.invalid_route_targets(rt_set) if rt_set is not None else None
+            if invalid:
+                raise exc.RequestValueError(attr, invalid[0])
+        if self.route_distinguisher is not None \
+                and not v.is_route_distinguisher(self.route_distinguisher):
+            raise exc.RequestValueError('route_distinguisher', self.route_distinguisher)
 
         v.validate(self)
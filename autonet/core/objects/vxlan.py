@@ -3,8 +3,10 @@ from typing import List, Optional, Union
 
 import autonet.core.exceptions as exc
 from autonet.core.objects import validators as v
+from autonet.core.objects import slotted
 
 
+@slotted
 @dataclass
 class VXLAN(object):
     id: int = field(default=None)
@@ -16,7 +18,8 @@ class VXLAN(object):
     bound_object_id: Optional[Union[str, int]] = field(default=None)
 
     def __post_init__(self):
-        if self.source_address and self.source_address != 'auto':
+        trusted = v.is_trusted()
+        if not trusted and self.source_address and self.source_address != 'auto':
             if not v.is_ipv4_address(self.source_address):
                 raise exc.RequestValueError('source_address', self.source_address)
         if self.layer:
@@ -34,15 +37,18 @@ class VXLAN(object):
             # needs to be cast to a string either way.
             if self.layer == 3 and self.bound_object_id:
                 self.bound_object_id = str(self.bound_object_id)
+            if trusted:
+                return
             # Make sure the route-targets are actual route-targets, and same with the
             # route distinguisher.
-            for rt_set in [self.import_targets, self.export_targets]:
-                if rt_set is not None:
-                    for rt in rt_set:
-                        if not v.is_route_target(rt):
-                            raise exc.RequestValueError('import_targets', rt)
+            for attr in ['import_targets', 'export_targets']:
+                rt_set = getattr(self, attr)
+                invalid = v.invalid_route_targets(rt_set) if rt_set is not None else None
+                if invalid:
+                    raise exc.RequestValueError(attr, invalid[0])
             if self.route_distinguisher is not None \
                     and not v.is_route_distinguisher(self.route_distinguisher):
                 raise exc.RequestValueError('route_distinguisher', self.route_distinguisher)
 
-        v.validate(self)
+        if not trusted:
+            v.validate(self)
@@ -0,0 +1,300 @@
+"""
+Rate limiting of API requests per token, or per user, by token bucket.
+Each client has a bucket holding up to `burst` tokens, which is refilled
+at `rate` tokens per second, and each request takes one token from it.
+A request made when the bucket is empty is rejected with a `429`.
+
+A global limit applies to every request, while the admin and device
+limits apply, in addition, to requests for the admin endpoints and the
+device endpoints respectively.  A rate of `0` disables a limit.
+
+Buckets are held in the memory of each process by default.  The
+`database` store shares them between all processes using the Autonet
+database.
+"""
+import logging
+import math
+import random
+import threading
+import time
+
+from conf_engine.options import NumberOption, StringOption
+from dataclasses import dataclass, replace
+from flask import g, request, Response
+from typing import List, Optional, Tuple
+
+from autonet.config import config
+
+opts = [
+    StringOption('store', default='local', choices=['local', 'database']),
+    StringOption('key', default='token', choices=['token', 'user']),
+    NumberOption('rate', minimum=0, default=0, cast=float),
+    NumberOption('burst', minimum=1, default=20),
+    NumberOption('admin_rate', minimum=0, default=0, cast=float),
+    NumberOption('admin_burst', minimum=1, default=5),
+    NumberOption('device_rate', minimum=0, default=0, cast=float),
+    NumberOption('device_burst', minimum=1, default=10)
+]
+config.register_options(opts, 'ratelimit')
+
+ADMIN_BLUEPRINTS = ['users']
+# Attempts to update contended buckets in the database, and the initial
+# backoff in seconds between them, which doubles with each attempt.
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.005
+
+
+@dataclass
+class TokenBucket(object):
+    """
+    The state of a token bucket.
+
+    :param tokens: The number of tokens in the bucket.
+    :param updated: The time at which `tokens` was calculated.
+    """
+    tokens: float
+    updated: float
+
+    def refill(self, now: float, rate: float, burst: int) -> bool:
+        """
+        Refill the bucket for the time elapsed since it was last updated.
+        Returns `False` if the bucket is empty.
+
+        :param now: The current time.
+        :param rate: Tokens added per second.
+        :param burst: The capacity of the bucket.
+        :return:
+        """
+        self.tokens = min(burst, self.tokens + max(now - self.updated, 0) * rate)
+        self.updated = now
+        return self.tokens >= 1
+
+    def take(self, now: float, rate: float, burst: int) -> bool:
+        """
+        Refill the bucket for the time elapsed since it was last updated
+        and take a token from it.  Returns `False` if the bucket is empty.
+
+        :param now: The current time.
+        :param rate: Tokens added per second.
+        :param burst: The capacity of the bucket.
+        :return:
+        """
+        if not self.refill(now, rate, burst):
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class RateLimit(object):
+    """
+    The outcome of taking a token from a bucket, as reported to the
+    client in the rate limit response headers.
+
+    :param allowed: Whether a token was taken.
+    :param limit: The capacity of the bucket.
+    :param remaining: The number of whole tokens left.
+    :param reset: Seconds until the bucket is full.
+    :param retry_after: Seconds until a token is available.
+    """
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: int
+
+    @classmethod
+    def from_bucket(cls, allowed: bool, bucket: TokenBucket, rate: float,
+                    burst: int) -> 'RateLimit':
+        return cls(allowed=allowed, limit=burst, remaining=int(bucket.tokens),
+                   reset=math.ceil((burst - bucket.tokens) / rate),
+                   retry_after=0 if allowed else math.ceil((1 - bucket.tokens) / rate))
+
+    def set_headers(self, response: Response):
+        response.headers['RateLimit-Limit'] = str(self.limit)
+        response.headers['RateLimit-Remaining'] = str(self.remaining)
+        response.headers['RateLimit-Reset'] = str(self.reset)
+
+
+def _take_all(buckets: List[TokenBucket], now: float,
+              limits: List[Tuple[str, float, int]]) -> List[RateLimit]:
+    """
+    Refill the buckets and, only if every one of them holds a token, take
+    a token from each, so that a request rejected by one bucket does not
+    use up the tokens of the others.  Returns the outcome for each bucket,
+    which is not allowed for those that are empty.
+
+    :param buckets: The buckets, in the order of `limits`.
+    :param now: The current time.
+    :param limits: The key, rate and burst of each bucket.
+    :return:
+    """
+    allowed = [bucket.refill(now, rate, burst) for bucket, (_, rate, burst) in zip(buckets, limits)]
+    if all(allowed):
+        for bucket in buckets:
+            bucket.tokens -= 1
+    return [RateLimit.from_bucket(a, bucket, rate, burst)
+            for a, bucket, (_, rate, burst) in zip(allowed, buckets, limits)]
+
+
+class BucketStore(object):
+    """
+    Base class for stores of token buckets.  Child classes implement
+    :py:meth:`take_all()`.
+
+    The base class itself performs no limiting.
+    """
+
+    def take(self, key: str, rate: float, burst: int) -> RateLimit:
+        """
+        Take a token from the bucket identified by `key`, creating a full
+        bucket if it does not exist.
+
+        :param key: The bucket key.
+        :param rate: Tokens added per second.
+        :param burst: The capacity of the bucket.
+        :return:
+        """
+        return self.take_all([(key, rate, burst)])[0]
+
+    def take_all(self, limits: List[Tuple[str, float, int]]) -> List[RateLimit]:
+        """
+        Take a token from each of the buckets identified by the keys of
+        `limits` if, and only if, all of them hold a token.  Buckets that
+        do not exist are created full.
+
+        :param limits: The key, rate and burst of each bucket.
+        :return:
+        """
+        return [RateLimit(allowed=True, limit=burst, remaining=burst, reset=0, retry_after=0)
+                for _, _, burst in limits]
+
+
+class LocalBucketStore(BucketStore):
+    """
+    Holds token buckets in memory, limiting the requests handled by this
+    process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take_all(self, limits: List[Tuple[str, float, int]]) -> List[RateLimit]:
+        now = time.monotonic()
+        with self._lock:
+            buckets = [self._buckets.setdefault(key, TokenBucket(burst, now))
+                       for key, _, burst in limits]
+            return _take_all(buckets, now, limits)
+
+
+class DatabaseBucketStore(BucketStore):
+    """
+    Holds token buckets in the `rate_limit_buckets` table of the Autonet
+    database, limiting the requests handled by all processes sharing it.
+    Concurrent updates of a bucket are detected by its update time, and
+    retried with a backoff up to :py:data:`MAX_RETRIES` times, after which
+    the request is rejected.
+    """
+
+    def take_all(self, limits: List[Tuple[str, float, int]]) -> List[RateLimit]:
+        from sqlalchemy import update
+        from sqlalchemy.exc import IntegrityError
+        from autonet.db import Session
+        from autonet.db.models import RateLimitBuckets
+
+        with Session() as s:
+            for attempt in range(MAX_RETRIES):
+                now = time.time()
+                rows = [s.get(RateLimitBuckets, key, populate_existing=True)
+                        for key, _, _ in limits]
+                buckets = [TokenBucket(burst, now) if row is None
+                           else TokenBucket(row.tokens, row.updated_on)
+                           for row, (_, _, burst) in zip(rows, limits)]
+                outcomes = _take_all(buckets, now, limits)
+                if not all(o.allowed for o in outcomes):
+                    # No tokens were taken, so there is nothing to store.
+                    return outcomes
+                try:
+                    updated = True
+                    for row, bucket, (key, _, _) in zip(rows, buckets, limits):
+                        if row is None:
+                            s.add(RateLimitBuckets(key=key, tokens=bucket.tokens, updated_on=now))
+                            s.flush()
+                            continue
+                        result = s.execute(update(RateLimitBuckets).where(
+                            RateLimitBuckets.key == key,
+                            RateLimitBuckets.updated_on == row.updated_on).values(
+                            tokens=bucket.tokens, updated_on=now))
+                        if not result.rowcount:
+                            updated = False
+                            break
+                    if updated:
+                        s.commit()
+                        return outcomes
+                except IntegrityError:
+                    pass
+                s.rollback()
+                time.sleep(random.uniform(0, RETRY_BACKOFF * 2 ** attempt))
+        # The buckets are contended by concurrent requests of the same
+        # client, so the request is rejected rather than retried further.
+        logging.warning(f'Failed to update rate limit buckets '
+                        f'{[key for key, _, _ in limits]} after {MAX_RETRIES} attempts')
+        return [replace(o, allowed=False, retry_after=max(o.retry_after, 1)) for o in outcomes]
+
+
+_store = None
+
+
+def bucket_store() -> BucketStore:
+    """
+    Returns the process wide :py:class:`BucketStore` as configured by the
+    `[ratelimit]` `store` option.
+
+    :return:
+    """
+    global _store
+    if _store is None:
+        if config.ratelimit.store == 'database':
+            _store = DatabaseBucketStore()
+        else:
+            _store = LocalBucketStore()
+    return _store
+
+
+def limits() -> List[Tuple[str, float, int]]:
+    """
+    Returns the name, rate and burst of each limit that applies to the
+    current request.
+
+    :return:
+    """
+    rl = config.ratelimit
+    applicable = [('global', rl.rate, rl.burst)]
+    if request.blueprint in ADMIN_BLUEPRINTS:
+        applicable.append(('admin', rl.admin_rate, rl.admin_burst))
+    elif request.view_args and 'device_id' in request.view_args:
+        applicable.append(('device', rl.device_rate, rl.device_burst))
+    return [limit for limit in applicable if limit[1] > 0]
+
+
+def check() -> Optional[RateLimit]:
+    """
+    Take a token from each of the authenticated client's buckets that
+    apply to the current request, if all of them hold one.  Returns the
+    most restrictive outcome, or `None` if no limit applies.
+
+    :return:
+    """
+    applicable = limits()
+    if not applicable:
+        return None
+    client = g.user if config.ratelimit.key == 'user' else g.token_id
+    store = bucket_store()
+    outcomes = store.take_all([(f'{config.ratelimit.key}:{client}:{name}', rate, burst)
+                               for name, rate, burst in applicable])
+    rejected = [o for o in outcomes if not o.allowed]
+    if rejected:
+        logging.info(f'Rate limit exceeded by {config.ratelimit.key} {client}')
+        return max(rejected, key=lambda o: o.retry_after)
+    return min(outcomes, key=lambda o: o.remaining)
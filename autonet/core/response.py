@@ -1,34 +1,215 @@
+import hashlib
 import logging
 
-from flask import g, jsonify
+from collections.abc import Iterator
+from conf_engine.options import NumberOption
+from flask import current_app, g, has_request_context, jsonify, request, Response, stream_with_context
+from itertools import islice
 from werkzeug.exceptions import MethodNotAllowed, NotFound
 
 import autonet.core.exceptions as exc
 
 from autonet.config import config
+from autonet.core import serialization
+from autonet.core.metrics import metrics
+
+opts = [
+    NumberOption('stream_chunk_size', minimum=1, default=100)
+]
+config.register_options(opts, 'response')
+
+CONDITIONAL_METHODS = ['GET', 'HEAD']
+JSON_MIMETYPE = 'application/json'
+
+
+def negotiate_mimetype() -> str:
+    """
+    Returns the response mimetype preferred by the client's `Accept`
+    header from JSON and any available binary formats.  JSON is
+    returned unless the client prefers another format.
+
+    :return:
+    """
+    if not has_request_context():
+        return JSON_MIMETYPE
+    mimetypes = [JSON_MIMETYPE, *serialization.binary_formats()]
+    return request.accept_mimetypes.best_match(mimetypes, default=JSON_MIMETYPE)
+
+
+def is_stream(obj) -> bool:
+    """
+    Returns `True` if `obj` is an iterator, such as a generator, whose
+    items should be streamed to the client rather than collected into
+    a list first.
+
+    :param obj: The response data.
+    :return:
+    """
+    return isinstance(obj, Iterator)
+
+
+def content_etag(response: Response) -> str:
+    """
+    Returns an entity tag derived from the content of a response body.
+    The request ID is excluded so that identical data yields the same
+    tag from one request to the next.
+
+    :param response: The response object.
+    :return:
+    """
+    body = response.get_data().replace(g.request_id.encode(), b'')
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def version_etag(device_id, version: str) -> str:
+    """
+    Returns an entity tag for the requested resource derived from a
+    device configuration version reported by the device driver.  This
+    allows conditional requests to be answered before reading from the
+    device.
+
+    :param device_id: The device ID.
+    :param version: The configuration version reported by the driver.
+    :return:
+    """
+    key = f'{device_id}\0{request.full_path}\0{negotiate_mimetype()}\0{version}'.encode()
+    return 'v-' + hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+def _make_conditional(response: Response, status, headers):
+    """
+    Sets the `ETag` for a successful GET response and replaces the
+    response with an empty `304` if the client's `If-None-Match`
+    header matches.
+
+    :return:
+    """
+    if not has_request_context() or request.method not in CONDITIONAL_METHODS \
+            or (status or 200) != 200:
+        return response, status, headers
+    etag = g.get('etag') or content_etag(response)
+    response.set_etag(etag)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        status = 304
+    return response, status, headers
+
+
+def _stream_envelope(items: Iterator, status):
+    """
+    Generates the response envelope, serializing `items` into the `data`
+    list a chunk at a time as they are produced.  The output is the same
+    as that of a non-streamed response.  Since the status line has
+    already been sent, an exception raised while producing the items is
+    reported in the envelope's `errors` and `status` only.
+
+    :param items: The objects to be returned.
+    :param status: The response status.
+    :return:
+    """
+    dumps = current_app.json.dumps
+    errors = []
+    yield '{"data":['
+    try:
+        separator = ''
+        while True:
+            chunk = list(islice(items, config.response.stream_chunk_size))
+            if not chunk:
+                break
+            yield separator + dumps(chunk)[1:-1]
+            separator = ','
+    except Exception as e:
+        logging.exception(f'Error while streaming response for request_id {g.request_id}')
+        if isinstance(e, exc.AutonetException) or config.debug:
+            errors.append(str(e))
+        else:
+            errors.append("An internal application error has occurred.")
+        status = 500
+    finally:
+        if hasattr(items, 'close'):
+            items.close()
+    yield f'],"errors":{dumps(errors)},"request-id":{dumps(g.request_id)},"status":{status or 200}}}\n'
+
+
+def stream_response(items: Iterator, status=None, headers=None):
+    """
+    Returns a response whose envelope is written incrementally as the
+    items are consumed from the iterator, so that the full result never
+    needs to be held in memory.
+
+    :param items: The objects to be returned.
+    :param status: The response status.
+    :param headers: Additional response headers.
+    :return:
+    """
+    body = stream_with_context(_stream_envelope(items, status))
+    return Response(body, mimetype=current_app.json.mimetype), status, headers
+
 
 def autonet_response(response=None, status=None, headers=None):
     if g.errors and not status:
         status = 500
     for error in g.errors:
-        if isinstance(error, exc.RequestValueMissing):
+        if isinstance(error, (exc.RequestValueMissing, exc.RequestValueError,
+                              exc.RequestTypeError)):
             status = 400
         if isinstance(error, (NotFound, exc.ObjectNotFound)):
             status = 404
         if isinstance(error, MethodNotAllowed):
             status = 405
-        if isinstance(error, exc.ObjectExists):
+        if isinstance(error, (exc.ObjectExists, exc.IdempotencyKeyInProgress)):
             status = 409
+        if isinstance(error, exc.IdempotencyKeyMismatch):
+            status = 422
         if isinstance(error, exc.DriverOperationUnsupported) \
                 or isinstance(error, exc.DeviceOperationUnsupported):
             status = 501
+        if isinstance(error, (exc.DeviceBusy, exc.RateLimitExceeded)):
+            status = 429
+            headers = {**(headers or {}), 'Retry-After': str(error.retry_after)}
+    cache_age = getattr(g.get('driver'), 'cache_age', None)
+    if cache_age is not None:
+        headers = {**(headers or {}), 'Age': str(int(cache_age))}
     errors = [str(error) for error in g.errors]
     if errors and config.debug:
         logging.debug(errors)
-    response = jsonify({
+    mimetype = negotiate_mimetype()
+    if is_stream(response):
+        if not errors and mimetype == JSON_MIMETYPE:
+            return _vary(stream_response(response, status, headers))
+        if errors:
+            if hasattr(response, 'close'):
+                response.close()
+            response = None
+        else:
+            # Binary formats encode the length of the list up front.
+            response = list(response)
+    envelope = {
         "request-id": g.request_id,
         "data": response,
         "errors": errors,
         "status": status or 200
-    })
-    return response, status, headers
+    }
+    with metrics.timer('response.serialize'):
+        if mimetype == JSON_MIMETYPE:
+            response = jsonify(envelope)
+        else:
+            response = Response(serialization.binary_formats()[mimetype](envelope),
+                                mimetype=mimetype)
+    if not errors:
+        return _vary(_make_conditional(response, status, headers))
+    return _vary((response, status, headers))
+
+
+def _vary(result: tuple) -> tuple:
+    """
+    Adds `Accept` to the `Vary` header of the response when binary
+    formats may be negotiated.
+
+    :param result: The response, status and headers.
+    :return:
+    """
+    if serialization.binary_formats():
+        result[0].vary.add('Accept')
+    return result
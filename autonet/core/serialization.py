@@ -0,0 +1,199 @@
+import dataclasses
+
+from conf_engine.options import BooleanOption
+from datetime import timezone
+from flask.json.provider import DefaultJSONProvider
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional
+
+from autonet.config import config
+from autonet.util.config_string import VLANSet
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+opts = [
+    BooleanOption('orjson', default=True)
+]
+config.register_options(opts, 'response')
+
+_encoders = {}
+
+
+def compile_encoder(cls: type) -> Callable[[Any], dict]:
+    """
+    Builds a function that converts an instance of the dataclass `cls`
+    into a dictionary of its fields.  Unlike :py:func:`dataclasses.asdict`
+    the conversion is shallow and values are not copied; nested objects
+    are converted by the JSON encoder as it reaches them.
+
+    :param cls: A dataclass.
+    :return:
+    """
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    if len(names) == 1:
+        name = names[0]
+
+        def encode(obj):
+            return {name: getattr(obj, name)}
+    else:
+        getter = attrgetter(*names)
+
+        def encode(obj):
+            return dict(zip(names, getter(obj)))
+    return encode
+
+
+def register_encoder(cls: type, encoder: Callable[[Any], Any]):
+    """
+    Register a function that converts instances of `cls` into a value
+    the JSON encoder can serialize.
+
+    :param cls: The class to be encoded.
+    :param encoder: The encoding function.
+    :return:
+    """
+    _encoders[cls] = encoder
+
+
+register_encoder(VLANSet, list)
+
+
+def get_encoder(cls: type) -> Optional[Callable[[Any], Any]]:
+    """
+    Returns the encoder for `cls`, compiling one if `cls` is a dataclass
+    that has not been encoded before.  Returns `None` if there is no
+    encoder for the class.
+
+    :param cls: The class to be encoded.
+    :return:
+    """
+    encoder = _encoders.get(cls)
+    if encoder is None and dataclasses.is_dataclass(cls):
+        encoder = _encoders[cls] = compile_encoder(cls)
+    return encoder
+
+
+def default(obj: Any) -> Any:
+    """
+    Converts objects that are not natively JSON serializable, using a
+    registered or compiled encoder if one is available and Flask's
+    default conversions otherwise.
+
+    :param obj: The object to be converted.
+    :return:
+    """
+    encoder = get_encoder(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+def dumps_msgpack(obj: Any) -> bytes:
+    """
+    Serialize `obj` to MessagePack, converting objects with the same
+    encoders used for JSON.
+
+    :param obj: The object to be serialized.
+    :return:
+    """
+    return msgpack.packb(obj, default=default)
+
+
+def _cbor_default(encoder, obj: Any):
+    encoder.encode(default(obj))
+
+
+def dumps_cbor(obj: Any) -> bytes:
+    """
+    Serialize `obj` to CBOR, converting objects with the same encoders
+    used for JSON.  Unlike JSON, CBOR has native types for values such
+    as datetimes and UUIDs, which are used instead.  Naive datetimes are
+    taken to be UTC.
+
+    :param obj: The object to be serialized.
+    :return:
+    """
+    return cbor2.dumps(obj, default=_cbor_default, timezone=timezone.utc)
+
+
+def binary_formats() -> Dict[str, Callable[[Any], bytes]]:
+    """
+    Returns the binary response formats that are available, keyed by
+    mimetype, with the function that serializes an object to each.
+
+    :return:
+    """
+    formats = {}
+    if msgpack is not None:
+        formats['application/msgpack'] = dumps_msgpack
+    if cbor2 is not None:
+        formats['application/cbor'] = dumps_cbor
+    return formats
+
+
+class AutonetJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes Autonet objects, and other dataclasses
+    such as the database models, through per-class encoders.  When
+    `orjson <https://github.com/ijl/orjson>`_ is installed, and enabled
+    by the `[response]` `orjson` option, it is used to perform the
+    serialization.  Output is otherwise the same as Flask's default
+    provider.
+    """
+    default = staticmethod(default)
+
+    def _orjson_option(self, kwargs: dict) -> Optional[int]:
+        """
+        Returns the orjson options equivalent to the `json.dumps()`
+        keyword arguments, or `None` if orjson cannot be used.
+
+        :param kwargs: Keyword arguments for `json.dumps()`.
+        :return:
+        """
+        if orjson is None or not config.response.orjson:
+            return None
+        option = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME \
+            | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent') == 2:
+            option |= orjson.OPT_INDENT_2
+        elif kwargs.get('indent') is not None:
+            return None
+        if kwargs.keys() - {'sort_keys', 'indent', 'separators', 'ensure_ascii'}:
+            return None
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = self._orjson_option(kwargs)
+        if option is not None:
+            try:
+                data = orjson.dumps(obj, default=self.default, option=option)
+            except orjson.JSONEncodeError:
+                # orjson is stricter than json, such as with integers
+                # larger than 64 bits, so fall back to json.
+                data = None
+            # orjson cannot escape non-ASCII characters, so output that
+            # contains them is left to json when `ensure_ascii` is set.
+            if data is not None and (data.isascii()
+                                     or not kwargs.get('ensure_ascii', self.ensure_ascii)):
+                return data.decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and config.response.orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
@@ -0,0 +1,134 @@
+"""
+Production server for Autonet, based on `gunicorn <https://gunicorn.org>`_,
+which is installed with the `server` extra.  The application is loaded
+and its caches warmed in the master process, which then forks the
+configured number of worker processes, each serving requests with a
+pool of threads.
+
+Sending `SIGHUP` to the master process gracefully replaces the workers,
+allowing in-flight requests up to `[server]` `graceful_timeout` seconds
+to complete.
+"""
+import dataclasses
+import inspect
+import logging
+import multiprocessing
+
+from conf_engine.options import NumberOption, StringOption
+from flask import Flask
+
+from autonet.config import config
+from autonet.core import cache, idempotency, locks, ratelimit, serialization
+from autonet.core.marshal import preload_drivers
+from autonet.core.objects import interfaces, lag, vlan, vrf, vxlan
+from autonet.db import engine
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+opts = [
+    StringOption('mode', default='development', choices=['development', 'production']),
+    NumberOption('workers', minimum=0, default=0),
+    NumberOption('threads', minimum=1, default=8),
+    NumberOption('keepalive', minimum=0, default=5),
+    NumberOption('timeout', minimum=0, default=120),
+    NumberOption('graceful_timeout', minimum=0, default=30),
+    NumberOption('max_requests', minimum=0, default=0)
+]
+config.register_options(opts, 'server')
+
+
+def worker_count() -> int:
+    """
+    Returns the number of worker processes to start.  When the `workers`
+    option is 0 this is derived from the number of CPUs.
+
+    :return:
+    """
+    return config.server.workers or multiprocessing.cpu_count() * 2 + 1
+
+
+def warm_caches():
+    """
+    Populate process wide caches before the workers are forked, so that
+    each worker inherits them instead of filling them on its first
+    requests.
+
+    :return:
+    """
+    preload_drivers('autonet.drivers')
+    for module in [interfaces, lag, vlan, vrf, vxlan]:
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if dataclasses.is_dataclass(cls) and cls.__module__ == module.__name__:
+                serialization.get_encoder(cls)
+
+
+def post_fork(server, worker):
+    """
+    Called in each worker after it has been forked.  Database connections
+    opened by the master process must not be shared with the workers.
+
+    :return:
+    """
+    engine.dispose(close=False)
+
+
+class AutonetApplication(BaseApplication or object):
+    """
+    Runs the Autonet Flask application under gunicorn with settings
+    taken from the Autonet configuration.
+    """
+
+    def __init__(self, app: Flask):
+        self.application = app
+        super().__init__()
+
+    def settings(self) -> dict:
+        """
+        Returns the gunicorn settings derived from the configuration.
+
+        :return:
+        """
+        return {
+            'bind': f'{config.bind_host}:{config.port}',
+            'workers': worker_count(),
+            'threads': config.server.threads,
+            'worker_class': 'gthread',
+            'keepalive': config.server.keepalive,
+            'timeout': config.server.timeout,
+            'graceful_timeout': config.server.graceful_timeout,
+            'max_requests': config.server.max_requests,
+            'preload_app': True,
+            'post_fork': post_fork
+        }
+
+    def load_config(self):
+        for key, value in self.settings().items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        warm_caches()
+        locks.configure(self.cfg.workers)
+        cache.configure(self.cfg.workers)
+        if self.cfg.workers > 1 and config.idempotency.store == 'local':
+            logging.warning('The `local` idempotency store is not shared between worker '
+                            'processes, use the `database` store.')
+        if self.cfg.workers > 1 and config.ratelimit.store == 'local':
+            logging.info('Rate limits are applied by each worker process, use the '
+                         '`database` store to apply them across workers.')
+        return self.application
+
+
+def run_production_server(app: Flask):
+    """
+    Serve the application with the production server.
+
+    :param app: The Flask application.
+    :return:
+    """
+    if BaseApplication is None:
+        raise RuntimeError('The production server requires gunicorn, which is '
+                           'installed with `pip install autonet-api[server]`.')
+    AutonetApplication(app).run()
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import threading
+import weakref
+
+from conf_engine.options import BooleanOption
+from typing import Callable, Hashable, Tuple
+
+from autonet.config import config
+
+opts = [
+    BooleanOption('coalesce_reads', default=True)
+]
+config.register_options(opts, 'driver')
+
+
+class _Flight(object):
+    """
+    Tracks a single in-flight call and the outcome shared with any
+    callers that joined it while it was running.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+        self.shared = 0
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls that share a key into a single
+    execution.  The first caller for a key (the leader) executes the
+    function, any callers that arrive with the same key while the
+    leader is still running wait for, and receive, the leader's result.
+    If the leader raises an exception then it is re-raised for each
+    waiting caller as well.
+
+    Once a call completes the key is forgotten, so a later call with
+    the same key will execute the function again.  Results are shared
+    between callers by reference and should be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs):
+        """
+        Execute `func` with the provided arguments unless a call with
+        the same `key` is already in flight, in which case wait for
+        that call to complete and return its result.
+
+        :param key: Identifies calls that may be coalesced.
+        :param func: The function to execute.
+        :return:
+        """
+        return self.do_shared(key, func, *args, **kwargs)[0]
+
+    def do_shared(self, key: Hashable, func: Callable, *args, **kwargs) -> Tuple[object, bool]:
+        """
+        Same as :py:meth:`do()`, but returns a tuple of the result and a
+        boolean that is `True` if the caller joined a call made by another
+        caller rather than executing `func` itself.
+
+        :param key: Identifies calls that may be coalesced.
+        :param func: The function to execute.
+        :return:
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.shared += 1
+
+        if not leader:
+            logging.debug(f'Joining in-flight call for {key}')
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.result, True
+
+        try:
+            flight.result = func(*args, **kwargs)
+        except BaseException as e:
+            flight.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+            if flight.shared:
+                logging.debug(f'Shared result of {key} with {flight.shared} callers')
+        return flight.result, False
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Returns `True` if a call for `key` is currently executing.
+
+        :param key: The call key.
+        :return:
+        """
+        with self._lock:
+            return key in self._flights
+
+
+class AsyncSingleFlight(object):
+    """
+    The coroutine counterpart of :py:class:`SingleFlight`.  Calls are
+    only coalesced with calls awaited on the same event loop.
+    """
+
+    def __init__(self):
+        self._flights = weakref.WeakKeyDictionary()
+
+    async def do_shared(self, key: Hashable, func: Callable, *args, **kwargs) -> Tuple[object, bool]:
+        """
+        Await the coroutine function `func` with the provided arguments
+        unless a call with the same `key` is already in flight, in which
+        case wait for that call to complete.  Returns a tuple of the
+        result and a boolean that is `True` if the caller joined a call
+        made by another caller.
+
+        :param key: Identifies calls that may be coalesced.
+        :param func: The coroutine function to execute.
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        flights = self._flights.setdefault(loop, {})
+        if key in flights:
+            logging.debug(f'Joining in-flight call for {key}')
+            return await asyncio.shield(flights[key]), True
+
+        future = flights[key] = loop.create_future()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, there may be no waiters.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del flights[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Returns `True` if a call for `key` is currently executing on the
+        running event loop.
+
+        :param key: The call key.
+        :return:
+        """
+        return key in self._flights.get(asyncio.get_running_loop(), {})
+
+
+# Process wide groups used by `DeviceDriver.execute()` and
+# `DeviceDriver.execute_async()` to coalesce identical device reads.
+read_flights = SingleFlight()
+async_read_flights = AsyncSingleFlight()
@@ -49,3 +49,21 @@ class MockBackend:
 
     def get_device(self, device_id):
         return self._mocked_device
+
+
+@pytest.fixture
+def mock_driver(monkeypatch, db_session):
+    """
+    Routes device requests made through the test client to a device
+    driver class supplied by the test.  Call the fixture with the driver
+    class to be used.
+    """
+    import autonet.core.app as app
+
+    def _mock_driver(driver_class, device_id=25):
+        device = generate_autonet_device(device_id, True, True)
+        monkeypatch.setattr(app, 'marshal_device', lambda _: device)
+        monkeypatch.setattr(app, 'marshal_driver', lambda *_: driver_class)
+        return device
+
+    return _mock_driver
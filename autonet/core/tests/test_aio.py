@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+import threading
+
+from autonet.core import aio, cache, limiter
+from autonet.core.cache import ReadCache
+from autonet.core.exceptions import DeviceBusy
+from autonet.core.limiter import DeviceLimiter
+from autonet.core.objects import validators
+from autonet.drivers.device.driver import DeviceDriver
+from autonet.core.tests.conftest import generate_autonet_device
+
+
+class AsyncDriver(DeviceDriver):
+    calls = []
+
+    async def _vrf_read(self, request_data=None):
+        self.calls.append(request_data)
+        await asyncio.sleep(0.1)
+        return [threading.current_thread().name, validators.is_trusted()]
+
+    async def _vrf_update(self, request_data=None):
+        self.calls.append(request_data)
+        await asyncio.sleep(0.2)
+        return request_data
+
+    async def _interface_read(self, request_data=None):
+        self.calls.append(request_data)
+        return (name for name in ['eth0', 'eth1'])
+
+
+@pytest.fixture
+def async_driver(monkeypatch):
+    monkeypatch.setattr(validators, 'validation_sample_rate', lambda: 0)
+    AsyncDriver.calls = []
+    return AsyncDriver
+
+
+def test_run_from_event_loop():
+    async def nested():
+        return aio.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        aio.run(nested())
+
+
+def test_execute_async_driver(async_driver):
+    """
+    Verify that coroutine capability functions run on the driver event
+    loop, and that the objects they construct are trusted.
+    """
+    driver = async_driver(generate_autonet_device(1, True, True))
+    assert driver.execute('vrf', 'read') == ['autonet-driver-loop', True]
+
+
+def test_execute_async_coalesces_reads(async_driver):
+    drivers = [async_driver(generate_autonet_device(1, True, True)) for _ in range(5)]
+    threads = [threading.Thread(target=d.execute, args=('vrf', 'read')) for d in drivers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(async_driver.calls) == 1
+
+
+def test_execute_async_iterator_not_cached(async_driver, monkeypatch):
+    """
+    Verify that an iterator returned by a coroutine is streamed, and not
+    cached for later readers.
+    """
+    monkeypatch.setattr(cache, '_read_cache', ReadCache(ttl=60))
+    driver = async_driver(generate_autonet_device(1, True, True))
+    assert list(driver.execute('interface', 'read')) == ['eth0', 'eth1']
+    assert list(driver.execute('interface', 'read')) == ['eth0', 'eth1']
+    assert len(async_driver.calls) == 2
+
+
+def test_execute_async_write_limited(async_driver, monkeypatch):
+    """
+    Verify that coroutine writes hold the device's execution slot.
+    """
+    monkeypatch.setattr(limiter, '_device_limiter', DeviceLimiter(max_writes=1, timeout=0))
+    driver = async_driver(generate_autonet_device(1, True, True))
+    first = threading.Thread(target=driver.execute, args=('vrf', 'update', 'vrf1'))
+    first.start()
+    while not async_driver.calls:
+        pass
+    with pytest.raises(DeviceBusy):
+        driver.execute('vrf', 'update', 'vrf2')
+    first.join()
+    assert async_driver.calls == ['vrf1']
+
+
+def test_execute_async_awaits_on_running_loop(async_driver):
+    """
+    Verify that execute_async() awaits coroutine capability functions on
+    the running event loop, and that reads are coalesced there.
+    """
+    driver = async_driver(generate_autonet_device(1, True, True))
+
+    async def reads():
+        return await asyncio.gather(*[driver.execute_async('vrf', 'read') for _ in range(5)])
+
+    results = asyncio.run(reads())
+    assert results == [[threading.current_thread().name, True]] * 5
+    assert len(async_driver.calls) == 1
+
+
+def test_execute_async_write_limited(async_driver, monkeypatch):
+    monkeypatch.setattr(limiter, '_device_limiter', DeviceLimiter(max_writes=1, timeout=0))
+    driver = async_driver(generate_autonet_device(1, True, True))
+
+    async def writes():
+        return await asyncio.gather(driver.execute_async('vrf', 'update', 'vrf1'),
+                                    driver.execute_async('vrf', 'update', 'vrf2'),
+                                    return_exceptions=True)
+
+    first, second = asyncio.run(writes())
+    assert first == 'vrf1'
+    assert isinstance(second, DeviceBusy)
+    assert async_driver.calls == ['vrf1']
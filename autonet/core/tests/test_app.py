@@ -25,3 +25,29 @@ def test_append_exception_to_errors(flask_app, setup_request):
         r, s, h = append_exception_to_errors(e)
         assert e in g.errors
         assert e_message in r.json['errors']
+
+
+def test_conditional_get_config_version(client, mock_driver, test_auth_header):
+    """
+    Verify that a driver reporting a configuration version can answer a
+    conditional GET without reading from the device.
+    """
+    from autonet.drivers.device.driver import DeviceDriver
+    reads = []
+
+    class VersionedDriver(DeviceDriver):
+        def get_config_version(self):
+            return 'commit-1'
+
+        def _vrf_read(self, request_data=None):
+            reads.append(request_data)
+            return []
+
+    mock_driver(VersionedDriver)
+    response = client.get('/25/vrfs', headers=test_auth_header)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert len(reads) == 1
+    response = client.get('/25/vrfs', headers={**test_auth_header, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert len(reads) == 1
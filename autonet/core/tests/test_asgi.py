@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+import pytest
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, stream_with_context
+
+from autonet.core import aio, limiter
+from autonet.core.limiter import DeviceLimiter
+from autonet.core.objects import validators, vrf as an_vrf
+from autonet.drivers.device.driver import DeviceDriver
+
+pytestmark = pytest.mark.skipif(aio.greenlet is None, reason='greenlet is not installed')
+
+if aio.greenlet is not None:
+    from autonet.core.asgi import ASGIAdapter, asgi_app, build_environ
+
+
+class InFlightDriver(DeviceDriver):
+    delay = 0.5
+    in_flight = 0
+    max_in_flight = 0
+    threads = set()
+
+    @classmethod
+    def _enter(cls):
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        cls.threads.add(threading.current_thread().name)
+
+    async def _vrf_read(self, request_data=None):
+        self._enter()
+        await asyncio.sleep(self.delay)
+        type(self).in_flight -= 1
+        return an_vrf.VRF(name=request_data, ipv4=validators.is_trusted())
+
+
+class SyncDriver(InFlightDriver):
+    def _vrf_read(self, request_data=None):
+        self._enter()
+        time.sleep(self.delay)
+        type(self).in_flight -= 1
+        return an_vrf.VRF(name=request_data, ipv4=validators.is_trusted())
+
+
+@pytest.fixture
+def in_flight_driver(mock_driver, monkeypatch):
+    """
+    Serves requests with a driver class supplied by the test, with
+    unlimited concurrent reads and two threads in the thread pool.
+    Sampled validation of trusted objects is disabled.
+    """
+    monkeypatch.setattr(validators, 'validation_sample_rate', lambda: 0)
+    monkeypatch.setattr(limiter, '_device_limiter', DeviceLimiter())
+    monkeypatch.setattr(aio, '_executor', ThreadPoolExecutor(max_workers=2, thread_name_prefix='autonet-sync'))
+    monkeypatch.setattr(aio, '_pid', os.getpid())
+
+    def _driver(driver_class):
+        driver_class.in_flight = driver_class.max_in_flight = 0
+        driver_class.threads = set()
+        mock_driver(driver_class)
+        return driver_class
+
+    yield _driver
+    aio.executor().shutdown()
+
+
+async def request(app, method='GET', path='/', headers=None, body=b''):
+    """
+    Make a request to an ASGI application, returning the response
+    status, headers and the list of body chunks.
+    """
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'a=1',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        'server': ('testserver', 80), 'client': ('198.18.0.1', 50000)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent.pop(0)
+    assert start['type'] == 'http.response.start'
+    assert not sent[-1].get('more_body')
+    return start['status'], dict(start['headers']), [m['body'] for m in sent if m['body']]
+
+
+def call(app, **kwargs):
+    return asyncio.run(request(app, **kwargs))
+
+
+def test_build_environ():
+    scope = {'type': 'http', 'method': 'POST', 'path': '/25/vrfs', 'query_string': b'x=1',
+             'headers': [(b'content-type', b'application/json'), (b'x-api-key', b'admin:1'),
+                         (b'accept', b'a'), (b'accept', b'b')]}
+    environ = build_environ(scope, b'{}')
+    assert environ['REQUEST_METHOD'] == 'POST'
+    assert environ['PATH_INFO'] == '/25/vrfs'
+    assert environ['QUERY_STRING'] == 'x=1'
+    assert environ['CONTENT_TYPE'] == 'application/json'
+    assert environ['HTTP_X_API_KEY'] == 'admin:1'
+    assert environ['HTTP_ACCEPT'] == 'a,b'
+    assert environ['wsgi.input'].read() == b'{}'
+
+
+def test_asgi_adapter_streams():
+    app = Flask(__name__)
+
+    @app.route('/', methods=['POST'])
+    def stream():
+        from flask import request
+
+        def generate():
+            yield request.get_data()
+            yield b'-' + request.args['a'].encode()
+        return stream_with_context(generate())
+
+    status, headers, chunks = call(ASGIAdapter(app), method='POST', body=b'data')
+    assert status == 200
+    assert chunks == [b'data', b'-1']
+
+
+def test_asgi_app(flask_app, db_session):
+    """
+    Verify that the Autonet application is served.
+    """
+    status, headers, chunks = call(asgi_app, headers={'X-API-Key': 'malformed'})
+    assert status == 401
+    assert headers[b'content-type'] == b'application/json'
+    assert json.loads(b''.join(chunks))['errors'] == ['X-API-Key format is "username:token".',
+                                                        'X-API-Key is unset or invalid']
+
+
+def test_asgi_lifespan():
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(asgi_app({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_asgi_concurrent_executions(flask_app, in_flight_driver, test_auth_header):
+    """
+    Verify that requests to a coroutine driver are all in flight at once
+    on the event loop, far beyond the number of threads available.
+    """
+    driver = in_flight_driver(InFlightDriver)
+    count = 50
+
+    async def requests():
+        return await asyncio.gather(*[request(asgi_app, path=f'/25/vrfs/vrf{i}', headers=test_auth_header)
+                                      for i in range(count)])
+
+    start = time.monotonic()
+    responses = asyncio.run(requests())
+    elapsed = time.monotonic() - start
+    for i, (status, headers, chunks) in enumerate(responses):
+        assert status == 200
+        data = json.loads(b''.join(chunks))['data']
+        assert (data['name'], data['ipv4']) == (f'vrf{i}', True)
+    assert driver.max_in_flight == count
+    assert driver.threads == {threading.current_thread().name}
+    assert elapsed < count * driver.delay / 5
+
+
+def test_asgi_sync_driver(flask_app, in_flight_driver, test_auth_header):
+    """
+    Verify that a synchronous driver is run in the thread pool, with its
+    objects trusted, and so is limited by the size of the pool.
+    """
+    driver = in_flight_driver(SyncDriver)
+
+    async def requests():
+        return await asyncio.gather(*[request(asgi_app, path=f'/25/vrfs/vrf{i}', headers=test_auth_header)
+                                      for i in range(4)])
+
+    responses = asyncio.run(requests())
+    for i, (status, headers, chunks) in enumerate(responses):
+        assert status == 200
+        data = json.loads(b''.join(chunks))['data']
+        assert (data['name'], data['ipv4']) == (f'vrf{i}', True)
+    assert driver.max_in_flight == 2
+    assert all(name.startswith('autonet-sync') for name in driver.threads)
+
+
+def test_wait_outside_spawn():
+    async def coro():
+        pass
+
+    with pytest.raises(RuntimeError):
+        aio.wait(coro())
@@ -0,0 +1,114 @@
+import pytest
+import time
+
+from autonet.config import config
+from autonet.core.objects import vrf as an_vrf
+from autonet.core.tests.conftest import generate_autonet_device
+from autonet.drivers.device.driver import DeviceDriver
+
+
+class VRFDriver(DeviceDriver):
+    vrfs = {}
+
+    def _vrf_read(self, request_data=None):
+        time.sleep(0.2)
+        vrfs = self.vrfs.setdefault(self.device.device_id, {})
+        if request_data:
+            return vrfs.get(request_data)
+        return list(vrfs.values())
+
+    def _vrf_create(self, request_data=None):
+        self.vrfs.setdefault(self.device.device_id, {})[request_data.name] = request_data
+        return request_data
+
+
+@pytest.fixture
+def batch_client(client, monkeypatch, db_session):
+    """
+    Routes device requests to :py:class:`VRFDriver`, recording device
+    look ups and password verifications.
+    """
+    import autonet.core.app as app
+    VRFDriver.vrfs = {}
+    lookups = []
+    verifications = []
+    verify_password = app.verify_password
+
+    def marshal_device(device_id):
+        lookups.append(device_id)
+        return generate_autonet_device(device_id, True, True)
+
+    def counting_verify_password(*args):
+        verifications.append(args)
+        return verify_password(*args)
+
+    monkeypatch.setattr(app, 'marshal_device', marshal_device)
+    monkeypatch.setattr(app, 'marshal_driver', lambda *_: VRFDriver)
+    monkeypatch.setattr(app, 'verify_password', counting_verify_password)
+    client.lookups = lookups
+    client.verifications = verifications
+    return client
+
+
+def test_batch(batch_client, test_auth_header):
+    """
+    Verify that sub-requests for a device are executed in order, that
+    devices are looked up once and that the batch is authenticated once.
+    """
+    requests = [
+        {'method': 'GET', 'path': '/1/vrfs'},
+        {'method': 'POST', 'path': '/1/vrfs', 'body': {'name': 'blue', 'ipv4': True}},
+        {'method': 'GET', 'path': '/1/vrfs/blue'},
+        {'method': 'GET', 'path': '/2/vrfs?fields=name'},
+        {'method': 'get', 'path': '/1/vrfs/red'},
+    ]
+    response = batch_client.post('/batch', json=requests, headers=test_auth_header)
+    assert response.status_code == 200
+    results = response.json['data']
+    assert [r['status'] for r in results] == [200, 201, 200, 200, 404]
+    assert results[0]['data'] == []
+    assert results[2]['data']['name'] == 'blue'
+    assert results[3]['data'] == []
+    assert len({r['request-id'] for r in results}) == 5
+    assert sorted(batch_client.lookups) == ['1', '2']
+    assert len(batch_client.verifications) == 1
+
+
+def test_batch_parallel(batch_client, test_auth_header):
+    """
+    Verify that sub-requests for different devices execute in parallel.
+    """
+    requests = [{'method': 'GET', 'path': f'/{i}/vrfs'} for i in range(1, 7)]
+    start = time.monotonic()
+    response = batch_client.post('/batch', json=requests, headers=test_auth_header)
+    assert [r['status'] for r in response.json['data']] == [200] * 6
+    assert time.monotonic() - start < 0.2 * 6 / 2
+
+
+def test_batch_unauthenticated(batch_client):
+    response = batch_client.post('/batch', json=[{'method': 'GET', 'path': '/1/vrfs'}],
+                                 headers={'X-API-Key': 'admin:invalid'})
+    assert response.status_code == 401
+    assert not batch_client.lookups
+
+
+@pytest.mark.parametrize('requests', [
+    {'method': 'GET', 'path': '/1/vrfs'},
+    ['/1/vrfs'],
+    [{'path': '/1/vrfs'}],
+    [{'method': 'TRACE', 'path': '/1/vrfs'}],
+    [{'method': 'GET', 'path': '1/vrfs'}],
+    [{'method': 'POST', 'path': '/batch'}],
+    [{'method': 'GET', 'path': '/1/vrfs', 'headers': ['Accept']}],
+])
+def test_batch_invalid(batch_client, test_auth_header, requests):
+    response = batch_client.post('/batch', json=requests, headers=test_auth_header)
+    assert response.status_code == response.json['status'] == 400
+    assert not batch_client.lookups
+
+
+def test_batch_max_requests(batch_client, test_auth_header, monkeypatch):
+    monkeypatch.setattr(config.batch, 'max_requests', 2)
+    requests = [{'method': 'GET', 'path': f'/{i}/vrfs'} for i in range(1, 4)]
+    response = batch_client.post('/batch', json=requests, headers=test_auth_header)
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+import pytest
+
+from autonet.core import cache
+from autonet.core.cache import ReadCache
+
+
+def test_read_cache_disabled():
+    """
+    Verify that a ttl of 0 disables caching.
+    """
+    read_cache = ReadCache(ttl=0)
+    read_cache.set((1, 'vrf'), ['vrf1'], read_cache.generation(1))
+    assert read_cache.get((1, 'vrf')) is None
+
+
+def test_read_cache_get_set():
+    """
+    Verify that a cached value is returned along with its age.
+    """
+    read_cache = ReadCache(ttl=60)
+    read_cache.set((1, 'vrf'), ['vrf1'], read_cache.generation(1))
+    value, age = read_cache.get((1, 'vrf'))
+    assert value == ['vrf1']
+    assert 0 <= age < 60
+
+
+def test_read_cache_expiry(monkeypatch):
+    """
+    Verify that entries expire after the ttl.
+    """
+    read_cache = ReadCache(ttl=10)
+    read_cache.set((1, 'vrf'), ['vrf1'], read_cache.generation(1))
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now + 10)
+    assert read_cache.get((1, 'vrf')) is None
+
+
+def test_read_cache_lru_eviction():
+    """
+    Verify that the least recently used entry is evicted.
+    """
+    read_cache = ReadCache(ttl=60, size=2)
+    for key in [(1, 'a'), (1, 'b')]:
+        read_cache.set(key, key, read_cache.generation(1))
+    read_cache.get((1, 'a'))
+    read_cache.set((1, 'c'), 'c', read_cache.generation(1))
+    assert read_cache.get((1, 'a'))
+    assert read_cache.get((1, 'b')) is None
+    assert read_cache.get((1, 'c'))
+
+
+def test_read_cache_invalidate():
+    """
+    Verify that invalidation is per device, and prevents storage of
+    results from reads that started before invalidation.
+    """
+    read_cache = ReadCache(ttl=60)
+    read_cache.set((1, 'vrf'), ['vrf1'], read_cache.generation(1))
+    read_cache.set((2, 'vrf'), ['vrf2'], read_cache.generation(2))
+    stale_generation = read_cache.generation(1)
+    read_cache.invalidate(1)
+    assert read_cache.get((1, 'vrf')) is None
+    assert read_cache.get((2, 'vrf'))
+    read_cache.set((1, 'vrf'), ['stale'], stale_generation)
+    assert read_cache.get((1, 'vrf')) is None
+
+
+@pytest.mark.parametrize('autonet_device', [(25, True, True)], indirect=True)
+def test_driver_execute_read_cache(monkeypatch, autonet_device):
+    """
+    Verify that driver reads are cached and invalidated by writes.
+    """
+    from autonet.drivers.device.driver import DeviceDriver
+    monkeypatch.setattr(cache, '_read_cache', ReadCache(ttl=60))
+    calls = []
+
+    class CountingDriver(DeviceDriver):
+        def _vrf_read(self, request_data=None):
+            calls.append(request_data)
+            return []
+
+        def _vrf_delete(self, request_data=None):
+            return None
+
+    driver = CountingDriver(autonet_device)
+    assert driver.cache_age is None
+    driver.execute('vrf', 'read')
+    assert driver.cache_age is None
+    driver.execute('vrf', 'read')
+    assert len(calls) == 1
+    assert driver.cache_age is not None
+    driver.execute('vrf', 'delete', request_data='vrf1')
+    assert driver.cache_age is None
+    driver.execute('vrf', 'read')
+    assert len(calls) == 2
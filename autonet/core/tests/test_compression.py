@@ -0,0 +1,112 @@
+import gzip
+import json
+import pytest
+import zlib
+
+from autonet.config import config
+from autonet.core import compression
+from autonet.core.objects import interfaces as an_if
+from autonet.drivers.device.driver import DeviceDriver
+
+
+def _interfaces(count=100):
+    return [an_if.Interface(name=f'Ethernet{i}', mode='routed', admin_enabled=True,
+                            attributes=an_if.InterfaceRouteAttributes(addresses=[], vrf='blue'))
+            for i in range(count)]
+
+
+class InterfaceDriver(DeviceDriver):
+    def _interface_read(self, request_data=None, **kwargs):
+        return _interfaces()
+
+
+class StreamingInterfaceDriver(DeviceDriver):
+    def _interface_read(self, request_data=None, **kwargs):
+        yield from _interfaces()
+
+
+@pytest.fixture
+def interface_client(client, mock_driver):
+    mock_driver(InterfaceDriver)
+    return client
+
+
+@pytest.mark.parametrize('encoding, decompress', [
+    ('gzip', gzip.decompress),
+    ('deflate', zlib.decompress),
+])
+def test_compressed_response(interface_client, test_auth_header, encoding, decompress):
+    expected = interface_client.get('/25/interfaces', headers=test_auth_header)
+    assert 'Content-Encoding' not in expected.headers
+    response = interface_client.get('/25/interfaces',
+                                    headers={**test_auth_header, 'Accept-Encoding': encoding})
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.vary
+    assert int(response.headers['Content-Length']) < len(expected.get_data()) / 5
+    body = json.loads(decompress(response.get_data()))
+    assert body['data'] == expected.json['data']
+
+
+def test_brotli_response(interface_client, test_auth_header):
+    brotli = pytest.importorskip('brotli')
+    response = interface_client.get('/25/interfaces',
+                                    headers={**test_auth_header, 'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert len(json.loads(brotli.decompress(response.get_data()))['data']) == 100
+
+
+def test_negotiated_encoding(interface_client, test_auth_header, monkeypatch):
+    """
+    Verify that the client's quality values are honoured.
+    """
+    monkeypatch.setattr(compression, 'brotli', None)
+    response = interface_client.get(
+        '/25/interfaces', headers={**test_auth_header, 'Accept-Encoding': 'gzip;q=0.5, deflate'})
+    assert response.headers['Content-Encoding'] == 'deflate'
+    response = interface_client.get(
+        '/25/interfaces', headers={**test_auth_header, 'Accept-Encoding': 'br, identity'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_uncompressed_below_threshold(interface_client, test_auth_header, monkeypatch):
+    size = len(interface_client.get('/25/interfaces', headers=test_auth_header).get_data())
+    monkeypatch.setattr(config.response, 'compression_min_size', size)
+    response = interface_client.get('/25/interfaces',
+                                    headers={**test_auth_header, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    monkeypatch.setattr(config.response, 'compression_min_size', size + 1)
+    response = interface_client.get('/25/interfaces',
+                                    headers={**test_auth_header, 'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_compression_disabled(interface_client, test_auth_header, monkeypatch):
+    monkeypatch.setattr(config.response, 'compression', False)
+    response = interface_client.get('/25/interfaces',
+                                    headers={**test_auth_header, 'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_compressed_stream(client, mock_driver, test_auth_header, monkeypatch):
+    monkeypatch.setattr(config.response, 'stream_chunk_size', 10)
+    mock_driver(StreamingInterfaceDriver)
+    response = client.get('/25/interfaces', headers={**test_auth_header, 'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    body = json.loads(gzip.decompress(response.get_data()))
+    assert len(body['data']) == 100
+    assert body['status'] == 200
+
+
+def test_compressed_conditional_get(interface_client, test_auth_header):
+    """
+    Verify that the weak ETag of a compressed response can be used for
+    conditional requests.
+    """
+    headers = {**test_auth_header, 'Accept-Encoding': 'gzip'}
+    response = interface_client.get('/25/interfaces', headers=headers)
+    etag, weak = response.get_etag()
+    assert etag and weak
+    response = interface_client.get('/25/interfaces',
+                                    headers={**headers, 'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
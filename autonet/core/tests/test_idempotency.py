@@ -0,0 +1,153 @@
+import pytest
+import threading
+import time
+
+from flask import Response
+
+from autonet.config import config
+from autonet.core import idempotency
+from autonet.core.exceptions import IdempotencyKeyInProgress, IdempotencyKeyMismatch
+from autonet.core.tests.conftest import generate_autonet_device
+from autonet.drivers.device.driver import DeviceDriver
+
+
+class VRFDriver(DeviceDriver):
+    vrfs = {}
+    creates = []
+
+    def _vrf_read(self, request_data=None):
+        if request_data:
+            return self.vrfs.get(request_data)
+        return list(self.vrfs.values())
+
+    def _vrf_create(self, request_data=None):
+        self.creates.append(request_data.name)
+        self.vrfs[request_data.name] = request_data
+        return request_data
+
+
+@pytest.fixture
+def store(request):
+    backend = request.param if hasattr(request, 'param') else 'local'
+    if backend == 'database':
+        request.getfixturevalue('db_session')
+        return idempotency.DatabaseIdempotencyStore(timeout=0)
+    return idempotency.LocalIdempotencyStore(timeout=0)
+
+
+@pytest.fixture
+def idempotent_client(client, monkeypatch, db_session, store):
+    import autonet.core.app as app
+    VRFDriver.vrfs = {}
+    VRFDriver.creates = []
+    monkeypatch.setattr(app, 'marshal_device', lambda d: generate_autonet_device(d, True, True))
+    monkeypatch.setattr(app, 'marshal_driver', lambda *_: VRFDriver)
+    monkeypatch.setattr(idempotency, '_store', store)
+    return client
+
+
+def test_idempotent_replay(idempotent_client, test_auth_header):
+    """
+    Verify that a repeated request is answered with the stored response
+    without being executed again.
+    """
+    headers = {**test_auth_header, 'Idempotency-Key': 'abc'}
+    body = {'name': 'blue', 'ipv4': True}
+    first = idempotent_client.post('/1/vrfs', json=body, headers=headers)
+    second = idempotent_client.post('/1/vrfs', json=body, headers=headers)
+    assert first.status_code == second.status_code == 201
+    assert second.get_data() == first.get_data()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert VRFDriver.creates == ['blue']
+    # Without the key, the request is executed again.
+    third = idempotent_client.post('/1/vrfs', json=body, headers=test_auth_header)
+    assert third.status_code == 409
+
+
+def test_idempotent_key_mismatch(idempotent_client, test_auth_header):
+    headers = {**test_auth_header, 'Idempotency-Key': 'abc'}
+    idempotent_client.post('/1/vrfs', json={'name': 'blue', 'ipv4': True}, headers=headers)
+    response = idempotent_client.post('/1/vrfs', json={'name': 'red', 'ipv4': True},
+                                      headers=headers)
+    assert response.status_code == 422
+    assert VRFDriver.creates == ['blue']
+
+
+def test_idempotent_key_too_long(idempotent_client, test_auth_header):
+    headers = {**test_auth_header, 'Idempotency-Key': 'a' * 256}
+    response = idempotent_client.post('/1/vrfs', json={'name': 'blue', 'ipv4': True},
+                                      headers=headers)
+    assert response.status_code == 400
+    assert not VRFDriver.creates
+
+
+def test_idempotent_disabled(idempotent_client, test_auth_header, monkeypatch):
+    monkeypatch.setattr(idempotency, '_store', None)
+    monkeypatch.setattr(config.idempotency, 'store', 'none')
+    headers = {**test_auth_header, 'Idempotency-Key': 'abc'}
+    body = {'name': 'blue', 'ipv4': True}
+    idempotent_client.post('/1/vrfs', json=body, headers=headers)
+    assert idempotent_client.post('/1/vrfs', json=body, headers=headers).status_code == 409
+
+
+@pytest.mark.parametrize('store', ['local', 'database'], indirect=True)
+def test_idempotency_store(store):
+    """
+    Verify that a key is reserved once, that the stored response is
+    returned once complete and that a released key may be reused.
+    """
+    assert store.begin('admin', 'abc', 'f1') is None
+    with pytest.raises(IdempotencyKeyInProgress):
+        store.begin('admin', 'abc', 'f1')
+    with pytest.raises(IdempotencyKeyMismatch):
+        store.begin('admin', 'abc', 'f2')
+    # Keys are scoped to the user.
+    assert store.begin('other', 'abc', 'f2') is None
+    store.release('other', 'abc')
+    assert store.begin('other', 'abc', 'f2') is None
+
+    response = Response(b'{}', status=201, mimetype='application/json',
+                        headers={'X-Test': '1'})
+    store.complete('admin', 'abc', idempotency.StoredResponse.from_response('f1', response))
+    replayed = store.begin('admin', 'abc', 'f1').to_response()
+    assert replayed.status_code == 201
+    assert replayed.get_data() == b'{}'
+    assert replayed.mimetype == 'application/json'
+    assert replayed.headers['X-Test'] == '1'
+
+
+def test_idempotency_store_waits():
+    """
+    Verify that a repeated request waits for the in-flight request.
+    """
+    store = idempotency.LocalIdempotencyStore(timeout=5)
+    assert store.begin('admin', 'abc', 'f1') is None
+    response = Response(b'{}', status=201)
+
+    def complete():
+        time.sleep(0.2)
+        store.complete('admin', 'abc', idempotency.StoredResponse.from_response('f1', response))
+
+    thread = threading.Thread(target=complete)
+    thread.start()
+    stored = store.begin('admin', 'abc', 'f1')
+    thread.join()
+    assert stored.status == 201
+
+
+def test_idempotency_store_lease_expiry():
+    abandoned = idempotency.LocalIdempotencyStore(lease=-1, timeout=0)
+    assert abandoned.begin('admin', 'abc', 'f1') is None
+    assert abandoned.begin('admin', 'abc', 'f1') is None
+
+
+@pytest.mark.parametrize('status,expected', [(201, True), (409, True), (429, False), (500, False)])
+def test_storable(status, expected):
+    assert idempotency.storable(Response(status=status)) is expected
+
+
+def test_storable_size(monkeypatch):
+    monkeypatch.setattr(idempotency, 'MAX_BODY_SIZE', 4)
+    assert idempotency.storable(Response(b'1234', status=200))
+    assert not idempotency.storable(Response(b'12345', status=200))
@@ -0,0 +1,85 @@
+import pytest
+import threading
+
+from autonet.core.exceptions import DeviceBusy
+from autonet.core.limiter import DeviceLimiter
+
+
+def test_device_limiter_unlimited():
+    """
+    Verify that a limit of 0 does not limit executions.
+    """
+    limiter = DeviceLimiter(max_reads=0, max_writes=0)
+    with limiter.slot(1, 'read'), limiter.slot(1, 'read'), \
+            limiter.slot(1, 'create'), limiter.slot(1, 'update'):
+        pass
+
+
+@pytest.mark.parametrize('action', ['read', 'create', 'update', 'delete'])
+def test_device_limiter_rejects_beyond_limit(action):
+    """
+    Verify that executions beyond the limit raise DeviceBusy once the
+    queue timeout expires.
+    """
+    limiter = DeviceLimiter(max_reads=1, max_writes=1, timeout=0, retry_after=7)
+    with limiter.slot(1, action):
+        with pytest.raises(DeviceBusy) as e:
+            with limiter.slot(1, action):
+                pass
+        assert e.value.retry_after == 7
+    # The slot is released after use.
+    with limiter.slot(1, action):
+        pass
+
+
+def test_device_limiter_independent_limits():
+    """
+    Verify that devices, reads and writes are limited independently.
+    """
+    limiter = DeviceLimiter(max_reads=1, max_writes=1, timeout=0)
+    with limiter.slot(1, 'read'), limiter.slot(1, 'update'), \
+            limiter.slot(2, 'read'), limiter.slot(2, 'delete'):
+        pass
+
+
+def test_device_limiter_queues_until_slot_free():
+    """
+    Verify that executions wait for a slot within the queue timeout.
+    """
+    limiter = DeviceLimiter(max_writes=1, timeout=5)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold_slot():
+        with limiter.slot(1, 'create'):
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold_slot)
+    thread.start()
+    holding.wait(5)
+    threading.Timer(0.05, release.set).start()
+    with limiter.slot(1, 'create'):
+        pass
+    thread.join()
+
+
+@pytest.mark.parametrize('autonet_device', [(25, True, True)], indirect=True)
+def test_driver_stream_holds_slot(monkeypatch, autonet_device):
+    """
+    Verify that a streamed read holds the device's execution slot until
+    the stream has been consumed.
+    """
+    from autonet.core import limiter
+    from autonet.drivers.device.driver import DeviceDriver
+    monkeypatch.setattr(limiter, '_device_limiter', DeviceLimiter(max_reads=1, timeout=0))
+
+    class StreamingDriver(DeviceDriver):
+        def _vrf_read(self, request_data=None):
+            yield from range(3)
+
+    stream = StreamingDriver(autonet_device).execute('vrf', 'read')
+    with pytest.raises(DeviceBusy):
+        StreamingDriver(autonet_device).execute('vrf', 'read')
+    assert list(stream) == [0, 1, 2]
+    assert list(StreamingDriver(autonet_device).execute('vrf', 'read')) == [0, 1, 2]
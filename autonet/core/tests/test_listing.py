@@ -0,0 +1,171 @@
+import pytest
+import re
+
+from autonet.core import listing
+from autonet.core.objects import interfaces as an_if
+from autonet.drivers.device.driver import DeviceDriver
+
+
+def _interfaces():
+    return [
+        an_if.Interface(name='Ethernet3', mode='bridged', admin_enabled=True,
+                        attributes=an_if.InterfaceBridgeAttributes(dot1q_enabled=False)),
+        an_if.Interface(name='Ethernet1', mode='routed', admin_enabled=False,
+                        attributes=an_if.InterfaceRouteAttributes(addresses=[], vrf='blue')),
+        an_if.Interface(name='Ethernet1.10', mode='routed', admin_enabled=True,
+                        child=True, parent='Ethernet1',
+                        attributes=an_if.InterfaceRouteAttributes(addresses=[], vrf='red')),
+        an_if.Interface(name='Ethernet2', mode='routed', admin_enabled=True,
+                        attributes=an_if.InterfaceRouteAttributes(addresses=[], vrf='blue')),
+    ]
+
+
+class InterfaceDriver(DeviceDriver):
+    reads = []
+
+    def _interface_read(self, request_data=None, **kwargs):
+        self.reads.append(kwargs)
+        return _interfaces()
+
+
+class FilteringInterfaceDriver(InterfaceDriver):
+    supported_filters = {'interface': ['vrf']}
+
+
+@pytest.fixture
+def interface_client(client, mock_driver):
+    InterfaceDriver.reads = []
+    mock_driver(InterfaceDriver)
+    return client
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', ['Ethernet3', 'Ethernet1', 'Ethernet1.10', 'Ethernet2']),
+    ('?mode=routed', ['Ethernet1', 'Ethernet1.10', 'Ethernet2']),
+    ('?admin_enabled=false', ['Ethernet1']),
+    ('?parent=Ethernet1', ['Ethernet1.10']),
+    ('?vrf=blue&admin_enabled=true', ['Ethernet2']),
+    ('?speed=1000&_=1666170000', ['Ethernet3', 'Ethernet1', 'Ethernet1.10', 'Ethernet2']),
+])
+def test_list_filters(interface_client, test_auth_header, query, expected):
+    response = interface_client.get(f'/25/interfaces{query}', headers=test_auth_header)
+    assert response.status_code == 200
+    assert [i['name'] for i in response.json['data']] == expected
+
+
+@pytest.mark.parametrize('query', [
+    '?admin_enabled=maybe', '?limit=0', '?limit=a',
+    '?cursor=!!!', '?fields=name,bogus'
+])
+def test_list_invalid_query(interface_client, test_auth_header, query):
+    response = interface_client.get(f'/25/interfaces{query}', headers=test_auth_header)
+    assert response.status_code == response.json['status'] == 400
+
+
+def test_list_fields(interface_client, test_auth_header):
+    response = interface_client.get('/25/interfaces?fields=name,mtu&parent=Ethernet1',
+                                    headers=test_auth_header)
+    assert response.json['data'] == [{'name': 'Ethernet1.10', 'mtu': None}]
+
+
+def test_list_pagination(interface_client, test_auth_header):
+    """
+    Verify that following the next links returns every object once.
+    """
+    names = []
+    url = '/25/interfaces?limit=2&mode=routed'
+    pages = 0
+    while url:
+        response = interface_client.get(url, headers=test_auth_header)
+        assert response.status_code == 200
+        names += [i['name'] for i in response.json['data']]
+        pages += 1
+        link = re.match(r'<([^>]+)>; rel="next"', response.headers.get('Link', ''))
+        url = link.group(1) if link else None
+        if url:
+            assert 'mode=routed' in url
+    assert pages == 2
+    assert names == ['Ethernet1', 'Ethernet1.10', 'Ethernet2']
+
+
+def test_list_filter_pushdown(client, mock_driver, test_auth_header):
+    """
+    Verify that only supported filters are passed to the driver.
+    """
+    FilteringInterfaceDriver.reads = []
+    mock_driver(FilteringInterfaceDriver)
+    response = client.get('/25/interfaces?vrf=blue&mode=routed', headers=test_auth_header)
+    assert [i['name'] for i in response.json['data']] == ['Ethernet1', 'Ethernet2']
+    assert FilteringInterfaceDriver.reads == [{'filters': {'vrf': 'blue'}}]
+
+
+def test_cursor_round_trip():
+    for key in ['Ethernet1', 4000]:
+        assert listing.decode_cursor(listing.encode_cursor(key)) == key
+
+
+class StreamingInterfaceDriver(InterfaceDriver):
+    def _interface_read(self, request_data=None, **kwargs):
+        self.reads.append(kwargs)
+        yield from _interfaces()
+
+
+@pytest.mark.parametrize('query', [
+    '', '?mode=routed', '?fields=name,mtu&parent=Ethernet1', '?limit=2&mode=routed'
+])
+def test_list_stream(client, mock_driver, test_auth_header, query):
+    """
+    Verify that a streamed listing yields the same response as a list.
+    """
+    mock_driver(InterfaceDriver)
+    expected = client.get(f'/25/interfaces{query}', headers=test_auth_header)
+    mock_driver(StreamingInterfaceDriver)
+    response = client.get(f'/25/interfaces{query}', headers=test_auth_header)
+    assert response.status_code == 200
+    assert response.json['data'] == expected.json['data']
+    assert response.headers.get('Link') == expected.headers.get('Link')
+
+
+class TableInterfaceDriver(InterfaceDriver):
+    def _interface_read(self, request_data=None, **kwargs):
+        self.reads.append(kwargs)
+        return an_if.InterfaceTable.from_interfaces(_interfaces())
+
+
+@pytest.mark.parametrize('query', [
+    '', '?mode=routed', '?vrf=blue&admin_enabled=true', '?fields=name,mtu&parent=Ethernet1',
+    '?limit=2&mode=routed', '?fields=bogus'
+])
+def test_list_table(client, mock_driver, test_auth_header, query):
+    """
+    Verify that a listing returned as a table yields the same response
+    as a list.
+    """
+    mock_driver(InterfaceDriver)
+    expected = client.get(f'/25/interfaces{query}', headers=test_auth_header)
+    mock_driver(TableInterfaceDriver)
+    response = client.get(f'/25/interfaces{query}', headers=test_auth_header)
+    assert response.status_code == expected.status_code
+    assert response.json['data'] == expected.json['data']
+    assert response.headers.get('Link') == expected.headers.get('Link')
+
+
+def test_list_stream_invalid_item(client, mock_driver, test_auth_header, monkeypatch):
+    """
+    Verify that an invalid object found while streaming is reported in
+    the response envelope, after the chunks already sent.
+    """
+    from autonet.config import config
+    monkeypatch.setattr(config.response, 'stream_chunk_size', 1)
+
+    class InvalidStreamDriver(DeviceDriver):
+        def _interface_read(self, request_data=None, **kwargs):
+            yield from _interfaces()
+            yield 'Ethernet4'
+
+    mock_driver(InvalidStreamDriver)
+    response = client.get('/25/interfaces', headers=test_auth_header)
+    assert response.status_code == 200
+    assert response.json['status'] == 500
+    assert len(response.json['data']) == 4
+    assert response.json['errors']
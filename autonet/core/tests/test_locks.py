@@ -0,0 +1,155 @@
+import pytest
+import threading
+import time
+
+from autonet.config import config
+from autonet.core import locks
+from autonet.core.exceptions import DeviceBusy
+from autonet.core.metrics import metrics
+
+
+@pytest.fixture
+def device_lock(request, tmp_path):
+    backend = request.param
+    if backend == 'local':
+        return locks.LocalDeviceLock(timeout=0)
+    if backend == 'file':
+        return locks.FileDeviceLock(str(tmp_path), timeout=0)
+    if backend == 'database':
+        request.getfixturevalue('db_session')
+        return locks.DatabaseDeviceLock(lease=300, timeout=0)
+
+
+@pytest.mark.parametrize('device_lock', ['local', 'file', 'database'], indirect=True)
+def test_device_lock_exclusive(device_lock):
+    """
+    Verify that a held lock cannot be acquired again until released.
+    """
+    with device_lock.hold(25):
+        with pytest.raises(DeviceBusy):
+            with device_lock.hold(25):
+                pass
+        # Other devices are not affected.
+        with device_lock.hold(26):
+            pass
+    with device_lock.hold(25):
+        pass
+
+
+@pytest.mark.parametrize('device_lock', ['local', 'file', 'database'], indirect=True)
+def test_device_lock_released_on_exception(device_lock):
+    """
+    Verify that the lock is released when the locked block raises.
+    """
+    with pytest.raises(ValueError):
+        with device_lock.hold(25):
+            raise ValueError()
+    with device_lock.hold(25):
+        pass
+
+
+def test_database_device_lock_lease_expiry(db_session):
+    """
+    Verify that an expired lease is taken over by a new acquirer.
+    """
+    abandoned = locks.DatabaseDeviceLock(lease=-1, timeout=0)
+    device_lock = locks.DatabaseDeviceLock(lease=300, timeout=0)
+    assert abandoned._try_acquire('25')
+    assert device_lock._try_acquire('25')
+    assert device_lock._try_acquire('25') is None
+
+
+def test_database_device_lock_lease_renewal(db_session):
+    """
+    Verify that renewing a lease keeps it from being taken over, and
+    that a lost lease is reported.
+    """
+    device_lock = locks.DatabaseDeviceLock(lease=1, timeout=0)
+    owner = device_lock._try_acquire('25')
+    time.sleep(1.1)
+    assert device_lock._renew('25', owner)
+    assert locks.DatabaseDeviceLock(lease=1, timeout=0)._try_acquire('25') is None
+    device_lock._release('25', owner)
+    assert not device_lock._renew('25', owner)
+
+
+def test_device_lock_heartbeat():
+    """
+    Verify that a leased lock is renewed while it is held.
+    """
+    class LeasedLock(locks.DeviceLock):
+        renew_interval = 0.05
+
+        def __init__(self):
+            super().__init__(timeout=0)
+            self.renewals = []
+
+        def _renew(self, device_id, handle):
+            self.renewals.append(device_id)
+            return True
+
+    device_lock = LeasedLock()
+    with device_lock.hold(25):
+        time.sleep(0.3)
+    renewals = len(device_lock.renewals)
+    assert renewals >= 2 and set(device_lock.renewals) == {'25'}
+    # Renewal stops once the lock is released.
+    time.sleep(0.15)
+    assert len(device_lock.renewals) == renewals
+
+
+def test_device_lock_wait_metrics():
+    """
+    Verify that lock wait time is recorded.
+    """
+    metrics.reset()
+    device_lock = locks.LocalDeviceLock(timeout=0)
+    with device_lock.hold(25):
+        pass
+    assert metrics.snapshot()['driver.write_lock_wait']['count'] == 1
+
+
+def test_device_lock_wait_warning(caplog):
+    """
+    Verify that long waits for the lock are logged as warnings.
+    """
+    device_lock = locks.LocalDeviceLock(timeout=1, warn_after=0.05)
+    with device_lock.hold(25):
+        pass
+    assert not [r for r in caplog.records if r.levelname == 'WARNING']
+
+    def hold():
+        with device_lock.hold(25):
+            held.set()
+            time.sleep(0.1)
+
+    held = threading.Event()
+    holder = threading.Thread(target=hold)
+    holder.start()
+    held.wait()
+    with device_lock.hold(25):
+        pass
+    holder.join()
+    warnings = [r for r in caplog.records if r.levelname == 'WARNING']
+    assert len(warnings) == 1 and 'device_id: 25' in warnings[0].getMessage()
+
+
+@pytest.mark.parametrize('backend,workers,expected', [
+    ('auto', 1, locks.LocalDeviceLock),
+    ('auto', 4, locks.FileDeviceLock),
+    ('local', 1, locks.LocalDeviceLock),
+    ('file', 1, locks.FileDeviceLock),
+])
+def test_configure(backend, workers, expected, monkeypatch, tmp_path):
+    monkeypatch.setattr(config.driver, 'write_lock', backend)
+    monkeypatch.setattr(config.driver, 'write_lock_path', str(tmp_path))
+    monkeypatch.setattr(locks, '_workers', 1)
+    monkeypatch.setattr(locks, '_write_lock', None)
+    locks.configure(workers)
+    assert type(locks.write_lock()) is expected
+
+
+def test_configure_local_lock_multiple_workers(monkeypatch):
+    monkeypatch.setattr(config.driver, 'write_lock', 'local')
+    with pytest.raises(RuntimeError):
+        locks.configure(2)
@@ -0,0 +1,128 @@
+import pytest
+
+from autonet.config import config
+from autonet.core import ratelimit
+from autonet.core.tests.conftest import generate_autonet_device
+from autonet.drivers.device.driver import DeviceDriver
+
+
+class VRFDriver(DeviceDriver):
+    def _vrf_read(self, request_data=None):
+        return []
+
+
+@pytest.fixture
+def limited_client(client, monkeypatch, db_session):
+    import autonet.core.app as app
+    monkeypatch.setattr(app, 'marshal_device', lambda d: generate_autonet_device(d, True, True))
+    monkeypatch.setattr(app, 'marshal_driver', lambda *_: VRFDriver)
+    monkeypatch.setattr(ratelimit, '_store', ratelimit.LocalBucketStore())
+    return client
+
+
+def test_rate_limit(limited_client, test_auth_header, monkeypatch):
+    """
+    Verify that requests beyond the burst are rejected with a `429` and
+    that the rate limit headers are set.
+    """
+    monkeypatch.setattr(config.ratelimit, 'rate', 0.01)
+    monkeypatch.setattr(config.ratelimit, 'burst', 2)
+    responses = [limited_client.get('/1/vrfs', headers=test_auth_header) for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert [r.headers['RateLimit-Remaining'] for r in responses] == ['1', '0', '0']
+    assert responses[0].headers['RateLimit-Limit'] == '2'
+    assert int(responses[2].headers['Retry-After']) > 0
+    assert responses[2].json['status'] == 429
+
+
+def test_rate_limit_groups(limited_client, test_auth_header, monkeypatch):
+    """
+    Verify that the device limit applies to device requests only.
+    """
+    monkeypatch.setattr(config.ratelimit, 'device_rate', 0.01)
+    monkeypatch.setattr(config.ratelimit, 'device_burst', 1)
+    assert limited_client.get('/1/vrfs', headers=test_auth_header).status_code == 200
+    assert limited_client.get('/2/vrfs', headers=test_auth_header).status_code == 429
+    response = limited_client.get('/admin/users', headers=test_auth_header)
+    assert response.status_code == 200
+    assert 'RateLimit-Limit' not in response.headers
+
+
+def test_rate_limit_disabled(limited_client, test_auth_header):
+    response = limited_client.get('/1/vrfs', headers=test_auth_header)
+    assert response.status_code == 200
+    assert 'RateLimit-Limit' not in response.headers
+
+
+def test_token_bucket_refill():
+    bucket = ratelimit.TokenBucket(tokens=1, updated=0)
+    assert bucket.take(0, rate=2, burst=2)
+    assert not bucket.take(0.25, rate=2, burst=2)
+    assert bucket.take(0.5, rate=2, burst=2)
+    # The bucket never holds more than its burst.
+    assert bucket.take(100, rate=2, burst=2)
+    assert bucket.tokens == 1
+
+
+def test_base_bucket_store():
+    outcomes = [ratelimit.BucketStore().take('token:1:global', 0.01, 2) for _ in range(3)]
+    assert all(o.allowed and o.remaining == 2 for o in outcomes)
+
+
+@pytest.mark.parametrize('store', ['local', 'database'])
+def test_bucket_store(store, request):
+    if store == 'database':
+        request.getfixturevalue('db_session')
+        store = ratelimit.DatabaseBucketStore()
+    else:
+        store = ratelimit.LocalBucketStore()
+    outcomes = [store.take('token:1:global', 0.01, 2) for _ in range(3)]
+    assert [o.allowed for o in outcomes] == [True, True, False]
+    assert outcomes[2].retry_after > 0
+    # Buckets are independent of each other.
+    assert store.take('token:2:global', 0.01, 2).allowed
+
+
+@pytest.mark.parametrize('store', ['local', 'database'])
+def test_bucket_store_take_all(store, request):
+    """
+    Verify that a request rejected by one bucket takes no tokens from the
+    others.
+    """
+    if store == 'database':
+        request.getfixturevalue('db_session')
+        store = ratelimit.DatabaseBucketStore()
+    else:
+        store = ratelimit.LocalBucketStore()
+    limits = [('token:1:global', 0.01, 3), ('token:1:device', 0.01, 1)]
+    assert all(o.allowed for o in store.take_all(limits))
+    for _ in range(3):
+        outcomes = store.take_all(limits)
+        assert [o.allowed for o in outcomes] == [True, False]
+    assert store.take('token:1:global', 0.01, 3).remaining == 1
+
+
+def test_database_bucket_store_retries(db_session, monkeypatch):
+    """
+    Verify that a bucket that is updated concurrently on every attempt is
+    retried a limited number of times before the request is rejected.
+    """
+    from autonet.db import Session
+    from autonet.db.models import RateLimitBuckets
+
+    store = ratelimit.DatabaseBucketStore()
+    assert store.take('token:1:global', 0.01, 2).allowed
+    attempts = []
+    take_all = ratelimit._take_all
+
+    def contended(buckets, now, limits):
+        attempts.append(now)
+        with Session() as s:
+            s.get(RateLimitBuckets, 'token:1:global').updated_on += 1
+            s.commit()
+        return take_all(buckets, now, limits)
+
+    monkeypatch.setattr(ratelimit, '_take_all', contended)
+    outcome = store.take('token:1:global', 0.01, 2)
+    assert not outcome.allowed and outcome.retry_after >= 1
+    assert len(attempts) == ratelimit.MAX_RETRIES
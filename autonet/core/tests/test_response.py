@@ -108,3 +108,129 @@ def test_autonet_response_error_list(flask_app, setup_request):
         r, s, h = autonet_response()
         assert error1 in r.json['errors']
         assert error2 in r.json['errors']
+
+
+def test_autonet_response_device_busy(flask_app, setup_request):
+    """
+    Verify that a busy device results in a 429 with a Retry-After header.
+    """
+    with flask_app.app_context():
+        setup_request()
+        from flask import g
+        g.errors.append(an_exc.DeviceBusy(25, retry_after=3))
+        r, s, h = autonet_response()
+        assert r.json['status'] == s == 429
+        assert h['Retry-After'] == '3'
+
+
+def test_autonet_response_age_header(flask_app, setup_request):
+    """
+    Verify that an Age header is sent when the driver served cached reads.
+    """
+    class CachedDriver:
+        cache_age = 12.5
+
+    with flask_app.app_context():
+        setup_request()
+        from flask import g
+        r, s, h = autonet_response()
+        assert not h
+        g.driver = CachedDriver()
+        r, s, h = autonet_response()
+        assert h['Age'] == '12'
+
+
+def test_autonet_response_etag(flask_app, setup_request, test_response_payload):
+    """
+    Verify that GET responses carry an ETag that is stable between
+    requests, and that a matching If-None-Match yields a 304.
+    """
+    with flask_app.test_request_context('/', method='GET'):
+        setup_request()
+        r, s, h = autonet_response(test_response_payload)
+        etag = r.get_etag()[0]
+        assert etag
+    with flask_app.test_request_context('/', method='GET',
+                                        headers={'If-None-Match': f'"{etag}"'}):
+        setup_request()
+        r, s, h = autonet_response(test_response_payload)
+        assert s == r.status_code == 304
+        assert r.get_etag()[0] == etag
+        assert not r.get_data()
+    with flask_app.test_request_context('/', method='GET',
+                                        headers={'If-None-Match': '"other"'}):
+        setup_request()
+        r, s, h = autonet_response(test_response_payload)
+        assert s is None and r.status_code == 200
+
+
+@pytest.mark.parametrize('method, status', [('POST', 201), ('GET', 404)])
+def test_autonet_response_no_etag(flask_app, setup_request, method, status):
+    """
+    Verify that only successful GET responses carry an ETag.
+    """
+    with flask_app.test_request_context('/', method=method):
+        setup_request()
+        r, s, h = autonet_response(None, status)
+        assert r.get_etag() == (None, None)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_autonet_response_stream(flask_app, setup_request, test_response_payload,
+                                 monkeypatch, chunk_size):
+    """
+    Verify that a streamed response has the same content as a
+    non-streamed one.
+    """
+    from autonet.config import config
+    monkeypatch.setattr(config.response, 'stream_chunk_size', chunk_size)
+    payload = [test_response_payload] * 5
+    with flask_app.test_request_context('/', method='GET'):
+        setup_request()
+        expected, _, _ = autonet_response(payload)
+        r, s, h = autonet_response(iter(payload))
+        assert r.is_streamed
+        assert r.get_etag() == (None, None)
+        assert r.json == expected.json
+
+
+@pytest.mark.parametrize('accept, mimetype', [
+    (None, 'application/json'),
+    ('*/*', 'application/json'),
+    ('application/json, application/msgpack', 'application/json'),
+    ('application/msgpack', 'application/msgpack'),
+    ('application/cbor, application/json;q=0.5', 'application/cbor'),
+])
+def test_autonet_response_negotiation(flask_app, setup_request, test_response_payload,
+                                      accept, mimetype):
+    """
+    Verify that the response format is negotiated, defaulting to JSON.
+    """
+    pytest.importorskip('msgpack')
+    pytest.importorskip('cbor2')
+    headers = {'Accept': accept} if accept else {}
+    with flask_app.test_request_context('/', method='GET', headers=headers):
+        setup_request()
+        r, s, h = autonet_response(test_response_payload)
+        assert r.mimetype == mimetype
+        assert 'Accept' in r.vary
+
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_autonet_response_msgpack(flask_app, setup_request, test_response_payload, stream):
+    """
+    Verify that a MessagePack response carries the same envelope as JSON.
+    """
+    msgpack = pytest.importorskip('msgpack')
+    payload = [test_response_payload] * 3
+    with flask_app.test_request_context('/', method='GET'):
+        setup_request()
+        expected, _, _ = autonet_response(payload)
+    with flask_app.test_request_context('/', method='GET',
+                                        headers={'Accept': 'application/msgpack'}):
+        setup_request()
+        from flask import g
+        g.request_id = expected.json['request-id']
+        r, s, h = autonet_response(iter(payload) if stream else payload)
+        assert not r.is_streamed
+        assert msgpack.unpackb(r.get_data()) == expected.json
@@ -0,0 +1,126 @@
+import dataclasses
+import pytest
+
+from datetime import datetime, timezone
+from flask.json.provider import DefaultJSONProvider
+from uuid import UUID
+
+from autonet.core import serialization
+from autonet.core.objects import interfaces as an_if, validators
+from autonet.core.serialization import AutonetJSONProvider
+from autonet.util.config_string import VLANSet
+
+
+@pytest.fixture
+def test_payload():
+    # Built as driver output is, so that VLAN IDs are kept as a list
+    # which Flask's default provider can encode.
+    with validators.trusted():
+        return {
+            'interfaces': [
+                an_if.Interface(name='Ethernet1', mode='routed', admin_enabled=True, mtu=1500,
+                                attributes=an_if.InterfaceRouteAttributes(
+                                    addresses=[an_if.InterfaceAddress('198.18.0.1/24')],
+                                    vrf='blue')),
+                an_if.Interface(name='Ethernet2', mode='bridged', description='Ünïcode',
+                                attributes=an_if.InterfaceBridgeAttributes(
+                                    dot1q_enabled=True, dot1q_vids=[10, 20]))
+            ],
+            'id': UUID('2a575546-b5d1-44f0-a485-301305ff1be4'),
+            'created_on': datetime(2022, 5, 1, 12, 30),
+            'count': 2
+        }
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_provider_matches_flask_default(flask_app, monkeypatch, test_payload, use_orjson):
+    """
+    Verify that the provider produces the same data as Flask's default
+    provider, with and without orjson.
+    """
+    if use_orjson and serialization.orjson is None:
+        pytest.skip('orjson is not installed')
+    if not use_orjson:
+        monkeypatch.setattr(serialization, 'orjson', None)
+    provider = AutonetJSONProvider(flask_app)
+    expected = DefaultJSONProvider(flask_app).dumps(test_payload)
+    assert provider.loads(provider.dumps(test_payload)) == provider.loads(expected)
+
+
+def test_provider_compact_response(flask_app, test_payload):
+    """
+    Verify that compact responses are sorted and contain no whitespace.
+    """
+    provider = AutonetJSONProvider(flask_app)
+    body = provider.dumps({'b': 1, 'a': [1, 2]}, separators=(',', ':'))
+    assert body == '{"a":[1,2],"b":1}'
+
+
+def test_provider_ensure_ascii(flask_app):
+    """
+    Verify that non-ASCII characters are escaped as they are by Flask's
+    default provider, whether or not orjson is used.
+    """
+    provider = AutonetJSONProvider(flask_app)
+    body = provider.dumps({'description': 'Ünïcode'}, separators=(',', ':'))
+    assert body == '{"description":"\\u00dcn\\u00efcode"}'
+    provider.ensure_ascii = False
+    body = provider.dumps({'description': 'Ünïcode'}, separators=(',', ':'))
+    assert body == '{"description":"Ünïcode"}'
+
+
+def test_provider_large_integer_fallback(flask_app):
+    provider = AutonetJSONProvider(flask_app)
+    assert provider.dumps({'n': 2 ** 70}) == '{"n": 1180591620717411303424}'
+
+
+def test_compiled_encoder_is_shallow():
+    """
+    Verify that compiled encoders do not copy or convert nested values.
+    """
+    attributes = an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_vids=[10])
+    interface = an_if.Interface(name='Ethernet1', attributes=attributes)
+    encoded = serialization.get_encoder(an_if.Interface)(interface)
+    assert encoded['attributes'] is attributes
+    assert list(encoded) == [f.name for f in dataclasses.fields(an_if.Interface)]
+    assert serialization.get_encoder(an_if.Interface) is serialization.get_encoder(an_if.Interface)
+
+
+def test_vlan_set_encoder(flask_app):
+    attributes = an_if.InterfaceBridgeAttributes(dot1q_enabled=True,
+                                                 dot1q_vids=VLANSet.from_glob('10-12'))
+    provider = AutonetJSONProvider(flask_app)
+    assert provider.loads(provider.dumps(attributes))['dot1q_vids'] == [10, 11, 12]
+
+
+def test_registered_encoder():
+    class Opaque:
+        pass
+
+    assert serialization.get_encoder(Opaque) is None
+    serialization.register_encoder(Opaque, lambda o: 'opaque')
+    assert serialization.default(Opaque()) == 'opaque'
+
+
+def test_msgpack_matches_json(flask_app, test_payload):
+    """
+    Verify that MessagePack encodes the same data as JSON.
+    """
+    msgpack = pytest.importorskip('msgpack')
+    provider = AutonetJSONProvider(flask_app)
+    expected = provider.loads(provider.dumps(test_payload))
+    assert msgpack.unpackb(serialization.dumps_msgpack(test_payload)) == expected
+
+
+def test_cbor_matches_json(flask_app, test_payload):
+    """
+    Verify that CBOR encodes the same data as JSON, other than the values
+    for which it has native types.
+    """
+    cbor2 = pytest.importorskip('cbor2')
+    provider = AutonetJSONProvider(flask_app)
+    expected = provider.loads(provider.dumps(test_payload))
+    data = cbor2.loads(serialization.dumps_cbor(test_payload))
+    assert data.pop('id') == test_payload['id']
+    assert data.pop('created_on') == test_payload['created_on'].replace(tzinfo=timezone.utc)
+    assert data == {k: v for k, v in expected.items() if k not in ['id', 'created_on']}
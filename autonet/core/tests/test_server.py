@@ -0,0 +1,81 @@
+import pytest
+
+from autonet.config import config
+from autonet.core import locks, marshal, serialization, server
+from autonet.core.objects import interfaces as an_if
+
+
+def test_worker_count(monkeypatch):
+    monkeypatch.setattr(config.server, 'workers', 3)
+    assert server.worker_count() == 3
+    monkeypatch.setattr(config.server, 'workers', 0)
+    monkeypatch.setattr(server.multiprocessing, 'cpu_count', lambda: 4)
+    assert server.worker_count() == 9
+
+
+def test_marshal_driver_cache(monkeypatch):
+    """
+    Verify that entry points are not searched again for a loaded driver.
+    """
+    monkeypatch.setattr(marshal, '_drivers', {})
+    driver = marshal.marshal_driver('autonet.drivers', 'dummy')
+    monkeypatch.setattr(marshal, '__import__', None, raising=False)
+    assert marshal.marshal_driver('autonet.drivers', 'dummy') is driver
+
+
+def test_warm_caches(monkeypatch):
+    monkeypatch.setattr(marshal, '_drivers', {})
+    monkeypatch.setattr(serialization, '_encoders', {})
+    server.warm_caches()
+    assert ('autonet.drivers', 'dummy') in marshal._drivers
+    assert an_if.Interface in serialization._encoders
+    assert an_if.InterfaceAddress in serialization._encoders
+
+
+def test_application_settings(flask_app, monkeypatch):
+    pytest.importorskip('gunicorn')
+    monkeypatch.setattr(config, 'bind_host', '127.0.0.1')
+    monkeypatch.setattr(config, 'port', 8080)
+    monkeypatch.setattr(config.server, 'workers', 2)
+    monkeypatch.setattr(config.server, 'threads', 16)
+    monkeypatch.setattr(locks, '_workers', 1)
+    monkeypatch.setattr(locks, '_write_lock', None)
+    application = server.AutonetApplication(flask_app)
+    assert application.cfg.bind == ['127.0.0.1:8080']
+    assert application.cfg.workers == 2
+    assert application.cfg.threads == 16
+    assert application.cfg.preload_app
+    assert application.load() is flask_app
+
+
+def test_application_local_lock(flask_app, monkeypatch):
+    """
+    Verify that multiple workers are not started with the `local` lock.
+    """
+    pytest.importorskip('gunicorn')
+    monkeypatch.setattr(config.server, 'workers', 2)
+    monkeypatch.setattr(config.driver, 'write_lock', 'local')
+    with pytest.raises(RuntimeError):
+        server.AutonetApplication(flask_app).load()
+
+
+def test_application_read_cache(flask_app, monkeypatch):
+    """
+    Verify that multiple workers are only started with the read cache
+    enabled if stale reads from other workers are accepted.
+    """
+    pytest.importorskip('gunicorn')
+    monkeypatch.setattr(config.server, 'workers', 2)
+    monkeypatch.setattr(config.driver, 'read_cache_ttl', 5)
+    monkeypatch.setattr(locks, '_workers', 1)
+    monkeypatch.setattr(locks, '_write_lock', None)
+    with pytest.raises(RuntimeError):
+        server.AutonetApplication(flask_app).load()
+    monkeypatch.setattr(config.driver, 'read_cache_per_worker', True)
+    assert server.AutonetApplication(flask_app).load() is flask_app
+
+
+def test_production_server_requires_gunicorn(flask_app, monkeypatch):
+    monkeypatch.setattr(server, 'BaseApplication', None)
+    with pytest.raises(RuntimeError):
+        server.run_production_server(flask_app)
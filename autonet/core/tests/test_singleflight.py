@@ -0,0 +1,102 @@
+import pytest
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from autonet.core.singleflight import SingleFlight
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    """
+    Verify that concurrent calls with the same key execute once and
+    share the result.
+    """
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_read():
+        calls.append(1)
+        release.wait(5)
+        return ['result']
+
+    def caller():
+        return group.do('key', slow_read)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(caller) for _ in range(5)]
+        # Wait until the leader is executing before releasing it.
+        while not group.in_flight('key'):
+            pass
+        # Give the remaining callers a chance to join the flight.
+        while group._flights['key'].shared < 4:
+            pass
+        release.set()
+    results = [f.result() for f in futures]
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_singleflight_sequential_calls_execute():
+    """
+    Verify that completed calls are not cached.
+    """
+    group = SingleFlight()
+    calls = []
+    for _ in range(3):
+        group.do('key', calls.append, 1)
+    assert len(calls) == 3
+    assert not group.in_flight('key')
+
+
+def test_singleflight_shares_exceptions():
+    """
+    Verify that an exception raised by the leader is raised for callers
+    that joined the flight.
+    """
+    group = SingleFlight()
+    release = threading.Event()
+
+    def failing_read():
+        release.wait(5)
+        raise ValueError('device error')
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(group.do, 'key', failing_read) for _ in range(3)]
+        while not group.in_flight('key') or group._flights['key'].shared < 2:
+            pass
+        release.set()
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result()
+    assert not group.in_flight('key')
+
+
+@pytest.mark.parametrize('autonet_device', [(25, True, True)], indirect=True)
+def test_driver_execute_coalesces_reads(autonet_device):
+    """
+    Verify that `DeviceDriver.execute()` coalesces concurrent reads of
+    the same device and capability.
+    """
+    from autonet.drivers.device.driver import DeviceDriver
+    release = threading.Event()
+    calls = []
+
+    class SlowDriver(DeviceDriver):
+        def _vrf_read(self, request_data=None):
+            calls.append(request_data)
+            release.wait(5)
+            return []
+
+    def caller():
+        return SlowDriver(autonet_device).execute('vrf', 'read')
+
+    key = SlowDriver(autonet_device)._execution_key('vrf')
+    from autonet.core.singleflight import read_flights
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(caller) for _ in range(4)]
+        while not read_flights.in_flight(key) or read_flights._flights[key].shared < 3:
+            pass
+        release.set()
+    assert [f.result() for f in futures] == [[], [], [], []]
+    assert len(calls) == 1
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from sqlalchemy import Column, ForeignKey, UniqueConstraint
-from sqlalchemy import String, VARCHAR
+from sqlalchemy import DATETIME, Float, Integer, LargeBinary, String, Text, VARCHAR
 from sqlalchemy.orm import relationship
 from .types import GUID
 from .mixins import GUIDMixin, TimestampMixin, Updatable
@@ -40,3 +41,43 @@ class Tokens(GUIDMixin, TimestampMixin, Updatable):
     # user: Users = field(
     #     default_factory=list, metadata={'sa': lambda: relationship('Users', back_populates='tokens')}
     # )
+
+
+@mapper_registry.mapped
+@dataclass
+class DeviceLocks(object):
+    __tablename__ = 'device_locks'
+    __sa_dataclass_metadata_key__ = 'sa'
+
+    device_id: str = field(default=None, metadata={'sa': Column(String(64), primary_key=True)})
+    owner: str = field(default=None, metadata={'sa': Column(String(32), nullable=False)})
+    expires_on: datetime = field(default=None, metadata={'sa': Column(DATETIME, nullable=False)})
+
+
+@mapper_registry.mapped
+@dataclass
+class IdempotencyKeys(object):
+    __tablename__ = 'idempotency_keys'
+    __sa_dataclass_metadata_key__ = 'sa'
+
+    username: str = field(default=None, metadata={'sa': Column(String(32), primary_key=True)})
+    key: str = field(default=None, metadata={'sa': Column(String(255), primary_key=True)})
+    fingerprint: str = field(default=None, metadata={'sa': Column(String(32), nullable=False)})
+    status: int = field(default=None, metadata={'sa': Column(Integer)})
+    mimetype: str = field(default=None, metadata={'sa': Column(String(64))})
+    headers: str = field(default=None, metadata={'sa': Column(Text)})
+    # Sized for MySQL to use a MEDIUMBLOB, since a BLOB holds only 64 KiB.
+    body: bytes = field(default=None, metadata={'sa': Column(LargeBinary(length=2 ** 24 - 1))})
+    expires_on: datetime = field(default=None, metadata={'sa': Column(DATETIME, nullable=False)})
+
+
+@mapper_registry.mapped
+@dataclass
+class RateLimitBuckets(object):
+    __tablename__ = 'rate_limit_buckets'
+    __sa_dataclass_metadata_key__ = 'sa'
+
+    key: str = field(default=None, metadata={'sa': Column(String(128), primary_key=True)})
+    tokens: float = field(default=None, metadata={'sa': Column(Float, nullable=False)})
+    # Epoch seconds, which require double precision.
+    updated_on: float = field(default=None, metadata={'sa': Column(Float(precision=53), nullable=False)})
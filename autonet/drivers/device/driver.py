@@ -1,7 +1,16 @@
-from typing import Callable, Union
+import inspect
+import sys
 
+from collections.abc import Iterator
+from contextlib import ExitStack
+from typing import Awaitable, Callable, Union
+
+from autonet.config import config
+from autonet.core import aio, cache, limiter, locks, singleflight
 from autonet.core.device import AutonetDevice
 from autonet.core.exceptions import DriverOperationUnsupported
+from autonet.core.metrics import metrics
+from autonet.core.objects import validators
 
 DRIVER_CAPABILITIES_ACTIONS = [
     'create',
@@ -72,15 +81,28 @@ class DeviceDriver(object):
     driver would report that it's capable of performing `vxlan*`
     actions, but when asked to operate on an EX series switch it would
     raise a :py:exc:`DeviceOperationUnsupported` exception.
+
+    List endpoints may filter the objects that are returned.  A driver that
+    is able to filter more efficiently than Autonet, for example by
+    only retrieving matching objects from the device, may declare the
+    filters it supports per capability in :py:attr:`supported_filters`.
+    Those filters are then passed to the capability's `read` method as a
+    dictionary via the `filters` keyword argument.  Autonet will still
+    apply all filters to the objects that the driver returns.
     """
 
     _enumerated_capabilities = {}
+    # Filters the driver applies itself, e.g. {'interface': ['mode', 'vrf']}
+    supported_filters = {}
 
     def __init__(self, device: AutonetDevice):
         """
         :param device: An AutonetDevice object to act upon.
         """
         self.device = device
+        # Age, in seconds, of the oldest cached read result returned by
+        # `execute()`, or `None` if no cached results have been returned.
+        self.cache_age = None
 
     @property
     def capabilities(self):
@@ -142,10 +164,297 @@ class DeviceDriver(object):
         filled out.  The function would then need to return an appropriate object
         and response or raise (or bubble up) an appropriate exception.
 
+        Concurrent `read` actions for the same device, capability and
+        request data are coalesced so that only one of them is executed
+        against the device.  The callers share the result of that single
+        execution.  See :py:class:`autonet.core.singleflight.SingleFlight`.
+
+        The number of concurrent executions against a single device is
+        limited as configured in the `[driver]` configuration group.
+        See :py:class:`autonet.core.limiter.DeviceLimiter`.
+
+        All actions other than `read` are executed while holding an
+        exclusive write lock for the device, which may be shared between
+        workers and hosts.  See :py:mod:`autonet.core.locks`.
+
+        When the read cache is enabled, `read` results are served from
+        the cache while valid, and any other action invalidates the
+        cached reads for the device.  The cache is per process, so with
+        multiple workers a write only invalidates the cache of the worker
+        that executed it.  See :py:class:`autonet.core.cache.ReadCache`.
+
+        Cached and coalesced `read` results are shared by reference
+        between callers and must be treated as immutable.  A caller that
+        needs to modify a result, for example with `merge()`, must
+        modify a copy of it.
+
+        A `read` that returns a list of objects may instead return an
+        iterator, such as a generator, in which case the objects are
+        streamed to the client as they are produced.  Streamed results are
+        neither cached nor shared between coalesced reads, and the device's
+        execution slot is held until the iterator has been consumed.
+        An `interface` read may also return an
+        :py:class:`autonet.core.objects.interfaces.InterfaceTable`, which
+        is filtered, paginated and serialized by column.
+
+        Capability functions may be defined as coroutines (`async def`),
+        in which case they are run on the driver event loop while the
+        calling thread waits for their result.  They are otherwise
+        executed exactly as other capability functions are.  When called
+        while handling a request served by the ASGI application the
+        execution is instead awaited on the server's event loop with
+        :py:meth:`execute_async()`.  See :py:mod:`autonet.core.aio`.
+
+        Objects constructed by capability functions are trusted to be
+        valid and skip type and value validation, although their values
+        are still normalized.  In debug mode a sample of them is validated
+        to catch driver bugs.  See :py:func:`autonet.core.objects.validators.trusted`.
+
+        :param capability: The capability to be utilized
+        :param action: The request action
+        :param request_data: The request data
+        :return:
+        """
+        if aio.waiting_allowed():
+            return aio.wait(self.execute_async(capability, action, request_data, **kwargs))
+        func = self._get_cap_function(capability, action)
+        if action == 'read':
+            return self._execute_read(func, capability, request_data, **kwargs)
+        self.cache_age = None
+        try:
+            return self._execute(func, action, request_data, **kwargs)
+        finally:
+            cache.read_cache().invalidate(self.device.device_id)
+
+    async def execute_async(self, capability: str, action: str, request_data: object = None, **kwargs):
+        """
+        The coroutine counterpart of :py:meth:`execute()`, which must be
+        awaited on an event loop.
+
+        Coroutine capability functions are awaited on the running event
+        loop, so that any number of executions may be in flight without
+        holding a thread each.  Reads are cached and coalesced, and the
+        execution slot and write lock are held, as with :py:meth:`execute()`.
+        Waiting for the slot or lock is done in the thread pool of
+        :py:func:`autonet.core.aio.executor()` so that the loop is not
+        blocked.  An iterator returned by a coroutine is consumed on the
+        loop and so must not block.
+
+        Synchronous capability functions are executed with
+        :py:meth:`execute()` in the thread pool.  An iterator returned by
+        one is consumed in the pool as well, so its objects are not
+        streamed.
+
         :param capability: The capability to be utilized
         :param action: The request action
         :param request_data: The request data
         :return:
         """
         func = self._get_cap_function(capability, action)
-        return func(request_data=request_data, **kwargs)
+        if not inspect.iscoroutinefunction(func):
+            return await aio.run_sync(self._execute_collected, capability, action, request_data, **kwargs)
+        if action == 'read':
+            return await self._execute_read_async(func, capability, request_data, **kwargs)
+        self.cache_age = None
+        try:
+            return await self._execute_async(func, action, request_data, **kwargs)
+        finally:
+            cache.read_cache().invalidate(self.device.device_id)
+
+    def _execute_collected(self, capability: str, action: str, request_data: object = None, **kwargs):
+        """
+        Same as :py:meth:`execute()`, but an iterator result is consumed
+        and returned as a list.
+
+        :param capability: The capability to be utilized
+        :param action: The request action
+        :param request_data: The request data
+        :return:
+        """
+        result = self.execute(capability, action, request_data, **kwargs)
+        if isinstance(result, Iterator):
+            return list(result)
+        return result
+
+    def _execute_read(self, func: Callable, capability: str, request_data: object = None, **kwargs):
+        """
+        Serve a read from the read cache, or execute it, coalesced with any
+        identical reads in progress, and cache the result.
+
+        :param func: The capability function.
+        :param capability: The capability to be utilized
+        :param request_data: The request data
+        :return:
+        """
+        key = self._execution_key(capability, request_data, **kwargs)
+        read_cache = cache.read_cache()
+        cached = read_cache.get(key)
+        if cached is not None:
+            result, age = cached
+            self.cache_age = max(age, self.cache_age or 0)
+            return result
+        generation = read_cache.generation(self.device.device_id)
+        if config.driver.coalesce_reads:
+            result, shared = singleflight.read_flights.do_shared(
+                key, self._execute, func, 'read', request_data, **kwargs)
+            if shared and isinstance(result, Iterator):
+                # A streamed result can only be consumed once.
+                result = self._execute(func, 'read', request_data, **kwargs)
+        else:
+            result = self._execute(func, 'read', request_data, **kwargs)
+        if not isinstance(result, Iterator):
+            read_cache.set(key, result, generation)
+        return result
+
+    def _execute(self, func: Callable, action: str, request_data: object = None, **kwargs):
+        """
+        Call the capability function while holding an execution slot for
+        the device, and the device write lock for any action other than
+        `read`.  If the function returns an iterator these are held until
+        it has been exhausted or closed.  Objects constructed by the
+        function are trusted, see :py:func:`validators.trusted()`.
+
+        :param func: The capability function.
+        :param action: The request action
+        :param request_data: The request data
+        :return:
+        """
+        sample_rate = validators.validation_sample_rate()
+        with ExitStack() as stack:
+            stack.enter_context(limiter.device_limiter().slot(self.device.device_id, action))
+            if action != 'read':
+                stack.enter_context(locks.write_lock().hold(self.device.device_id))
+            with validators.trusted(sample_rate), metrics.timer(f'driver.{action}'):
+                result = func(request_data=request_data, **kwargs)
+                if inspect.isawaitable(result):
+                    result = aio.run(_trusted_coroutine(result, sample_rate))
+            if isinstance(result, Iterator):
+                return _HeldIterator(result, stack.pop_all(), sample_rate)
+            return result
+
+    async def _execute_read_async(self, func: Callable, capability: str, request_data: object = None, **kwargs):
+        """
+        The coroutine counterpart of :py:meth:`_execute_read()`.
+
+        :param func: The capability coroutine function.
+        :param capability: The capability to be utilized
+        :param request_data: The request data
+        :return:
+        """
+        key = self._execution_key(capability, request_data, **kwargs)
+        read_cache = cache.read_cache()
+        cached = read_cache.get(key)
+        if cached is not None:
+            result, age = cached
+            self.cache_age = max(age, self.cache_age or 0)
+            return result
+        generation = read_cache.generation(self.device.device_id)
+        if config.driver.coalesce_reads:
+            result, shared = await singleflight.async_read_flights.do_shared(
+                key, self._execute_async, func, 'read', request_data, **kwargs)
+            if shared and isinstance(result, Iterator):
+                # A streamed result can only be consumed once.
+                result = await self._execute_async(func, 'read', request_data, **kwargs)
+        else:
+            result = await self._execute_async(func, 'read', request_data, **kwargs)
+        if not isinstance(result, Iterator):
+            read_cache.set(key, result, generation)
+        return result
+
+    async def _execute_async(self, func: Callable, action: str, request_data: object = None, **kwargs):
+        """
+        The coroutine counterpart of :py:meth:`_execute()`.  The execution
+        slot and write lock are acquired and released in the thread pool.
+
+        :param func: The capability coroutine function.
+        :param action: The request action
+        :param request_data: The request data
+        :return:
+        """
+        sample_rate = validators.validation_sample_rate()
+        stack = ExitStack()
+        try:
+            await aio.enter_context(stack, limiter.device_limiter().slot(self.device.device_id, action))
+            if action != 'read':
+                await aio.enter_context(stack, locks.write_lock().hold(self.device.device_id))
+            with validators.trusted(sample_rate), metrics.timer(f'driver.{action}'):
+                result = await func(request_data=request_data, **kwargs)
+        except BaseException:
+            await aio.run_sync(stack.__exit__, *sys.exc_info())
+            raise
+        if isinstance(result, Iterator):
+            return _HeldIterator(result, stack, sample_rate)
+        await aio.run_sync(stack.close)
+        return result
+
+    def get_config_version(self) -> Union[str, None]:
+        """
+        Drivers may override this method to return a token that changes
+        whenever the configuration of the device changes, such as a
+        configuration commit counter or a hash of the running
+        configuration.  It must be considerably cheaper to retrieve than
+        reading the configuration itself.
+
+        When a version is returned Autonet will derive the `ETag` for GET
+        requests from it, which allows a matching `If-None-Match` request
+        to be answered with a `304` without any read being executed.  The
+        default implementation returns `None`, in which case the `ETag`
+        is derived from the response content instead.
+
+        :return:
+        """
+        return None
+
+    def _execution_key(self, capability: str, request_data: object = None, **kwargs) -> tuple:
+        """
+        Build a key that identifies an execution against this driver's
+        device.  Executions with equal keys are expected to yield the
+        same result.
+
+        :param capability: The capability to be utilized
+        :param request_data: The request data
+        :return:
+        """
+        return (self.device.device_id, capability,
+                repr(request_data), repr(sorted(kwargs.items())))
+
+
+async def _trusted_coroutine(coro: Awaitable, sample_rate: float = 0):
+    # The driver event loop does not share the context of the calling
+    # thread, so the trusted context is entered again on the loop.
+    with validators.trusted(sample_rate):
+        return await coro
+
+
+class _HeldIterator(object):
+    """
+    Wraps an iterator returned by a capability function, releasing the
+    context it was executed in, such as the device's execution slot,
+    once the iterator has been exhausted or closed.
+    """
+
+    def __init__(self, iterator: Iterator, stack: ExitStack, sample_rate: float = 0):
+        self._iterator = iterator
+        self._stack = stack
+        self._sample_rate = sample_rate
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            with validators.trusted(self._sample_rate):
+                return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        try:
+            if hasattr(self._iterator, 'close'):
+                self._iterator.close()
+        finally:
+            self._stack.close()
+
+    def __del__(self):
+        self.close()
@@ -1,5 +1,29 @@
+"""
+The dummy driver simulates a device in memory, so that Autonet can be
+exercised, and its request throughput measured, without any real
+devices.  Each simulated device is seeded with physical interfaces and
+the default VLAN, and holds any configuration made through Autonet for
+the life of the process.
+
+Every driver operation sleeps for a configurable latency, varied at
+random by up to the configured jitter, to simulate the time a real
+device would take.  The latencies and number of interfaces configured
+in the `[driver_dummy]` configuration group may be overridden per
+device by setting the same option, prefixed by `dummy_`, in the device
+metadata, e.g. `dummy_read_latency`.
+"""
+import copy
+import random
+import threading
+import time
+import zlib
+
+from conf_engine.options import NumberOption
 from typing import List, Union
 
+from autonet.config import config
+from autonet.core.device import AutonetDevice
+from autonet.core.exceptions import ObjectExists, ObjectNotFound
 from autonet.drivers.device.driver import DeviceDriver
 from autonet.core.objects import interfaces as an_if
 from autonet.core.objects import lag as an_lag
@@ -7,9 +31,188 @@ from autonet.core.objects import vlan as an_vlan
 from autonet.core.objects import vrf as an_vrf
 from autonet.core.objects import vxlan as an_vxlan
 
+opts = [
+    NumberOption('interfaces', minimum=0, default=48),
+    NumberOption('read_latency', minimum=0, default=0, cast=float),
+    NumberOption('create_latency', minimum=0, default=0, cast=float),
+    NumberOption('update_latency', minimum=0, default=0, cast=float),
+    NumberOption('delete_latency', minimum=0, default=0, cast=float),
+    NumberOption('jitter', minimum=0, default=0, cast=float)
+]
+config.register_options(opts, 'driver_dummy')
+
+ACTIONS = ['read', 'create', 'update', 'delete']
+
+
+class SimulatedDevice(object):
+    """
+    The configuration state of a simulated device.  Objects are held per
+    table, keyed by the string form of their name or ID, and copies of
+    them are returned so that callers cannot modify the device state.
+
+    :param device: The device to be simulated.
+    """
+
+    def __init__(self, device: AutonetDevice):
+        metadata = device.metadata or {}
+
+        def option(name):
+            return float(metadata.get(f'dummy_{name}', getattr(config.driver_dummy, name)))
+
+        self.latency = {action: option(f'{action}_latency') for action in ACTIONS}
+        self.jitter = option('jitter')
+        self._lock = threading.Lock()
+        self._seed = zlib.crc32(str(device.device_id).encode())
+        self._physical = {}
+        for index in range(1, int(option('interfaces')) + 1):
+            interface = self._default_interface(index)
+            self._physical[interface.name] = interface
+        self.tables = {
+            'interfaces': copy.deepcopy(self._physical),
+            'vrfs': {},
+            'vlans': {'1': an_vlan.VLAN(id=1, name='default', admin_enabled=True)},
+            'lags': {},
+            'vxlans': {}
+        }
+
+    def _default_interface(self, index: int) -> an_if.Interface:
+        """
+        Build the default configuration of a physical interface.  Odd
+        numbered interfaces are bridged in the default VLAN, and even
+        numbered interfaces are routed with an address of their own.
+
+        :param index: The interface number.
+        :return:
+        """
+        mac = f'{self._seed:08x}{index:04x}'
+        if index % 2:
+            attributes = an_if.InterfaceBridgeAttributes(dot1q_enabled=False, dot1q_pvid=1)
+        else:
+            attributes = an_if.InterfaceRouteAttributes(addresses=[
+                an_if.InterfaceAddress(f'10.{index // 256}.{index % 256}.1/24')])
+        return an_if.Interface(name=f'Ethernet{index}', description='', virtual=False,
+                               attributes=attributes, admin_enabled=True,
+                               physical_address=':'.join(mac[i:i + 2] for i in range(0, 12, 2)),
+                               speed=10000, duplex='full', mtu=1500)
+
+    def wait(self, action: str):
+        """
+        Sleep for the latency of `action`, varied by up to the jitter.
+
+        :param action: The driver action.
+        :return:
+        """
+        latency = self.latency[action]
+        if self.jitter:
+            latency = random.uniform(latency - self.jitter, latency + self.jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+    def read(self, table: str, key: Union[str, int] = None):
+        with self._lock:
+            if key is None:
+                return copy.deepcopy(list(self.tables[table].values()))
+            return copy.deepcopy(self.tables[table].get(str(key)))
+
+    def create(self, table: str, key: Union[str, int], obj: object):
+        with self._lock:
+            if str(key) in self.tables[table]:
+                raise ObjectExists(str(key))
+            self.tables[table][str(key)] = copy.deepcopy(obj)
+            return copy.deepcopy(obj)
+
+    def update(self, table: str, key: Union[str, int], obj: object, update: bool):
+        with self._lock:
+            current = self.tables[table].get(str(key))
+            if update and current is not None:
+                _merge(current, copy.deepcopy(obj))
+            else:
+                current = self.tables[table][str(key)] = copy.deepcopy(obj)
+            return copy.deepcopy(current)
+
+    def delete(self, table: str, key: Union[str, int]):
+        with self._lock:
+            if str(key) not in self.tables[table]:
+                raise ObjectNotFound()
+            if table == 'interfaces' and str(key) in self._physical:
+                # Physical interfaces cannot be removed, only defaulted.
+                self.tables[table][str(key)] = copy.deepcopy(self._physical[str(key)])
+            else:
+                del self.tables[table][str(key)]
+
+
+def _merge(current: object, update: object):
+    """
+    Merge the attributes of `update` that are not `None` into `current`,
+    using the object's own merge where it has one.
+
+    :param current: The object to be updated.
+    :param update: The object holding the updates.
+    :return:
+    """
+    if hasattr(current, 'merge') and getattr(update, 'attributes', None) is not None:
+        current.merge(update)
+        return
+    for key in update.__annotations__:
+        value = getattr(update, key, None)
+        if value is not None:
+            setattr(current, key, value)
+
+
+_devices = {}
+_devices_lock = threading.Lock()
+
+
+def simulated_device(device: AutonetDevice) -> SimulatedDevice:
+    """
+    Returns the :py:class:`SimulatedDevice` for `device`, creating it
+    on first use.  Simulated devices are shared by all drivers in the
+    process.
+
+    :param device: An `AutonetDevice` object.
+    :return:
+    """
+    with _devices_lock:
+        if device.device_id not in _devices:
+            _devices[device.device_id] = SimulatedDevice(device)
+        return _devices[device.device_id]
+
+
+def reset():
+    """
+    Discard the state of all simulated devices.
+
+    :return:
+    """
+    with _devices_lock:
+        _devices.clear()
+
 
 class DummyDriver(DeviceDriver):
-    pass
+    """
+    A driver for simulated devices, supporting all interface, VRF, VLAN,
+    LAG and VXLAN actions.  See :py:mod:`autonet.drivers.device.dummy_driver.driver`.
+    """
+
+    def __init__(self, device: AutonetDevice):
+        super().__init__(device)
+        self.simulated = simulated_device(device)
+
+    def _read(self, table: str, key: Union[str, int] = None):
+        self.simulated.wait('read')
+        return self.simulated.read(table, key)
+
+    def _create(self, table: str, key: Union[str, int], obj: object):
+        self.simulated.wait('create')
+        return self.simulated.create(table, key, obj)
+
+    def _update(self, table: str, key: Union[str, int], obj: object, update: bool):
+        self.simulated.wait('update')
+        return self.simulated.update(table, key, obj, update)
+
+    def _delete(self, table: str, key: Union[str, int]):
+        self.simulated.wait('delete')
+        return self.simulated.delete(table, key)
 
     def _interface_read(self, request_data: str = None) -> [an_if.Interface]:
         """
@@ -21,6 +224,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: The name of the interface, if requested.
         :return:
         """
+        return self._read('interfaces', request_data)
 
     def _interface_create(self, request_data: an_if.Interface) -> an_if.Interface:
         """
@@ -34,6 +238,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: An `Interface` object.
         :return:
         """
+        return self._create('interfaces', request_data.name, request_data)
 
     def _interface_update(self, request_data: an_if.Interface, update) -> an_if.Interface:
         """
@@ -50,6 +255,7 @@ class DummyDriver(DeviceDriver):
         :param update: True if called with HTTP PATCH. False if called with HTTP PUT.
         :return:
         """
+        return self._update('interfaces', request_data.name, request_data, update)
 
     def _interface_delete(self, request_data: str):
         """
@@ -61,6 +267,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: Interface name, as a string.
         :return:
         """
+        return self._delete('interfaces', request_data)
 
     def _tunnels_vxlan_read(self, request_data: str = None) -> Union[List[an_vxlan.VXLAN], an_vxlan.VXLAN]:
         """
@@ -73,6 +280,7 @@ class DummyDriver(DeviceDriver):
             for a specific VXLAN object.
         :return:
         """
+        return self._read('vxlans', request_data)
 
     def _tunnels_vxlan_create(self, request_data: an_vxlan.VXLAN) -> an_vxlan.VXLAN:
         """
@@ -84,6 +292,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: A `VXLAN` object.
         :return:
         """
+        return self._create('vxlans', request_data.id, request_data)
 
     def _tunnels_vxlan_update(self, request_data: an_vxlan.VXLAN, update: bool) -> an_vxlan.VXLAN:
         """
@@ -98,6 +307,7 @@ class DummyDriver(DeviceDriver):
         :param update: True if called with HTTP PATCH. False if called with HTTP PUT.
         :return:
         """
+        return self._update('vxlans', request_data.id, request_data, update)
 
     def _tunnels_vxlan_delete(self, request_data: str):
         """
@@ -109,6 +319,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: The VXLAN VNID, as a string.
         :return:
         """
+        return self._delete('vxlans', request_data)
 
     def _vrf_read(self, request_data: str = None) -> Union[List[an_vrf.VRF], an_vrf.VRF]:
         """
@@ -120,6 +331,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: The VRF name, as a string.
         :return:
         """
+        return self._read('vrfs', request_data)
 
     def _vrf_create(self, request_data: an_vrf.VRF) -> an_vrf.VRF:
         """
@@ -131,6 +343,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: A `VRF` object.
         :return:
         """
+        return self._create('vrfs', request_data.name, request_data)
 
     def _vrf_update(self, request_data: an_vrf.VRF, update: bool) -> an_vrf.VRF:
         """
@@ -147,6 +360,7 @@ class DummyDriver(DeviceDriver):
         :param update: True if called with HTTP PATCH. False if called with HTTP PUT.
         :return:
         """
+        return self._update('vrfs', request_data.name, request_data, update)
 
     def _vrf_delete(self, request_data: str) -> None:
         """
@@ -157,8 +371,9 @@ class DummyDriver(DeviceDriver):
         :param request_data: The VRF name, as a string.
         :return:
         """
+        return self._delete('vrfs', request_data)
 
-    def _bridge_vlan_read(self, request_data: Union[str, int]) -> Union[List[an_vlan.VLAN], an_vlan.VLAN]:
+    def _bridge_vlan_read(self, request_data: Union[str, int] = None) -> Union[List[an_vlan.VLAN], an_vlan.VLAN]:
         """
         VLAN read requests may receive a VLAN ID as `request_data`.  If a VLAN ID is
         received then only the `VLAN` object for that VLAN ID should be returned.
@@ -168,6 +383,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: The VLAN ID requested, or `None` for all VLANs.
         :return:
         """
+        return self._read('vlans', request_data)
 
     def _bridge_vlan_create(self, request_data: an_vlan.VLAN) -> an_vlan.VLAN:
         """
@@ -178,6 +394,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: A `VLAN` object.
         :return:
         """
+        return self._create('vlans', request_data.id, request_data)
 
     def _bridge_vlan_update(self, request_data: an_vlan.VLAN, update: bool) -> an_vlan.VLAN:
         """
@@ -193,6 +410,7 @@ class DummyDriver(DeviceDriver):
         :param update: True if called with HTTP PATCH. False if called with HTTP PUT.
         :return:
         """
+        return self._update('vlans', request_data.id, request_data, update)
 
     def _bridge_vlan_delete(self, request_data: str) -> None:
         """
@@ -204,8 +422,9 @@ class DummyDriver(DeviceDriver):
         :param request_data: The VLAN ID, as a string.
         :return:
         """
+        return self._delete('vlans', request_data)
 
-    def _interface_lag_read(self, request_data: str) -> Union[List[an_lag.LAG], an_lag.LAG]:
+    def _interface_lag_read(self, request_data: str = None) -> Union[List[an_lag.LAG], an_lag.LAG]:
         """
         LAG read may receive a LAG name as a string via `request_data`.  If so, then only
         the requested LAG should be returned.  Otherwise, all LAGs should be returned.
@@ -213,6 +432,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: The LAG name, or `None` for all LAGs.
         :return:
         """
+        return self._read('lags', request_data)
 
     def _interface_lag_create(self, request_data: an_lag.LAG) -> an_lag.LAG:
         """
@@ -224,6 +444,7 @@ class DummyDriver(DeviceDriver):
         :param request_data: A `LAG` object.
         :return:
         """
+        return self._create('lags', request_data.name, request_data)
 
     def _interface_lag_update(self, request_data: an_lag.LAG, update: bool) -> an_lag.LAG:
         """
@@ -236,6 +457,7 @@ class DummyDriver(DeviceDriver):
         :param update: True if called with HTTP PATCH. False if called with HTTP PUT.
         :return:
         """
+        return self._update('lags', request_data.name, request_data, update)
 
     def _interface_lag_delete(self, request_data: str) -> None:
         """
@@ -246,4 +468,5 @@ class DummyDriver(DeviceDriver):
 
         :param request_data: The LAG name, as as string.
         :return:
-        """
\ No newline at end of file
+        """
+        return self._delete('lags', request_data)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import pytest
+import time
+
+from autonet.core.exceptions import ObjectExists
+from autonet.core.metrics import metrics
+from autonet.core.objects import interfaces as an_if
+from autonet.core.objects import lag as an_lag
+from autonet.core.objects import vlan as an_vlan
+from autonet.core.objects import vrf as an_vrf
+from autonet.core.objects import vxlan as an_vxlan
+from autonet.core.tests.conftest import generate_autonet_device
+from autonet.drivers.device.dummy_driver import driver as dummy
+
+
+@pytest.fixture(autouse=True)
+def reset_devices():
+    dummy.reset()
+    yield
+    dummy.reset()
+
+
+@pytest.fixture
+def dummy_driver():
+    return dummy.DummyDriver(generate_autonet_device('dummy-1', True, True))
+
+
+def test_interfaces_seeded(dummy_driver):
+    interfaces = dummy_driver.execute('interface', 'read')
+    assert len(interfaces) == 48
+    assert [i.mode for i in interfaces[:2]] == ['bridged', 'routed']
+    assert dummy_driver.execute('interface', 'read', request_data='Ethernet2').attributes.addresses
+    assert dummy_driver.execute('interface', 'read', request_data='Ethernet49') is None
+    # Devices have distinct MAC addresses.
+    other = dummy.DummyDriver(generate_autonet_device('dummy-2', True, True))
+    assert other.execute('interface', 'read', request_data='Ethernet1').physical_address \
+        != interfaces[0].physical_address
+
+
+def test_interface_update_and_delete(dummy_driver):
+    update = an_if.Interface(name='Ethernet1', description='Uplink')
+    assert dummy_driver.execute('interface', 'update', request_data=update,
+                                update=True).description == 'Uplink'
+    interface = dummy_driver.execute('interface', 'read', request_data='Ethernet1')
+    assert interface.description == 'Uplink' and interface.mode == 'bridged'
+    # Physical interfaces are defaulted rather than removed.
+    dummy_driver.execute('interface', 'delete', request_data='Ethernet1')
+    assert dummy_driver.execute('interface', 'read', request_data='Ethernet1').description == ''
+
+
+@pytest.mark.parametrize('capability, obj, key, update', [
+    ('vrf', an_vrf.VRF(name='blue', ipv4=True), 'blue', an_vrf.VRF(name='blue', ipv6=True)),
+    ('bridge:vlan', an_vlan.VLAN(id=10, name='ten'), '10', an_vlan.VLAN(id=10, admin_enabled=False)),
+    ('interface:lag', an_lag.LAG(name='Port-Channel1', members=['Ethernet1']), 'Port-Channel1',
+     an_lag.LAG(name='Port-Channel1', members=['Ethernet1', 'Ethernet3'])),
+    ('tunnels:vxlan', an_vxlan.VXLAN(id=10010, source_address='198.18.0.1', layer=2,
+                                     route_distinguisher='198.18.0.1:10010'), 10010,
+     an_vxlan.VXLAN(id=10010, layer=2, route_distinguisher='198.18.0.1:1'))
+])
+def test_object_lifecycle(dummy_driver, capability, obj, key, update):
+    assert dummy_driver.execute(capability, 'create', request_data=obj) == obj
+    assert dummy_driver.execute(capability, 'read', request_data=key) == obj
+    with pytest.raises(ObjectExists):
+        dummy_driver.execute(capability, 'create', request_data=obj)
+    patched = dummy_driver.execute(capability, 'update', request_data=update, update=True)
+    # A patch leaves unset attributes unchanged, a replacement does not.
+    assert all(getattr(patched, k) == (getattr(update, k) if getattr(update, k) is not None
+                                       else getattr(obj, k)) for k in obj.__annotations__)
+    assert dummy_driver.execute(capability, 'update', request_data=update, update=False) == update
+    assert dummy_driver.execute(capability, 'delete', request_data=key) is None
+    assert dummy_driver.execute(capability, 'read', request_data=key) is None
+
+
+def test_results_are_copies(dummy_driver):
+    dummy_driver.execute('bridge:vlan', 'read', request_data=1).name = 'changed'
+    assert dummy_driver.execute('bridge:vlan', 'read', request_data=1).name == 'default'
+    # The state is shared by drivers for the same device.
+    dummy_driver.execute('vrf', 'create', request_data=an_vrf.VRF(name='blue'))
+    other = dummy.DummyDriver(generate_autonet_device('dummy-1', True, True))
+    assert other.execute('vrf', 'read', request_data='blue').name == 'blue'
+
+
+def test_latency_from_metadata():
+    device = generate_autonet_device('dummy-1', True, True)
+    device.metadata = {'dummy_read_latency': 0.05, 'dummy_interfaces': 2}
+    driver = dummy.DummyDriver(device)
+    metrics.reset()
+    start = time.perf_counter()
+    assert len(driver.execute('interface', 'read')) == 2
+    assert time.perf_counter() - start >= 0.05
+    assert metrics.snapshot()['driver.read']['count'] == 1
@@ -1,41 +1,271 @@
-def vlan_list_to_glob(vlans: list[int]) -> str:
+from itertools import compress, count
+from typing import Iterable, Iterator, Tuple, Union
+
+MAX_VLAN_ID = 4095
+_ZEROS = b'0' * (MAX_VLAN_ID + 1)
+_ONES = b'1' * (MAX_VLAN_ID + 1)
+_BYTES = (MAX_VLAN_ID + 1) // 8
+_NAMES = [str(vid) for vid in range(MAX_VLAN_ID + 1)]
+
+
+def _byte_runs(byte: int) -> Tuple[Tuple[int, int], ...]:
+    runs = []
+    start = None
+    for bit in range(9):
+        if bit < 8 and byte >> bit & 1:
+            if start is None:
+                start = bit
+        elif start is not None:
+            runs.append((start, bit))
+            start = None
+    return tuple(runs)
+
+
+# The runs of set bits in each byte value, as (start, end) offsets.
+_BYTE_RUNS = [_byte_runs(byte) for byte in range(256)]
+
+
+class VLANSet(object):
+    """
+    A set of VLAN IDs held as a 4096 bit bitmap.  Ranges such as
+    `1-4094` are parsed, stored and formatted without a list of every
+    VLAN ID in the range being built, and union, difference and
+    membership are single integer operations.
+
+    A :py:class:`VLANSet` may be used where a list of VLAN IDs is
+    expected.  It iterates, indexes and compares equal to a list of its
+    VLAN IDs in ascending order, and supports `append()` and `extend()`.
+    """
+    __slots__ = ['_bits', '_sorted']
+
+    def __init__(self, vlans: Iterable[int] = ()):
+        """
+        :param vlans: The VLAN IDs.
+        """
+        self._bits = 0
+        # The bitmap and VLAN IDs of the last indexing of the set, so that
+        # indexing in a loop does not rebuild the list each time.
+        self._sorted = (0, [])
+        if vlans:
+            self.extend(vlans)
+
+    @staticmethod
+    def _bit(vid: int) -> int:
+        if isinstance(vid, bool) or not isinstance(vid, int) or not 0 <= vid <= MAX_VLAN_ID:
+            raise ValueError(f'Invalid VLAN ID {vid!r}')
+        return 1 << vid
+
+    @classmethod
+    def _from_bits(cls, bits: int) -> 'VLANSet':
+        vlan_set = cls.__new__(cls)
+        vlan_set._bits = bits
+        vlan_set._sorted = (0, [])
+        return vlan_set
+
+    @classmethod
+    def from_glob(cls, glob: str) -> 'VLANSet':
+        """
+        Parse a Cisco-like CLI VLAN glob, such as `1-3,6-9,11`.
+
+        :param glob: The config glob.
+        :return:
+        """
+        # The bitmap is built as a string of binary digits, VLAN ID n at
+        # index n, which is converted to an integer once.
+        digits = bytearray(_ZEROS)
+        for chunk in glob.split(','):
+            if '-' in chunk:
+                start, end = chunk.split('-')
+                start, end = int(start), int(end)
+                if not 0 <= start <= MAX_VLAN_ID or not 0 <= end <= MAX_VLAN_ID:
+                    raise ValueError(f'Invalid VLAN range {chunk!r}')
+                if start <= end:
+                    digits[start:end + 1] = _ONES[:end - start + 1]
+            else:
+                vid = int(chunk)
+                if vid > MAX_VLAN_ID:
+                    raise ValueError(f'Invalid VLAN ID {vid!r}')
+                digits[vid] = 49  # '1'
+        bits = int(digits[::-1], 2)
+        return cls._from_bits(bits)
+
+    def _runs(self) -> Iterator[Tuple[int, int]]:
+        # Reversed, the binary representation has VLAN ID n at index n.
+        digits = bin(self._bits)[:1:-1]
+        find = digits.find
+        start = find('1')
+        while start >= 0:
+            end = find('0', start)
+            if end < 0:
+                end = len(digits)
+            yield start, end
+            start = find('1', end)
+
+    def ranges(self) -> Iterator[range]:
+        """
+        Returns the contiguous ranges of VLAN IDs in the set, in
+        ascending order.
+
+        :return:
+        """
+        for start, end in self._runs():
+            yield range(start, end)
+
+    def to_glob(self) -> str:
+        """
+        Format the set as a Cisco-like CLI VLAN glob.
+
+        :return:
+        """
+        data = self._bits.to_bytes(_BYTES, 'little')
+        if 4 * data.count(255) > _BYTES - data.count(0):
+            # Mostly long runs, which are found a run at a time.
+            return ','.join([f'{start}-{end - 1}' if end - start > 1 else _NAMES[start]
+                             for start, end in self._runs()])
+        # Mostly short runs or single VLAN IDs, which are found a byte at a
+        # time, skipping the empty bytes, with the runs in each byte looked up.
+        glob = []
+        append = glob.append
+        start = end = -1
+        for base, byte in zip(compress(count(0, 8), data), filter(None, data)):
+            for first, last in _BYTE_RUNS[byte]:
+                if base + first != end:
+                    if end >= 0:
+                        append(f'{start}-{end - 1}' if end - start > 1 else _NAMES[start])
+                    start = base + first
+                end = base + last
+        if end >= 0:
+            append(f'{start}-{end - 1}' if end - start > 1 else _NAMES[start])
+        return ','.join(glob)
+
+    def add(self, vid: int):
+        self._bits |= self._bit(vid)
+
+    append = add
+
+    def discard(self, vid: int):
+        self._bits &= ~self._bit(vid)
+
+    def remove(self, vid: int):
+        if vid not in self:
+            raise ValueError(f'VLAN ID {vid!r} not in VLANSet')
+        self.discard(vid)
+
+    def extend(self, vlans: Iterable[int]):
+        if isinstance(vlans, VLANSet):
+            self._bits |= vlans._bits
+            return
+        digits = bytearray(_ZEROS)
+        for vid in vlans:
+            if isinstance(vid, bool) or not isinstance(vid, int) or not 0 <= vid <= MAX_VLAN_ID:
+                raise ValueError(f'Invalid VLAN ID {vid!r}')
+            digits[vid] = 49  # '1'
+        self._bits |= int(digits[::-1], 2)
+
+    update = extend
+
+    def copy(self) -> 'VLANSet':
+        return self._from_bits(self._bits)
+
+    def _coerce(self, other) -> Union['VLANSet', None]:
+        if isinstance(other, VLANSet):
+            return other
+        if isinstance(other, (list, tuple, set, frozenset, range)):
+            try:
+                return VLANSet(other)
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def __or__(self, other) -> 'VLANSet':
+        other = self._coerce(other)
+        return NotImplemented if other is None else self._from_bits(self._bits | other._bits)
+
+    __ror__ = __or__
+
+    def __and__(self, other) -> 'VLANSet':
+        other = self._coerce(other)
+        return NotImplemented if other is None else self._from_bits(self._bits & other._bits)
+
+    __rand__ = __and__
+
+    def __sub__(self, other) -> 'VLANSet':
+        other = self._coerce(other)
+        return NotImplemented if other is None else self._from_bits(self._bits & ~other._bits)
+
+    def __ior__(self, other) -> 'VLANSet':
+        self.extend(other)
+        return self
+
+    def __isub__(self, other) -> 'VLANSet':
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        self._bits &= ~other._bits
+        return self
+
+    def __contains__(self, vid) -> bool:
+        return isinstance(vid, int) and 0 <= vid <= MAX_VLAN_ID and bool(self._bits >> vid & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for r in self.ranges():
+            yield from r
+
+    def __len__(self) -> int:
+        return bin(self._bits).count('1')
+
+    def __bool__(self) -> bool:
+        return bool(self._bits)
+
+    def __getitem__(self, index):
+        bits, vlans = self._sorted
+        if bits != self._bits:
+            vlans = list(self)
+            self._sorted = (self._bits, vlans)
+        return vlans[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, list):
+            return list(self) == other
+        other = self._coerce(other)
+        return other is not None and self._bits == other._bits
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"VLANSet('{self.to_glob()}')"
+
+
+def vlan_list_to_glob(vlans: Iterable[int]) -> str:
     """
     Converts a VLAN ID list into a glob string commonly used by
-    Cisco-like CLIs.
+    Cisco-like CLIs.  The list is not modified, and VLAN IDs are not
+    range checked.
     :param vlans: The list of VLANs to convert to a glob.
     :return:
     """
-    vlans.sort()
-    in_range = False
-    glob = ''
-    for i, vid in enumerate(vlans):
-        # Match on first element
-        if i == 0:
-            glob = str(vid)
-        # Match if current element contiguous with the last
-        elif vid != vlans[i - 1] + 1:
-            # If we are in a range, then we have passed its end.  Append the last
-            # element.
-            if in_range:
-                glob = glob + f'-{vlans[i - 1]}'
-                in_range = False
-            # Comma delimit and append current element.
-            glob = glob + f',{vid}'
-        # Element is contiguous with last, but we've hit the end of the list.
-        elif i + 1 == len(vlans):
-            in_range = False
-            glob = glob + f'-{vid}'
-        # If nothing above matched, then we are contiguous and therefore in
-        # a range.
-        else:
-            in_range = True
-
-    return glob
+    if isinstance(vlans, VLANSet):
+        return vlans.to_glob()
+    # A list is formatted directly, which is quicker than building a
+    # VLANSet from it.
+    glob = []
+    start = end = None
+    for vid in sorted(set(vlans)):
+        if vid != end:
+            if start is not None:
+                glob.append(f'{start}-{end - 1}' if end - start > 1 else str(start))
+            start = vid
+        end = vid + 1
+    if start is not None:
+        glob.append(f'{start}-{end - 1}' if end - start > 1 else str(start))
+    return ','.join(glob)
 
 
 def glob_to_vlan_list(glob: str) -> list[int]:
     """
-    Convert a Cisco-like CLI VLAN glob into a list of vlans.
+    Convert a Cisco-like CLI VLAN glob into a list of vlans.  VLAN IDs
+    are not range checked.  Use :py:meth:`VLANSet.from_glob` to avoid
+    building the list.
     :param glob: The config glob.
     :return:
     """
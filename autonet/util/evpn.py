@@ -1,8 +1,153 @@
+import functools
 import re
 
-from ipaddress import ip_address
+from dataclasses import dataclass, field
+from ipaddress import IPv4Address
+from typing import Optional, Union
 
-from autonet.core.objects import validators as v
+from autonet.core import serialization
+from autonet.core.objects import slotted
+
+_SEPARATORS = re.compile(r'[-_.:]')
+
+
+@slotted
+@dataclass(frozen=True)
+class ESI(object):
+    """
+    An immutable, hashable EVPN Ethernet Segment Identifier.  Construct
+    instances with :py:meth:`ESI.parse`, which normalizes the textual
+    representation and returns a shared instance for ESIs parsed
+    recently, so that LAGs, drivers and indexes of ESIs across devices
+    share them.  :code:`str()` returns the normalized representation,
+    colon delimited lower case hex.
+
+    The fields of the ESI type are available as properties, which are
+    `None` for other types.  See
+    `RFC 7432 <https://datatracker.ietf.org/doc/html/rfc7432#section-5>`_
+    for more details.
+
+    :param octets: The 10 octets of the ESI.
+    """
+    octets: bytes = field(repr=False)
+
+    def __post_init__(self):
+        if not isinstance(self.octets, bytes) or len(self.octets) != 10:
+            raise ValueError(f'An ESI must be 10 octets, not {self.octets!r}.')
+
+    @classmethod
+    def parse(cls, esi: Union[str, 'ESI']) -> 'ESI':
+        """
+        Parses an ESI string, with each byte delimited by either
+        :code:`:`, :code:`.`, :code:`_`, or :code:`-`.  Raises
+        `ValueError` if the string is not a valid ESI.
+
+        :param esi: The ESI to be parsed.
+        :return:
+        """
+        if isinstance(esi, ESI):
+            return esi
+        if not isinstance(esi, str):
+            raise ValueError(f"'{esi}' does not appear to be formatted correctly.")
+        return _parse(esi)
+
+    def _int(self, start: int, end: int) -> int:
+        return int.from_bytes(self.octets[start:end], 'big', signed=False)
+
+    def _mac(self, esi_type: int) -> Optional[str]:
+        return self.octets[1:7].hex(':') if self.type == esi_type else None
+
+    @property
+    def type(self) -> int:
+        return self.octets[0]
+
+    @property
+    def id(self) -> Optional[str]:
+        """The arbitrary value of a type 0 ESI."""
+        return self.octets[1:].hex(':') if self.type == 0 else None
+
+    @property
+    def lacp_system_mac(self) -> Optional[str]:
+        return self._mac(1)
+
+    @property
+    def lacp_port_key(self) -> Optional[int]:
+        return self._int(7, 9) if self.type == 1 else None
+
+    @property
+    def root_bridge(self) -> Optional[str]:
+        return self._mac(2)
+
+    @property
+    def root_priority(self) -> Optional[int]:
+        return self._int(7, 9) if self.type == 2 else None
+
+    @property
+    def system_mac(self) -> Optional[str]:
+        return self._mac(3)
+
+    @property
+    def router_id(self) -> Optional[IPv4Address]:
+        return IPv4Address(self.octets[1:5]) if self.type == 4 else None
+
+    @property
+    def asn(self) -> Optional[int]:
+        return self._int(1, 5) if self.type == 5 else None
+
+    @property
+    def local_discriminator(self) -> Optional[int]:
+        if self.type == 3:
+            return self._int(7, 10)
+        if self.type in (4, 5):
+            return self._int(5, 9)
+        return None
+
+    def to_dict(self) -> dict:
+        """
+        Returns the ESI type and its component parts, see
+        :py:func:`parse_esi`.
+
+        :return:
+        """
+        fields = {
+            0: ['id'],
+            1: ['lacp_system_mac', 'lacp_port_key'],
+            2: ['root_bridge', 'root_priority'],
+            3: ['system_mac', 'local_discriminator'],
+            4: ['router_id', 'local_discriminator'],
+            5: ['asn', 'local_discriminator']
+        }.get(self.type, [])
+        esi_data = {'type': self.type}
+        for name in fields:
+            value = getattr(self, name)
+            esi_data[name] = str(value) if isinstance(value, IPv4Address) else value
+        return esi_data
+
+    def __str__(self) -> str:
+        return self.octets.hex(':')
+
+    def __repr__(self) -> str:
+        return f"ESI('{self}')"
+
+    def __reduce__(self):
+        return ESI.parse, (str(self),)
+
+
+@functools.lru_cache(maxsize=4096)
+def _from_octets(octets: bytes) -> ESI:
+    return ESI(octets)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse(esi: str) -> ESI:
+    # Differently formatted strings of the same ESI share an instance.
+    try:
+        return _from_octets(bytes.fromhex(_SEPARATORS.sub('', esi)))
+    except ValueError:
+        raise ValueError(f"'{esi}' does not appear to be formatted correctly.") from None
+
+
+serialization.register_encoder(ESI, str)
 
 
 def parse_esi(esi: str) -> dict:
@@ -66,49 +211,12 @@ def parse_esi(esi: str) -> dict:
             'local_discriminator': 1
         }
 
+    Raises `ValueError` if the ESI is not valid.  Use
+    :py:meth:`ESI.parse` for the parsed ESI itself.
+
     :param esi: The ESI to be parsed.  The ESI must be a string with
         each byte delimited by either :code:`:`, :code:`.`, :code:`_`,
         or :code:`-`.
     :return:
     """
-    if not v.is_esi(esi):
-        raise Exception(f"'{esi}' does not appear to be formatted correctly.")
-    octets = bytes.fromhex(re.sub(r'[-_.:]', '', esi))
-    esi_type = octets[0]
-    if esi_type == 0:
-        esi_data = {
-            'type': 0,
-            'id': octets[1:].hex(':')
-        }
-    elif esi_type == 1:
-        esi_data = {
-            'lacp_system_mac': octets[1:7].hex(':'),
-            'lacp_port_key': int.from_bytes(octets[7:9], 'big', signed=False)
-        }
-    elif esi_type == 2:
-        esi_data = {
-            'root_bridge': octets[1:7].hex(':'),
-            'root_priority': int.from_bytes(octets[7:9], 'big', signed=False)
-        }
-    elif esi_type == 3:
-        esi_data = {
-            'system_mac': octets[1:7].hex(':'),
-            'local_discriminator': int.from_bytes(octets[7:], 'big',
-                                                  signed=False)
-        }
-    elif esi_type == 4:
-        esi_data = {
-            'router_id': str(ip_address(octets[1:5])),
-            'local_discriminator': int.from_bytes(octets[5:9], 'big',
-                                                  signed=False)
-        }
-    elif esi_type == 5:
-        esi_data = {
-            'asn': int.from_bytes(octets[1:5], 'big', signed=False),
-            'local_discriminator': int.from_bytes(octets[5:9], 'big',
-                                                  signed=False)
-        }
-    else:
-        esi_data = {}
-
-    return {**{'type': esi_type}, **esi_data}
+    return ESI.parse(esi).to_dict()
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import pytest
 
 from autonet.util import config_string as cs
@@ -23,3 +25,55 @@ def test_vlan_list_to_glob(vlans, expected):
 ])
 def test_glob_to_vlan_list(glob, expected):
     assert cs.glob_to_vlan_list(glob) == expected
+
+
+def test_vlan_list_to_glob_does_not_sort_in_place():
+    vlans = [11, 1, 3, 2, 2]
+    assert cs.vlan_list_to_glob(vlans) == '1-3,11'
+    assert vlans == [11, 1, 3, 2, 2]
+
+
+def test_vlan_set():
+    vlans = cs.VLANSet.from_glob('1-4094')
+    assert len(vlans) == 4094
+    assert 1 in vlans and 4094 in vlans and 0 not in vlans and 4095 not in vlans
+    vlans -= cs.VLANSet.from_glob('100-199,300')
+    assert vlans.to_glob() == '1-99,200-299,301-4094'
+    assert (vlans & [50, 150, 250]) == [50, 250]
+    assert (cs.VLANSet([10]) | [20, 30]).to_glob() == '10,20,30'
+    assert list(cs.VLANSet([30, 10, 20, 10])) == [10, 20, 30]
+    assert cs.VLANSet([10, 20])[-1] == 20
+    indexed = cs.VLANSet([10, 20])
+    assert indexed[0] == 10
+    indexed.add(5)
+    assert indexed[0] == 5 and indexed[1:] == [10, 20]
+    assert not cs.VLANSet()
+    assert cs.VLANSet([10]) == cs.VLANSet.from_glob('10')
+    for vlan_set in [vlans, cs.VLANSet()]:
+        assert pickle.loads(pickle.dumps(vlan_set)) == vlan_set
+        assert copy.deepcopy(vlan_set) == vlan_set
+
+
+@pytest.mark.parametrize('vlans', [[4096], [-1], ['10'], [True]])
+def test_vlan_set_invalid(vlans):
+    with pytest.raises(ValueError):
+        cs.VLANSet(vlans)
+
+
+@pytest.mark.parametrize('glob', ['4096', '1-4096', 'a', '10-'])
+def test_vlan_set_invalid_glob(glob):
+    with pytest.raises(ValueError):
+        cs.VLANSet.from_glob(glob)
+
+
+def test_vlan_list_functions_not_range_checked():
+    assert cs.vlan_list_to_glob([4097, 4095, 4096]) == '4095-4097'
+    assert cs.glob_to_vlan_list('4095-4097') == [4095, 4096, 4097]
+
+
+@pytest.mark.parametrize('vlans', [
+    [], [0], [4095], [0, 1, 4094, 4095], [7, 8], [8, 15, 16], list(range(4096)),
+    list(range(1, 4095, 2)), list(range(1, 4095, 3)) + list(range(100, 300)),
+])
+def test_vlan_set_to_glob(vlans):
+    assert cs.VLANSet(vlans).to_glob() == cs.vlan_list_to_glob(vlans)
@@ -1,5 +1,9 @@
+import dataclasses
+import pickle
 import pytest
 
+from ipaddress import IPv4Address
+
 from autonet.util import evpn
 
 
@@ -36,3 +40,25 @@ from autonet.util import evpn
 ])
 def test_parse_esi(test_esi, expected):
     assert evpn.parse_esi(test_esi) == expected
+
+
+def test_esi():
+    esi = evpn.ESI.parse('04-C6-12-10-0A-00-00-00-FF-00')
+    assert str(esi) == '04:c6:12:10:0a:00:00:00:ff:00'
+    assert esi.type == 4
+    assert esi.router_id == IPv4Address('198.18.16.10')
+    assert esi.local_discriminator == 255
+    assert esi.asn is None and esi.system_mac is None
+    # Differently formatted ESIs are the same, shared, instance.
+    assert evpn.ESI.parse('04c6.1210.0a00.0000.ff00') is esi
+    assert evpn.ESI.parse(esi) is esi
+    assert {esi: 'Port-Channel1'}[evpn.ESI(esi.octets)] == 'Port-Channel1'
+    assert pickle.loads(pickle.dumps(esi)) is esi
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        esi.octets = bytes(10)
+
+
+@pytest.mark.parametrize('test_esi', ['no:t0:a0:va:li:d0:es:i0:00:00', '00:01', None])
+def test_esi_invalid(test_esi):
+    with pytest.raises(ValueError):
+        evpn.ESI.parse(test_esi)
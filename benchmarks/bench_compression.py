@@ -0,0 +1,49 @@
+"""
+Measures the size and compression time of an interface listing with
+each supported content encoding and level.
+
+    ~# python benchmarks/bench_compression.py [count]
+"""
+import sys
+import timeit
+import zlib
+
+from flask import Flask
+
+from autonet.core.serialization import AutonetJSONProvider
+
+from bench_serialization import build_interfaces
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def zlib_compress(body: bytes, level: int, wbits: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+    return compressor.compress(body) + compressor.flush()
+
+
+def bench(name: str, compress, body: bytes, repeat: int = 5):
+    best = min(timeit.repeat(lambda: compress(body), number=1, repeat=repeat))
+    size = len(compress(body))
+    print(f'{name:<24} {best * 1000:10.1f} ms {size / 1024:10.1f} KiB {len(body) / size:8.1f}x')
+
+
+def main(count: int = 10000):
+    app = Flask('benchmark')
+    provider = AutonetJSONProvider(app)
+    payload = {'request-id': 'benchmark', 'data': build_interfaces(count), 'errors': [], 'status': 200}
+    body = provider.dumps(payload).encode()
+    print(f'Compressing {count} interfaces ({len(body) / 1024:.1f} KiB), best of 5:')
+    for level in [1, 6, 9]:
+        bench(f'gzip level {level}', lambda b: zlib_compress(b, level, 31), body)
+        bench(f'deflate level {level}', lambda b: zlib_compress(b, level, 15), body)
+    if brotli is not None:
+        for quality in [1, 4, 11]:
+            bench(f'brotli quality {quality}', lambda b: brotli.compress(b, quality=quality), body)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,62 @@
+"""
+Measures the parsing of ESIs, and the construction of LAGs with ESIs,
+as Autonet previously did, and with the cached :py:class:`ESI` type.
+
+    ~# python benchmarks/bench_esi.py [count]
+"""
+import random
+import re
+import sys
+
+from ipaddress import ip_address
+
+from bench_route_targets import is_esi
+from bench_serialization import bench
+
+from autonet.core.objects.lag import LAG
+from autonet.util.evpn import ESI, parse_esi
+
+
+def parse_esi_previous(esi: str) -> dict:
+    if not is_esi(esi):
+        raise Exception(f"'{esi}' does not appear to be formatted correctly.")
+    octets = bytes.fromhex(re.sub(r'[-_.:]', '', esi))
+    esi_type = octets[0]
+    if esi_type == 1:
+        esi_data = {'lacp_system_mac': octets[1:7].hex(':'),
+                    'lacp_port_key': int.from_bytes(octets[7:9], 'big', signed=False)}
+    elif esi_type == 4:
+        esi_data = {'router_id': str(ip_address(octets[1:5])),
+                    'local_discriminator': int.from_bytes(octets[5:9], 'big', signed=False)}
+    else:
+        esi_data = {}
+    return {**{'type': esi_type}, **esi_data}
+
+
+def normalize_previous(esi: str) -> str:
+    if not is_esi(esi):
+        raise ValueError(esi)
+    return bytes.fromhex(re.sub(r'[-_.:]', '', esi)).hex(':')
+
+
+def main(count: int = 2000):
+    random.seed(0)
+    # LAGs on the leaves of a fabric, each ESI configured on a pair of
+    # leaves and reported in varying formats.
+    esis = []
+    for n in range(count // 2):
+        octets = bytes([1]) + bytes.fromhex('001c73000000') + n.to_bytes(2, 'big') + b'\0'
+        esis += [octets.hex(':'), octets.hex('.', 2)]
+    random.shuffle(esis)
+    print(f'{len(esis)} ESIs, best of 5:')
+
+    bench('parse_esi(), previous', lambda: [parse_esi_previous(esi) for esi in esis])
+    bench('parse_esi(), current', lambda: [parse_esi(esi) for esi in esis])
+    bench('ESI.parse()', lambda: [ESI.parse(esi) for esi in esis])
+    bench('Normalize, previous', lambda: [normalize_previous(esi) for esi in esis])
+    bench('LAG construction', lambda: [LAG(name='Port-Channel1', members=[], evpn_esi=esi)
+                                       for esi in esis])
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,42 @@
+"""
+Compares the cost of encoding and decoding an interface listing, and the
+resulting size, for each of the available response formats.
+
+    ~# python benchmarks/bench_formats.py [count]
+"""
+import json
+import sys
+import timeit
+
+from flask import Flask
+
+from autonet.core import serialization
+from autonet.core.serialization import AutonetJSONProvider
+
+from bench_serialization import build_interfaces
+
+
+def bench(name: str, dumps, loads, payload, repeat: int = 5):
+    encode = min(timeit.repeat(lambda: dumps(payload), number=1, repeat=repeat))
+    body = dumps(payload)
+    decode = min(timeit.repeat(lambda: loads(body), number=1, repeat=repeat))
+    print(f'{name:<16} {encode * 1000:10.1f} ms {decode * 1000:10.1f} ms {len(body) / 1024:10.1f} KiB')
+
+
+def main(count: int = 10000):
+    app = Flask('benchmark')
+    provider = AutonetJSONProvider(app)
+    payload = {'request-id': 'benchmark', 'data': build_interfaces(count), 'errors': [], 'status': 200}
+    print(f'Encoding {count} interfaces, best of 5:')
+    print(f'{"":<16} {"encode":>13} {"decode":>13} {"size":>14}')
+    bench('JSON', provider.dumps, provider.loads, payload)
+    if serialization.orjson is not None:
+        bench('JSON (stdlib)', lambda p: json.dumps(p, default=serialization.default), json.loads, payload)
+    if serialization.msgpack is not None:
+        bench('MessagePack', serialization.dumps_msgpack, serialization.msgpack.unpackb, payload)
+    if serialization.cbor2 is not None:
+        bench('CBOR', serialization.dumps_cbor, serialization.cbor2.loads, payload)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
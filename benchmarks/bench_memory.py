@@ -0,0 +1,25 @@
+"""
+Measures the memory used by interface tables, in bytes per interface
+including its attributes and addresses.
+
+    ~# python benchmarks/bench_memory.py [count]
+"""
+import sys
+import tracemalloc
+
+from bench_serialization import build_interfaces
+
+
+def main(count: int = 10000):
+    build_interfaces(1)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    interfaces = build_interfaces(count)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f'{count} interfaces: {used / 1024 / 1024:.1f} MiB, '
+          f'{used / len(interfaces):.0f} bytes per interface')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,106 @@
+"""
+Measures the validation of route targets, route distinguishers and ESIs
+with the functions Autonet previously used, and with the current
+precompiled and memoized validators.  Also measures the construction of
+VRFs with many route targets.
+
+    ~# python benchmarks/bench_route_targets.py [count]
+"""
+import ipaddress
+import random
+import re
+import sys
+
+from bench_serialization import bench
+
+from autonet.core.objects import validators as v
+from autonet.core.objects.vrf import VRF
+
+
+def is_uint16(number: str) -> bool:
+    try:
+        return 0 <= int(number) <= 65535
+    except ValueError:
+        pass
+    return False
+
+
+def is_uint32(number: str) -> bool:
+    try:
+        return 0 <= int(number) <= 4294967295
+    except ValueError:
+        pass
+    return False
+
+
+def is_ipv4_address(address: str) -> bool:
+    try:
+        ipaddress.IPv4Address(address)
+        return True
+    except ipaddress.AddressValueError:
+        pass
+    return False
+
+
+def is_route_distinguisher(rd: str) -> bool:
+    if rd == 'auto':
+        return True
+    parts = rd.split(':')
+    case1 = is_ipv4_address(parts[0]) and is_uint16(parts[1])
+    case2 = is_uint32(parts[0]) and is_uint16(parts[1])
+    case3 = is_uint16(parts[0]) and is_uint32(parts[1])
+    return len(parts) == 2 and (case1 or case2 or case3)
+
+
+def is_route_target(rt: str, allow_auto: bool = True) -> bool:
+    if allow_auto and rt == 'auto':
+        return True
+    parts = rt.split(':')
+    if len(parts) != 2:
+        return False
+    case1 = is_uint16(parts[0]) and is_uint32(parts[1])
+    case2 = is_uint32(parts[0]) and is_uint16(parts[1])
+    return case1 or case2
+
+
+def is_esi(esi: str) -> bool:
+    try:
+        esi_bytes = bytes.fromhex(re.sub(r'[-_.:]', '', esi))
+    except ValueError:
+        return False
+    return len(esi_bytes) == 10
+
+
+def main(count: int = 500):
+    random.seed(0)
+    # Each VRF imports and exports the targets of a few hundred others,
+    # as in a hub and spoke design, so the same values recur.
+    targets = [f'65000:{n}' for n in range(count)]
+    vrfs = [random.sample(targets, 200) for _ in range(count)]
+    rds = [f'198.18.{n // 256}.{n % 256}:{n}' for n in range(count)]
+    esis = [f'00:00:00:00:00:00:00:{n // 256:02x}:{n % 256:02x}:00' for n in range(count)]
+    print(f'{count} VRFs with 200 route targets each, best of 5:')
+
+    bench('Route targets, previous', lambda: [[is_route_target(rt) for rt in rts]
+                                               for rts in vrfs])
+    bench('Route targets, current', lambda: [v.invalid_route_targets(rts) for rts in vrfs])
+    bench('Route targets, not memoized', lambda: [[v._is_route_target.__wrapped__(rt)
+                                                   for rt in rts] for rts in vrfs])
+
+    def construct():
+        for rts in vrfs:
+            VRF(name='blue', import_targets=rts, export_targets=rts)
+    bench('Construct VRFs', construct)
+
+    print(f'{count} RDs and ESIs, best of 5:')
+    bench('RDs, previous', lambda: [is_route_distinguisher(rd) for rd in rds])
+    bench('RDs, current', lambda: v.invalid_route_distinguishers(rds))
+    bench('RDs, not memoized', lambda: [v._is_route_distinguisher.__wrapped__(rd)
+                                                 for rd in rds])
+    bench('ESIs, previous', lambda: [is_esi(esi) for esi in esis])
+    bench('ESIs, current', lambda: v.invalid_esis(esis))
+    bench('ESIs, not memoized', lambda: [v._is_esi.__wrapped__(esi) for esi in esis])
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,56 @@
+"""
+Measures the cost of serializing interface lists to JSON with Flask's
+default JSON provider and with :py:class:`AutonetJSONProvider`.
+
+    ~# python benchmarks/bench_serialization.py [count]
+"""
+import sys
+import timeit
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from autonet.core import serialization
+from autonet.core.objects import interfaces as an_if
+from autonet.core.serialization import AutonetJSONProvider
+
+
+def build_interfaces(count: int) -> list:
+    interfaces = []
+    for i in range(count):
+        if i % 2:
+            attributes = an_if.InterfaceRouteAttributes(
+                addresses=[an_if.InterfaceAddress(f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}/31')],
+                vrf='blue')
+        else:
+            attributes = an_if.InterfaceBridgeAttributes(
+                dot1q_enabled=True, dot1q_vids=[10, 20, 30], dot1q_pvid=1)
+        interfaces.append(an_if.Interface(
+            name=f'Ethernet1/{i}', description=f'Port {i}', admin_enabled=True,
+            attributes=attributes, speed=10000, duplex='full', mtu=9100,
+            virtual=False, physical_address='00:1c:73:00:00:01'))
+    return interfaces
+
+
+def bench(name: str, func, repeat: int = 5):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'{name:<32} {best * 1000:10.1f} ms')
+
+
+def main(count: int = 10000):
+    app = Flask('benchmark')
+    interfaces = build_interfaces(count)
+    payload = {'request-id': 'benchmark', 'data': interfaces, 'errors': [], 'status': 200}
+    print(f'Serializing {count} interfaces, best of 5:')
+    flask_default = DefaultJSONProvider(app)
+    bench('Flask default provider', lambda: flask_default.dumps(payload, separators=(',', ':')))
+    autonet_provider = AutonetJSONProvider(app)
+    if serialization.orjson is not None:
+        bench('Autonet provider (orjson)', lambda: autonet_provider.dumps(payload, separators=(',', ':')))
+    orjson, serialization.orjson = serialization.orjson, None
+    bench('Autonet provider (json)', lambda: autonet_provider.dumps(payload, separators=(',', ':')))
+    serialization.orjson = orjson
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
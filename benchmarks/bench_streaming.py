@@ -0,0 +1,61 @@
+"""
+Compares the peak memory use and time to first byte of a list response
+with those of a streamed response, for a driver that produces its
+interfaces from a generator.
+
+    ~# python benchmarks/bench_streaming.py [count]
+"""
+import sys
+import time
+import tracemalloc
+
+from flask import Flask, g
+
+from autonet.core.response import autonet_response
+from autonet.core.serialization import AutonetJSONProvider
+
+from bench_serialization import build_interfaces
+
+
+def generate_interfaces(count: int):
+    # Build the interfaces in batches, as a driver paging through the
+    # device's configuration would.
+    for start in range(0, count, 100):
+        yield from build_interfaces(min(100, count - start))
+
+
+def consume(app: Flask, make_data):
+    with app.test_request_context('/'):
+        g.errors = []
+        g.request_id = 'benchmark'
+        start = time.perf_counter()
+        response, _, _ = autonet_response(make_data())
+        chunks = iter(response.response)
+        size = len(next(chunks))
+        first_byte = time.perf_counter() - start
+        size += sum(len(chunk) for chunk in chunks)
+        return first_byte, time.perf_counter() - start, size
+
+
+def measure(name: str, app: Flask, make_data):
+    first_byte, total, size = consume(app, make_data)
+    # Memory is traced separately as tracing slows execution considerably.
+    tracemalloc.start()
+    consume(app, make_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name:<16} {first_byte * 1000:10.1f} ms {total * 1000:10.1f} ms '
+          f'{peak / 2 ** 20:10.1f} MiB {size / 2 ** 20:10.1f} MiB')
+
+
+def main(count: int = 10000):
+    app = Flask('benchmark')
+    app.json = AutonetJSONProvider(app)
+    print(f'Responding with {count} interfaces:')
+    print(f'{"":<16} {"first byte":>13} {"total":>13} {"peak memory":>14} {"body":>14}')
+    measure('List', app, lambda: list(generate_interfaces(count)))
+    measure('Streamed', app, lambda: generate_interfaces(count))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,89 @@
+"""
+Measures building, filtering, serializing and the memory use of an
+interface listing as a list of :py:class:`Interface` objects and as an
+:py:class:`InterfaceTable`, as a driver for a device with very many
+sub-interfaces would produce it.
+
+    ~# python benchmarks/bench_table.py [count]
+"""
+import sys
+import tracemalloc
+
+from itertools import compress
+
+from flask import Flask
+
+from bench_serialization import bench
+
+from autonet.core.listing import _select_fields
+from autonet.core.objects import interfaces as an_if
+from autonet.core.objects import validators as v
+from autonet.core.serialization import AutonetJSONProvider
+
+
+def interface_kwargs(count: int):
+    for i in range(count):
+        yield {'name': f'Ethernet1/1.{i}', 'mode': 'routed' if i % 4 else 'bridged',
+               'admin_enabled': bool(i % 3), 'child': True, 'parent': 'Ethernet1/1',
+               'virtual': True, 'speed': 100000, 'mtu': 9100, 'description': f'Customer {i}'}
+
+
+def build_list(count: int) -> list:
+    with v.trusted():
+        return [an_if.Interface(**kwargs) for kwargs in interface_kwargs(count)]
+
+
+def build_table(count: int) -> an_if.InterfaceTable:
+    table = an_if.InterfaceTable()
+    for kwargs in interface_kwargs(count):
+        table.append(**kwargs)
+    return table
+
+
+def interface_columns(count: int) -> dict:
+    rows = list(interface_kwargs(count))
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+def build_table_from_columns(count: int, columns: dict = None) -> an_if.InterfaceTable:
+    return an_if.InterfaceTable.from_columns(**(columns or interface_columns(count)))
+
+
+def memory(build, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(count)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used / count
+
+
+def main(count: int = 50000):
+    provider = AutonetJSONProvider(Flask('benchmark'))
+    interfaces = build_list(count)
+    table = build_table(count)
+    print(f'{count} interfaces, best of 5:')
+    bench('Build list (trusted)', lambda: build_list(count))
+    bench('Build table', lambda: build_table(count))
+    columns = interface_columns(count)
+    bench('Build table from columns', lambda: build_table_from_columns(count, columns))
+    bench('Filter list', lambda: [i for i in interfaces if i.mode == 'routed'])
+
+    def filter_table():
+        mask = table.mask('mode', 'routed')
+        return table.take(compress(range(len(table)), mask))
+    bench('Filter table', filter_table)
+    bench('Serialize list', lambda: provider.dumps(interfaces))
+    bench('Serialize table', lambda: provider.dumps(table))
+    # Fields are selected from a list as list_response() selects them.
+    fields = ['name', 'mtu']
+    bench('Serialize list, 2 fields', lambda: provider.dumps(
+        [_select_fields(i, fields) for i in interfaces]))
+    bench('Serialize table, 2 fields', lambda: provider.dumps(table.rows(fields)))
+    print(f'List:  {memory(build_list, count):.0f} bytes per interface')
+    print(f'Table: {memory(build_table_from_columns, count):.0f} bytes per interface')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,57 @@
+"""
+Measures the cost of validating object fields against their type hints
+by resolving the type hints on each validation, as Autonet previously
+did, and with the per-class compiled validators.  Also measures the
+construction of interfaces from untrusted input and from trusted
+driver output.
+
+    ~# python benchmarks/bench_validators.py [count]
+"""
+import sys
+import typing
+
+from bench_serialization import bench, build_interfaces
+
+from autonet.core.exceptions import RequestTypeError
+from autonet.core.objects import validators as v
+
+
+def validate_uncompiled(obj: object):
+    for attr, tp in typing.get_type_hints(obj).items():
+        value = getattr(obj, attr)
+        if typing.get_origin(tp) is typing.Union:
+            if not v.validate_union(value, tp):
+                raise RequestTypeError(attr, value, tp, valid_types=typing.get_args(tp))
+        elif typing.get_origin(tp) is list:
+            if not v.validate_list(value, tp):
+                raise RequestTypeError(attr, value, tp, valid_types=typing.get_args(tp))
+        elif not isinstance(value, tp):
+            raise RequestTypeError(attr, value, tp)
+    return True
+
+
+def main(count: int = 10000):
+    interfaces = build_interfaces(count)
+    objects = interfaces + [i.attributes for i in interfaces]
+    objects += [a for i in interfaces if hasattr(i.attributes, 'addresses')
+                for a in i.attributes.addresses]
+    print(f'Validating {len(objects)} objects, best of 5:')
+
+    def run(validate):
+        for obj in objects:
+            validate(obj)
+
+    bench('Type hints per validation', lambda: run(validate_uncompiled))
+    bench('Compiled validators', lambda: run(v.validate))
+
+    print(f'Constructing {count} interfaces, best of 5:')
+    bench('Untrusted', lambda: build_interfaces(count))
+
+    def build_trusted():
+        with v.trusted():
+            build_interfaces(count)
+    bench('Trusted', build_trusted)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
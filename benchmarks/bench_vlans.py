@@ -0,0 +1,90 @@
+"""
+Measures VLAN glob parsing, formatting and set operations with the list
+based functions Autonet previously used, and with :py:class:`VLANSet`.
+
+    ~# python benchmarks/bench_vlans.py [count]
+"""
+import random
+import sys
+
+from bench_serialization import bench
+
+from autonet.util.config_string import VLANSet
+
+
+def vlan_list_to_glob_list(vlans: list) -> str:
+    vlans.sort()
+    in_range = False
+    glob = ''
+    for i, vid in enumerate(vlans):
+        if i == 0:
+            glob = str(vid)
+        elif vid != vlans[i - 1] + 1:
+            if in_range:
+                glob = glob + f'-{vlans[i - 1]}'
+                in_range = False
+            glob = glob + f',{vid}'
+        elif i + 1 == len(vlans):
+            in_range = False
+            glob = glob + f'-{vid}'
+        else:
+            in_range = True
+    return glob
+
+
+def glob_to_vlan_list_list(glob: str) -> list:
+    vlans = []
+    for chunk in glob.split(','):
+        bits = chunk.split('-')
+        if len(bits) == 2:
+            vlans += list(range(int(bits[0]), int(bits[1]) + 1))
+        else:
+            vlans.append(int(bits[0]))
+    return vlans
+
+
+def trunk(ranges: int) -> VLANSet:
+    vlans = VLANSet()
+    for _ in range(ranges):
+        start = random.randint(1, 4000)
+        vlans |= range(start, start + random.randint(1, 90))
+    return vlans
+
+
+def run(name: str, globs: list):
+    lists = [glob_to_vlan_list_list(g) for g in globs]
+    sets = [VLANSet.from_glob(g) for g in globs]
+    print(f'{len(globs)} {name} VLAN globs, best of 5:')
+
+    bench('Parse, lists', lambda: [glob_to_vlan_list_list(g) for g in globs])
+    bench('Parse, VLANSet', lambda: [VLANSet.from_glob(g) for g in globs])
+    bench('Format, lists', lambda: [vlan_list_to_glob_list(list(v)) for v in lists])
+    bench('Format, VLANSet', lambda: [v.to_glob() for v in sets])
+
+    def union_difference_lists():
+        for a, b in zip(lists, lists[1:]):
+            sorted(set(a) | set(b))
+            sorted(set(a) - set(b))
+    bench('Union/difference, lists', union_difference_lists)
+
+    def union_difference_sets():
+        for a, b in zip(sets, sets[1:]):
+            a | b
+            a - b
+    bench('Union/difference, VLANSet', union_difference_sets)
+    bench('Contains, lists', lambda: [100 in v for v in lists])
+    bench('Contains, VLANSet', lambda: [100 in v for v in sets])
+
+
+def main(count: int = 1000):
+    random.seed(0)
+    # Trunks allowing ranges of VLANs, as most are configured, and
+    # trunks allowing a few hundred scattered VLANs, the worst case for
+    # a bitmap, which is formatted about as quickly as a list.
+    run('ranged', ['1-4094'] + [trunk(20).to_glob() for _ in range(count - 1)])
+    run('scattered', [VLANSet(random.sample(range(1, 4095), 300)).to_glob()
+                      for _ in range(count)])
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,170 @@
+"""
+Support for the benchmark suite in `suite.py`.  Timings are stored and
+compared relative to a calibration workload measured alongside each
+benchmark, so that baselines recorded on one machine remain meaningful
+on another of different speed, or under different load.
+
+The relative cost of different kinds of Python code changes between
+interpreter versions, so baselines are stored separately for each
+minor version of Python, and are only compared with measurements made
+under the same version.
+"""
+import json
+import os
+import platform
+import pytest
+import timeit
+
+from dataclasses import dataclass
+from typing import Callable
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines.json')
+PYTHON = '.'.join(platform.python_version_tuple()[:2])
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('autonet benchmarks')
+    group.addoption('--baselines', default=BASELINES,
+                    help='File from which baselines are read and to which they are saved.')
+    group.addoption('--save-baselines', action='store_true',
+                    help='Save the measurements as the new baselines instead of comparing them.')
+    group.addoption('--regression-threshold', type=float, default=25.0,
+                    help='Percentage by which a benchmark may be slower than its baseline '
+                         'before it fails.  Defaults to 25.')
+
+
+def calibration_workload():
+    """
+    A fixed, pure Python workload of object construction, attribute
+    access and sorting, similar in kind to the benchmarked code.
+    """
+    items = [{'name': f'item{i}', 'value': i, 'tags': [i, i + 1]} for i in range(20000)]
+    return sorted(items, key=lambda item: -item['value'])
+
+
+@dataclass
+class Measurement(object):
+    """
+    :param name: The benchmark name.
+    :param items: The number of items processed per run.
+    :param seconds: The best time of a run.
+    :param relative: The best time of a run relative to the best time of
+        the calibration workload measured alongside it.
+    """
+    name: str
+    items: int
+    seconds: float
+    relative: float
+
+
+class Benchmarks(object):
+    # Number of times a benchmark that appears to have regressed is
+    # measured again, before it fails, to rule out a burst of load.
+    confirmations = 2
+
+    def __init__(self, config):
+        # The options are only registered when this conftest is loaded
+        # at startup, which is not the case when pytest collects it from
+        # the repository root, so defaults are given for each.
+        self.path = config.getoption('baselines', BASELINES)
+        self.save = config.getoption('save_baselines', False)
+        self.threshold = config.getoption('regression_threshold', 25.0)
+        self.recorded = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.recorded = json.load(f)
+        self.baselines = self.recorded.get(PYTHON, {})
+        self.calibration = None
+        self.calibration_number = 1
+        self.measurements = []
+
+    def _run(self, timer: timeit.Timer, number: int, repeat: int, times: list, calibrations: list):
+        # Each run is paired with one of the calibration workload, so
+        # that both are measured under the same conditions.
+        for _ in range(repeat):
+            calibrations.append(self.calibration.timeit(self.calibration_number) / self.calibration_number)
+            times.append(timer.timeit(number) / number)
+
+    def measure(self, name: str, func: Callable, items: int = 1,
+                repeat: int = 10, threshold_factor: float = 1) -> Measurement:
+        """
+        Measure `func` relative to the calibration workload and compare
+        it with the baseline for `name`, failing the test if it is slower
+        by more than the regression threshold.
+
+        :param name: The benchmark name.
+        :param func: The function to be measured.
+        :param items: The number of items processed by each call, for
+            reporting throughput.
+        :param repeat: The number of measurements.
+        :param threshold_factor: Multiplies the regression threshold,
+            for benchmarks that remain noisier than others.
+        :return:
+        """
+        # Load on the machine only ever makes code slower, so the best
+        # times of the benchmark and of the calibration workload are the
+        # least disturbed estimates of each, and their ratio the most
+        # stable.  Small workloads are run enough times per measurement
+        # to be timed reliably.
+        if self.calibration is None:
+            self.calibration = timeit.Timer(calibration_workload)
+            self.calibration_number, _ = self.calibration.autorange()
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        times, calibrations = [], []
+        baseline = self.baselines.get(name)
+        threshold = self.threshold * threshold_factor
+        for _ in range(self.confirmations + 1):
+            self._run(timer, number, repeat, times, calibrations)
+            relative = min(times) / min(calibrations)
+            if self.save or baseline is None or (relative / baseline - 1) * 100 <= threshold:
+                break
+        seconds = min(times)
+        measurement = Measurement(name, items, seconds, relative)
+        self.measurements.append(measurement)
+        if self.save:
+            return measurement
+        if baseline is None:
+            pytest.skip(f'No baseline for {name} on Python {PYTHON}, '
+                        f'run with --save-baselines to record one.')
+        change = (measurement.relative / baseline - 1) * 100
+        if change > threshold:
+            pytest.fail(f'{name} regressed by {change:.0f}%, more than the threshold of '
+                        f'{threshold:.0f}%, taking {seconds * 1000:.1f} ms.')
+        return measurement
+
+    def write(self):
+        baselines = {**self.baselines, **{m.name: round(m.relative, 6) for m in self.measurements}}
+        with open(self.path, 'w') as f:
+            json.dump({**self.recorded, PYTHON: baselines}, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+def pytest_configure(config):
+    config._autonet_benchmarks = Benchmarks(config)
+
+
+def pytest_sessionfinish(session):
+    benchmarks = session.config._autonet_benchmarks
+    if benchmarks.save and benchmarks.measurements:
+        benchmarks.write()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    benchmarks = config._autonet_benchmarks
+    if not benchmarks.measurements:
+        return
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(f'{"":<40} {"ms":>10} {"items/s":>12} {"baseline":>9}')
+    for m in benchmarks.measurements:
+        baseline = benchmarks.baselines.get(m.name)
+        change = f'{(m.relative / baseline - 1) * 100:+.0f}%' if baseline else '-'
+        terminalreporter.write_line(f'{m.name:<40} {m.seconds * 1000:10.1f} '
+                                    f'{m.items / m.seconds:12,.0f} {change:>9}')
+    if benchmarks.save:
+        terminalreporter.write_line(f'Baselines saved to {benchmarks.path}')
+
+
+@pytest.fixture
+def benchmarks(request) -> Benchmarks:
+    return request.config._autonet_benchmarks
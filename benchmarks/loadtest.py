@@ -0,0 +1,159 @@
+"""
+Measures the request throughput of the full Autonet request path,
+including authentication, device marshalling, driver execution and
+serialization, against an inventory of simulated devices.
+
+A YAML inventory of `--devices` devices using the dummy driver is
+generated, along with a temporary database holding an admin token, and
+`--workers` threads then issue `--requests` requests between them
+through the WSGI interface of the application.  Most requests read
+interfaces and VRFs, and `--write-ratio` of them create and delete VRFs.
+Device latencies are simulated as configured by the options below, see
+:py:mod:`autonet.drivers.device.dummy_driver.driver`.
+
+    ~# python benchmarks/loadtest.py [--devices 10] [--workers 8] [--requests 2000]
+    ~# python benchmarks/loadtest.py --read-latency 0.02 --write-latency 0.2 --jitter 0.01
+
+Any other Autonet option may be set by its environment variable, e.g.
+`DRIVER_READ_CACHE_TTL=5`.
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import yaml
+
+from collections import Counter
+
+
+def generate_inventory(count: int, path: str):
+    """
+    Write a YAML inventory of `count` simulated devices to `path`.
+
+    :param count: The number of devices.
+    :param path: The inventory file path.
+    :return:
+    """
+    devices = {f'dummy-{n}': {'address': f'198.18.{n // 256}.{n % 256}',
+                              'username': 'autonet', 'password': 'autonet',
+                              'driver': 'dummy'}
+               for n in range(1, count + 1)}
+    with open(path, 'w') as f:
+        yaml.safe_dump(devices, f)
+
+
+def configure(args: argparse.Namespace, directory: str):
+    """
+    Configure Autonet for the load test by environment variables, which
+    must be done before Autonet is imported.
+
+    :param args: The parsed arguments.
+    :param directory: The directory for the inventory and database.
+    :return:
+    """
+    inventory = os.path.join(directory, 'devices.yaml')
+    generate_inventory(args.devices, inventory)
+    os.environ.update({
+        'BACKEND': 'yamlfile',
+        'BACKEND_YAMLFILE_PATH': inventory,
+        # Threads require a file backed database, as each connection to
+        # an in-memory SQLite database has a database of its own.
+        'DATABASE_CONNECTION': f'sqlite:///{os.path.join(directory, "autonet.db")}',
+        'DRIVER_DUMMY_INTERFACES': str(args.interfaces),
+        'DRIVER_DUMMY_READ_LATENCY': str(args.read_latency),
+        'DRIVER_DUMMY_CREATE_LATENCY': str(args.write_latency),
+        'DRIVER_DUMMY_UPDATE_LATENCY': str(args.write_latency),
+        'DRIVER_DUMMY_DELETE_LATENCY': str(args.write_latency),
+        'DRIVER_DUMMY_JITTER': str(args.jitter)
+    })
+
+
+def percentile(quantiles: list, p: int) -> float:
+    return quantiles[p - 1] if quantiles else 0.0
+
+
+def main(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory() as directory:
+        configure(args, directory)
+        from autonet.commands.createadmin import _create_admin, DEFAULT_ADMIN_NAME
+        from autonet.core.app import flask_app
+        from autonet.core.metrics import metrics
+        from autonet.db import init_db
+
+        init_db()
+        headers = {'X-API-Key': f'{DEFAULT_ADMIN_NAME}:{_create_admin()}'}
+        devices = [f'dummy-{n}' for n in range(1, args.devices + 1)]
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies, statuses = [], Counter()
+
+        def worker(worker_id: int):
+            client = flask_app.test_client()
+            rng = random.Random(worker_id)
+            vrf = 0
+            while next(counter) < args.requests:
+                device = rng.choice(devices)
+                if rng.random() < args.write_ratio:
+                    vrf += 1
+                    name = f'loadtest-{worker_id}-{vrf}'
+                    requests = [('post', f'/{device}/vrfs', {'name': name, 'ipv4': True}),
+                                ('delete', f'/{device}/vrfs/{name}', None)]
+                else:
+                    requests = [rng.choice([
+                        ('get', f'/{device}/interfaces', None),
+                        ('get', f'/{device}/interfaces/Ethernet{rng.randint(1, args.interfaces)}', None),
+                        ('get', f'/{device}/vrfs', None)])]
+                for method, path, body in requests:
+                    start = time.perf_counter()
+                    response = getattr(client, method)(path, headers=headers, json=body)
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                        statuses[f'{method.upper()} {response.status_code}'] += 1
+
+        # Make a first request so that any lazy initialization is not
+        # measured.
+        flask_app.test_client().get(f'/{devices[0]}/vrfs', headers=headers)
+        metrics.reset()
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        print(f'{len(latencies)} requests to {args.devices} devices by {args.workers} workers '
+              f'in {elapsed:.2f} s: {len(latencies) / elapsed:,.1f} requests/s')
+        print(f'Latency ms: p50 {percentile(quantiles, 50) * 1000:.1f}  '
+              f'p90 {percentile(quantiles, 90) * 1000:.1f}  '
+              f'p99 {percentile(quantiles, 99) * 1000:.1f}  '
+              f'max {max(latencies, default=0) * 1000:.1f}')
+        print('Responses: ' + ', '.join(f'{k}: {v}' for k, v in sorted(statuses.items())))
+        print(f'{"Stage":<28} {"count":>8} {"mean ms":>9} {"max ms":>9} {"total s":>9}')
+        for name, stat in sorted(metrics.snapshot().items()):
+            print(f'{name:<28} {stat["count"]:8} {stat["mean"] * 1000:9.2f} '
+                  f'{stat["max"] * 1000:9.2f} {stat["total"]:9.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--devices', type=int, default=10)
+    parser.add_argument('--interfaces', type=int, default=48,
+                        help='Physical interfaces per device.')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--write-ratio', type=float, default=0.1,
+                        help='Fraction of requests that create and delete a VRF.')
+    parser.add_argument('--read-latency', type=float, default=0.0,
+                        help='Simulated seconds per device read.')
+    parser.add_argument('--write-latency', type=float, default=0.0,
+                        help='Simulated seconds per device write.')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Maximum random variation of the latencies, in seconds.')
+    main(parser.parse_known_args()[0])
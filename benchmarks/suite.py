@@ -0,0 +1,139 @@
+"""
+Benchmarks of the construction, validation, merging and serialization
+of Autonet objects, run under pytest and compared with the baselines
+stored in `baselines.json`.  A benchmark fails if it is slower than its
+baseline by more than the regression threshold, twice over for the
+largest sizes, and is measured again before failing.
+
+    ~# python -m pytest benchmarks/suite.py
+    ~# python -m pytest benchmarks/suite.py --regression-threshold 10
+    ~# python -m pytest benchmarks/suite.py --save-baselines
+
+Save new baselines when a change is intended to alter performance, and
+commit them with the change.  Baselines are kept for each supported
+minor version of Python, so save them under each of those versions.
+"""
+import functools
+import pytest
+import random
+
+from flask import Flask
+
+from bench_serialization import build_interfaces
+
+from autonet.core.objects import interfaces as an_if
+from autonet.core.objects import validators as v
+from autonet.core.objects.lag import LAG
+from autonet.core.objects.vrf import VRF
+from autonet.core.serialization import AutonetJSONProvider
+from autonet.util.config_string import VLANSet
+from autonet.util.evpn import ESI
+
+SIZES = [10, 1000, 50000]
+
+
+def threshold_factor(count: int) -> float:
+    # Runs over the largest sizes take long enough to be disturbed by
+    # bursts of load on the machine, which even their best time does
+    # not always avoid.
+    return 2 if count >= 50000 else 1
+
+
+@functools.lru_cache(maxsize=None)
+def interfaces(count: int) -> list:
+    return build_interfaces(count)
+
+
+def route_targets(count: int) -> list:
+    return [f'{65000 + n % 500}:{n}' for n in range(count)]
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_interface_construction(benchmarks, count):
+    benchmarks.measure(f'interfaces.construct[{count}]', lambda: build_interfaces(count),
+                       items=count, threshold_factor=threshold_factor(count))
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_interface_construction_trusted(benchmarks, count):
+    def construct():
+        with v.trusted():
+            build_interfaces(count)
+    benchmarks.measure(f'interfaces.construct_trusted[{count}]', construct,
+                       items=count, threshold_factor=threshold_factor(count))
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_interface_validation(benchmarks, count):
+    objects = interfaces(count) + [i.attributes for i in interfaces(count)]
+
+    def validate():
+        for obj in objects:
+            v.validate(obj)
+    benchmarks.measure(f'interfaces.validate[{count}]', validate, items=len(objects),
+                       threshold_factor=threshold_factor(count))
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_interface_merge(benchmarks, count):
+    # Merging the same updates repeatedly leaves the interfaces unchanged
+    # after the first merge, so each run does the same work.
+    originals = build_interfaces(count)
+    updates = [an_if.Interface(description='Updated', mtu=1500, attributes=type(i.attributes)(
+        **({'dot1q_enabled': True, 'dot1q_vids': [30, 40]}
+           if isinstance(i.attributes, an_if.InterfaceBridgeAttributes)
+           else {'addresses': [an_if.InterfaceAddress('192.0.2.1/24')]})))
+        for i in originals]
+
+    def merge():
+        for interface, update in zip(originals, updates):
+            interface.merge(update)
+    benchmarks.measure(f'interfaces.merge[{count}]', merge, items=count,
+                       threshold_factor=threshold_factor(count))
+
+
+@pytest.mark.parametrize('count', SIZES)
+def test_interface_serialization(benchmarks, count):
+    provider = AutonetJSONProvider(Flask(__name__))
+    payload = interfaces(count)
+    benchmarks.measure(f'interfaces.serialize[{count}]', lambda: provider.dumps(payload),
+                       items=count, threshold_factor=threshold_factor(count))
+
+
+def test_vrf_construction(benchmarks):
+    random.seed(0)
+    targets = route_targets(2000)
+    vrfs = [(random.sample(targets, 500), random.sample(targets, 500)) for _ in range(100)]
+
+    def construct():
+        for import_targets, export_targets in vrfs:
+            VRF(name='blue', import_targets=import_targets, export_targets=export_targets,
+                route_distinguisher='198.18.0.1:1')
+    benchmarks.measure('vrfs.construct[100x500]', construct, items=len(vrfs))
+
+
+def test_vlan_globs(benchmarks):
+    random.seed(0)
+    globs = []
+    for _ in range(1000):
+        vlans = VLANSet()
+        for _ in range(20):
+            start = random.randint(1, 4000)
+            vlans |= range(start, start + random.randint(1, 90))
+        globs.append(vlans.to_glob())
+
+    def parse_and_format():
+        for glob in globs:
+            VLANSet.from_glob(glob).to_glob()
+    benchmarks.measure('vlans.glob[1000]', parse_and_format, items=len(globs))
+
+
+def test_esi_parsing(benchmarks):
+    esis = [(bytes([3]) + bytes.fromhex('001c73000000') + n.to_bytes(3, 'big')).hex(':')
+            for n in range(1000)]
+
+    def construct():
+        for esi in esis:
+            LAG(name='Port-Channel1', members=[], evpn_esi=esi).esi
+    benchmarks.measure('lags.construct_esi[1000]', construct, items=len(esis))
+    assert isinstance(LAG(name='Port-Channel1', members=[], evpn_esi=esis[0]).esi, ESI)
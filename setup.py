@@ -11,7 +11,7 @@ with open(here+'/autonet/__version__.py', 'r') as f:
 
 install_requires = [
     'conf-engine>=1.0',
-    'Flask>=2.1.2',
+    'Flask>=2.2.0',
     'passlib>=1.7.0',
     'pymysql>=1.0.2',
     'PyYAML~=6.0',
@@ -21,6 +21,15 @@ install_requires = [
     'macaddress>=1.2.0'
 ]
 
+extras_require = {
+    'asgi': ['greenlet>=1.0'],
+    'brotli': ['Brotli>=1.0.9'],
+    'cbor': ['cbor2>=5.4.0'],
+    'msgpack': ['msgpack>=1.0.0'],
+    'orjson': ['orjson>=3.6.0'],
+    'server': ['gunicorn>=20.1.0']
+}
+
 test_requires = install_requires + [
     'responses',
     'pytest',
@@ -51,6 +60,7 @@ setuptools.setup(
     packages=setuptools.find_packages(where='./'),
     python_requires=">=3.9",
     install_requires=install_requires,
+    extras_require=extras_require,
     test_requires=test_requires,
     test_suite='pytest',
     exclude_package_data={'': ['autonet/*/tests/test_*.py']},